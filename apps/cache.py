@@ -0,0 +1,67 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+
+
+def get_cache():
+    """Caché de los datos de la aplicación (alias ``APP_CACHE_ALIAS`` de CACHES)."""
+    return caches[getattr(settings, 'APP_CACHE_ALIAS', 'default')]
+
+
+def _new_version():
+    # Distinta de cualquier versión anterior aunque la caché haya expulsado la llave
+    # de versión; con un contador que vuelve a 1 se leerían valores antiguos
+    return time.time_ns()
+
+
+class CacheNamespace:
+    """Llaves con espacio de nombres y versión: ``<nombre>:<versión>:<partes>``.
+
+    ``invalidate()`` cambia la versión y todas las llaves anteriores dejan de
+    leerse a la vez (expiran solas). Con una caché compartida la invalidación
+    alcanza a todos los procesos.
+    """
+
+    def __init__(self, name, timeout):
+        self.name = name
+        self.timeout = timeout
+        self.version_key = f'{name}:version'
+
+    def version(self):
+        cache = get_cache()
+        version = cache.get(self.version_key)
+        if version is None:
+            cache.add(self.version_key, _new_version(), None)
+            version = cache.get(self.version_key)
+        return version
+
+    def key(self, *parts):
+        return ':'.join(str(part) for part in (self.name, self.version(), *parts))
+
+    def get_or_set(self, parts, default, timeout=None):
+        """Retorna el valor de la llave o calcula ``default()`` y lo guarda."""
+        cache = get_cache()
+        key = self.key(*parts)
+        value = cache.get(key)
+        if value is None:
+            value = default()
+            cache.set(key, value, self.timeout if timeout is None else timeout)
+        return value
+
+    def delete(self, *keys):
+        """Elimina llaves puntuales; cada una es la tupla de partes de ``get_or_set``."""
+        get_cache().delete_many([self.key(*parts) for parts in keys])
+
+    def invalidate(self):
+        """Cambia la versión ahora y de nuevo al confirmar la transacción en curso.
+
+        El segundo cambio descarta lo que otro proceso haya guardado leyendo
+        los datos anteriores mientras la transacción seguía abierta.
+        """
+        self._bump()
+        transaction.on_commit(self._bump)
+
+    def _bump(self):
+        get_cache().set(self.version_key, _new_version(), None)
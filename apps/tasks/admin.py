@@ -1,11 +1,12 @@
 from django.contrib import admin
-from .models import Task
+from .models import ExportJob, OutboxEmail, Task
 
 
 @admin.register(Task)
 class TaskAdmin(admin.ModelAdmin):
     list_display = ('title', 'completed', 'assigned_to', 'created_by', 'created_at')
     list_filter = ('completed', 'created_at', 'assigned_to')
+    list_select_related = ('assigned_to', 'created_by')
     search_fields = ('title', 'description')
     readonly_fields = ('created_at', 'updated_at')
     
@@ -25,4 +26,20 @@ class TaskAdmin(admin.ModelAdmin):
         if not change:  # Si es una nueva tarea
             if not obj.created_by:
                 obj.created_by = request.user
-        super().save_model(request, obj, form, change)
\ No newline at end of file
+        super().save_model(request, obj, form, change)
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'format', 'status', 'progress', 'total_rows', 'requested_by', 'created_at')
+    list_filter = ('format', 'status')
+    list_select_related = ('requested_by',)
+    readonly_fields = ('created_at', 'started_at', 'finished_at', 'error')
+
+
+@admin.register(OutboxEmail)
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('id', 'task', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('status',)
+    list_select_related = ('task',)
+    readonly_fields = ('created_at', 'sent_at', 'last_error')
@@ -1,19 +1,36 @@
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
-from django.db.models import Q
-from .models import Task
-from .serializers import TaskSerializer, TaskListSerializer, TaskToggleSerializer
+from django.db.models import Case, Value, When
+from django.utils import timezone
+from .autocomplete import index_tasks, invalidate_task_index
+from .conditional import conditional_response, get_list_validators, get_object_validators
+from .events import publish_task_event
+from .models import OutboxEmail, Task, TaskCounter
+from .pagination import TaskCursorPagination
+from .serializers import (
+    BULK_MAX_ITEMS,
+    TaskBulkIdsSerializer,
+    TaskBulkUpdateSerializer,
+    TaskSerializer,
+    TaskListSerializer,
+    TaskToggleSerializer,
+    get_requested_fields,
+)
+from .search import SEARCH_RESULTS_LIMIT, rank_tasks, search_tasks
+from .signals import batched_task_signals
+from .stats import invalidate_task_stats
 
 
 class TaskViewSet(viewsets.ModelViewSet):
 
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
+    pagination_class = TaskCursorPagination
 
     def get_serializer_class(self):
 
-        if self.action == 'list':
+        if self.action in ('list', 'search'):
             return TaskListSerializer
         elif self.action == 'toggle':
             return TaskToggleSerializer
@@ -26,9 +43,7 @@ class TaskViewSet(viewsets.ModelViewSet):
         # Filtro de búsqueda
         search = self.request.query_params.get('search', None)
         if search:
-            queryset = queryset.filter(
-                Q(title__icontains=search) | Q(description__icontains=search)
-            )
+            queryset = search_tasks(queryset, search)
 
         # Filtro por estado completado
         completed = self.request.query_params.get('completed', None)
@@ -38,8 +53,51 @@ class TaskViewSet(viewsets.ModelViewSet):
             elif completed.lower() == 'false':
                 queryset = queryset.filter(completed=False)
 
+        # Sin descripción en ?fields= no se lee la columna de la base de datos
+        if self.action in ('list', 'retrieve', 'search'):
+            requested = get_requested_fields(self.request)
+            if requested and 'description' not in requested:
+                queryset = queryset.defer('description')
+
         return queryset
 
+    def list(self, request, *args, **kwargs):
+        """Listado con ETag/Last-Modified: responde 304 si las tareas filtradas no cambiaron."""
+        etag, last_modified = get_list_validators(variant=f'api|{request.GET.urlencode()}')
+        render_list = super().list
+        return conditional_response(request, etag, last_modified, lambda: render_list(request, *args, **kwargs))
+
+    def retrieve(self, request, *args, **kwargs):
+        """Detalle con ETag/Last-Modified a partir de la fecha de actualización."""
+        task = self.get_object()
+        etag, last_modified = get_object_validators(task)
+        return conditional_response(
+            request, etag, last_modified, lambda: Response(self.get_serializer(task).data)
+        )
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Búsqueda de texto completo ordenada por relevancia (``?q=``, ``?limit=``)."""
+        text = request.query_params.get('q', '').strip()
+        if not text:
+            return Response(
+                {
+                    'success': False,
+                    'message': 'El parámetro q es requerido'
+                },
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        try:
+            limit = int(request.query_params.get('limit', SEARCH_RESULTS_LIMIT))
+        except ValueError:
+            limit = SEARCH_RESULTS_LIMIT
+        limit = max(1, min(limit, SEARCH_RESULTS_LIMIT))
+
+        tasks = rank_tasks(self.get_queryset(), text, limit)
+        serializer = self.get_serializer(tasks, many=True)
+        return Response({'results': serializer.data}, status=status.HTTP_200_OK)
+
     @action(detail=True, methods=['post', 'patch'])
     def toggle(self, request, pk=None):
 
@@ -99,4 +157,166 @@ class TaskViewSet(viewsets.ModelViewSet):
                 'message': 'Tarea eliminada exitosamente'
             },
             status=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
+
+    @action(detail=False, methods=['post', 'patch'], url_path='bulk')
+    def bulk(self, request):
+        """Crea (POST) o actualiza (PATCH) varias tareas en una sola transacción."""
+        if request.method == 'POST':
+            return self._bulk_create(request)
+        return self._bulk_update(request)
+
+    def _bulk_create(self, request):
+
+        serializer = TaskSerializer(data=request.data, many=True, max_length=BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+
+        created_by = request.user if request.user.is_authenticated else None
+        tasks = [Task(created_by=created_by, **item) for item in serializer.validated_data]
+
+        with TaskCounter.deferred():
+            tasks = Task.objects.bulk_create(tasks)
+            for task in tasks:
+                TaskCounter.track_change(None, (task.assigned_to_id, task.completed))
+        invalidate_task_stats()
+        invalidate_task_index()
+        publish_task_event('created', [task.id for task in tasks])
+
+        return Response(
+            {
+                'success': True,
+                'message': f'Se crearon {len(tasks)} tareas',
+                'data': [{'id': task.id, 'status': 'created'} for task in tasks]
+            },
+            status=status.HTTP_201_CREATED
+        )
+
+    def _bulk_update(self, request):
+
+        serializer = TaskBulkUpdateSerializer(data=request.data, many=True, partial=True, max_length=BULK_MAX_ITEMS)
+        serializer.is_valid(raise_exception=True)
+
+        items = serializer.validated_data
+        results = []
+        newly_completed = []
+
+        with TaskCounter.deferred():
+            tasks = self.get_queryset().select_for_update().in_bulk([item['id'] for item in items])
+            changed_fields = set()
+            for item in items:
+                task = tasks.get(item['id'])
+                if task is None:
+                    results.append({'id': item['id'], 'status': 'not_found'})
+                    continue
+
+                previous = (task.assigned_to_id, task.completed)
+                for field, value in item.items():
+                    if field != 'id':
+                        setattr(task, field, value)
+                        changed_fields.add(field)
+                if task.completed and not previous[1]:
+                    newly_completed.append(task)
+
+                TaskCounter.track_change(previous, (task.assigned_to_id, task.completed))
+                results.append({'id': task.id, 'status': 'updated'})
+
+            updated = [tasks[result['id']] for result in results if result['status'] == 'updated']
+            if updated and changed_fields:
+                # bulk_update no aplica auto_now, por eso se asigna la fecha explícitamente
+                now = timezone.now()
+                for task in updated:
+                    task.updated_at = now
+                Task.objects.bulk_update(updated, [*changed_fields, 'updated_at'], batch_size=1000)
+            OutboxEmail.enqueue(newly_completed)
+        invalidate_task_stats()
+        if changed_fields & {'title', 'assigned_to'}:
+            # bulk_update no envía post_save: el título y el dueño se actualizan aquí
+            index_tasks(updated)
+        if changed_fields:
+            publish_task_event('updated', [task.id for task in updated])
+
+        return Response(
+            {
+                'success': True,
+                'message': f'Se actualizaron {len(updated)} tareas',
+                'data': results
+            },
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-toggle')
+    def bulk_toggle(self, request):
+        """Cambia el estado de varias tareas con un solo UPDATE.
+
+        Con ``completed`` se fija ese estado; sin él se invierte el de cada tarea.
+        """
+        serializer = TaskBulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+        completed = serializer.validated_data['completed']
+
+        with TaskCounter.deferred():
+            tasks = list(
+                self.get_queryset().select_for_update().filter(pk__in=ids)
+                .only('id', 'assigned_to_id', 'created_by_id', 'completed')
+            )
+            found = {task.id for task in tasks}
+
+            newly_completed = []
+            for task in tasks:
+                now_completed = (not task.completed) if completed is None else completed
+                if now_completed and not task.completed:
+                    newly_completed.append(task)
+                TaskCounter.track_change((task.assigned_to_id, task.completed), (task.assigned_to_id, now_completed))
+
+            if completed is None:
+                new_value = Case(When(completed=True, then=Value(False)), default=Value(True))
+            else:
+                new_value = Value(completed)
+            Task.objects.filter(pk__in=found).update(completed=new_value, updated_at=timezone.now())
+            OutboxEmail.enqueue(newly_completed)
+        invalidate_task_stats()
+        publish_task_event('updated', found)
+
+        states = dict(Task.objects.filter(pk__in=found).values_list('id', 'completed'))
+        results = [
+            {'id': task_id, 'status': 'updated', 'completed': states[task_id]}
+            if task_id in found else {'id': task_id, 'status': 'not_found'}
+            for task_id in ids
+        ]
+
+        return Response(
+            {
+                'success': True,
+                'message': f'Se actualizaron {len(found)} tareas',
+                'data': results
+            },
+            status=status.HTTP_200_OK
+        )
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """Elimina varias tareas en una sola transacción."""
+        serializer = TaskBulkIdsSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data['ids']
+
+        # Las señales de cada fila se agrupan: contadores, estadísticas, índice y un solo evento "deleted"
+        with batched_task_signals():
+            queryset = self.get_queryset().filter(pk__in=ids)
+            found = set(queryset.values_list('id', flat=True))
+            queryset.delete()
+
+        results = [
+            {'id': task_id, 'status': 'deleted' if task_id in found else 'not_found'}
+            for task_id in ids
+        ]
+
+        return Response(
+            {
+                'success': True,
+                'message': f'Se eliminaron {len(found)} tareas',
+                'data': results
+            },
+            status=status.HTTP_200_OK
+        )
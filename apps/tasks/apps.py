@@ -5,3 +5,6 @@ class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     verbose_name = 'Tareas'
     name = 'apps.tasks'
+
+    def ready(self):
+        from . import signals  # noqa: F401
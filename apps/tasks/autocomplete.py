@@ -0,0 +1,310 @@
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, insort
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import connection, transaction
+
+from apps.users.models import User
+
+from .models import Task
+
+# Sugerencias que se retornan por búsqueda
+AUTOCOMPLETE_LIMIT = 8
+
+# Segundos tras los cuales el índice se reconstruye completo. Las señales solo
+# actualizan el índice del proceso que guardó la tarea; la reconstrucción
+# periódica (en segundo plano) incorpora los cambios hechos por otros workers
+AUTOCOMPLETE_MAX_AGE = 300
+
+# Entradas revisadas como máximo por búsqueda (acota el costo con filtros por usuario)
+AUTOCOMPLETE_MAX_SCAN = 2000
+
+
+def normalize(text):
+    """Minúsculas y sin tildes, para comparar prefijos."""
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+def _word_suffixes(text):
+    # "Revisar facturación" -> "revisar facturacion", "facturacion"
+    normalized = normalize(text).strip()
+    return [
+        normalized[index:]
+        for index, char in enumerate(normalized)
+        if char.isalnum() and (index == 0 or not normalized[index - 1].isalnum())
+    ]
+
+
+class PrefixIndex:
+    """Índice de prefijos en memoria sobre una lista ordenada de llaves.
+
+    Cada entrada se indexa desde el inicio de cada palabra, así "fact"
+    encuentra "Revisar facturación". La búsqueda es una bisección más un
+    recorrido del rango con el prefijo.
+    """
+
+    def __init__(self):
+        self._keys = []
+        self._entries = {}
+        self._lock = threading.Lock()
+        self.built_at = None
+        self.invalidated_at = None
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, entry_id):
+        return entry_id in self._entries
+
+    def load(self, entries, built_at=None):
+        """Reemplaza el contenido: ``entries`` son tuplas (id, texto, tipo, dueño).
+
+        ``built_at`` (``time.monotonic()``) es el momento en que se empezaron a
+        leer los datos; las invalidaciones posteriores dejan el índice vencido.
+        """
+        built_at = time.monotonic() if built_at is None else built_at
+        keys = []
+        stored = {}
+        for entry_id, label, kind, owner_id in entries:
+            suffixes = _word_suffixes(label)
+            stored[entry_id] = (label, kind, owner_id, suffixes)
+            keys.extend((suffix, entry_id) for suffix in suffixes)
+        keys.sort()
+
+        with self._lock:
+            self._keys = keys
+            self._entries = stored
+            self.built_at = built_at
+
+    def is_stale(self, max_age):
+        """Indica si el índice venció o fue invalidado después de construirse."""
+        return (
+            time.monotonic() - self.built_at > max_age
+            or (self.invalidated_at is not None and self.invalidated_at >= self.built_at)
+        )
+
+    def add(self, entry_id, label, kind, owner_id=None):
+        with self._lock:
+            self._remove(entry_id)
+            suffixes = _word_suffixes(label)
+            self._entries[entry_id] = (label, kind, owner_id, suffixes)
+            for suffix in suffixes:
+                insort(self._keys, (suffix, entry_id))
+
+    def remove(self, entry_id):
+        with self._lock:
+            self._remove(entry_id)
+
+    def _remove(self, entry_id):
+        entry = self._entries.pop(entry_id, None)
+        if entry is None:
+            return
+        for suffix in entry[3]:
+            index = bisect_left(self._keys, (suffix, entry_id))
+            if index < len(self._keys) and self._keys[index] == (suffix, entry_id):
+                del self._keys[index]
+
+    def search(self, prefix, limit=AUTOCOMPLETE_LIMIT, owner_id=None, kind=None):
+        """Retorna hasta ``limit`` sugerencias (texto, tipo) que empiezan con el prefijo.
+
+        Con ``owner_id`` y/o ``kind`` solo se consideran las entradas de ese usuario o tipo.
+        """
+        prefix = normalize(prefix).strip()
+        if not prefix:
+            return []
+
+        results = []
+        seen = set()
+        with self._lock:
+            keys = self._keys
+            index = bisect_left(keys, (prefix,))
+            end = min(len(keys), index + AUTOCOMPLETE_MAX_SCAN)
+            while index < end and len(results) < limit:
+                key, entry_id = keys[index]
+                index += 1
+                if not key.startswith(prefix):
+                    break
+                label, entry_kind, entry_owner_id, _ = self._entries[entry_id]
+                if owner_id is not None and entry_owner_id != owner_id:
+                    continue
+                if kind is not None and entry_kind != kind:
+                    continue
+                if label not in seen:
+                    seen.add(label)
+                    results.append((label, entry_kind))
+        return results
+
+
+task_index = PrefixIndex()
+
+
+def _task_entries():
+    for pk, title, assigned_to_id in Task.objects.order_by().values_list('id', 'title', 'assigned_to_id').iterator(chunk_size=5000):
+        yield ('task', pk), title, 'task', assigned_to_id
+
+    emails = (
+        Task.objects.order_by()
+        .exclude(assigned_to=None)
+        .values_list('assigned_to_id', 'assigned_to__email')
+        .distinct()
+    )
+    for user_id, email in emails:
+        yield ('user', user_id), email, 'user', user_id
+
+
+# Una sola reconstrucción a la vez por proceso
+_rebuild_lock = threading.Lock()
+
+# Cambios pedidos dentro de batched_index_changes: {pk: entrada o None}
+_pending_index_changes = ContextVar('task_index_changes', default=None)
+
+
+def _rebuild():
+    started = time.monotonic()
+    task_index.load(_task_entries(), built_at=started)
+
+
+def rebuild_task_index():
+    """Reconstruye el índice completo desde la base de datos (espera otra reconstrucción en curso)."""
+    with _rebuild_lock:
+        _rebuild()
+
+
+def _start_thread(target):
+    threading.Thread(target=target, name='autocomplete-rebuild', daemon=True).start()
+
+
+def _rebuild_in_background():
+    """Reconstruye en un hilo aparte, salvo que ya haya una reconstrucción en curso."""
+    if not _rebuild_lock.acquire(blocking=False):
+        return
+
+    def run():
+        try:
+            _rebuild()
+        finally:
+            _rebuild_lock.release()
+            # Cada hilo abre su propia conexión
+            connection.close()
+
+    try:
+        _start_thread(run)
+    except BaseException:
+        _rebuild_lock.release()
+        raise
+
+
+def get_task_index():
+    """Retorna el índice de autocompletado.
+
+    La primera búsqueda del proceso lo construye (una sola vez; las búsquedas
+    simultáneas esperan esa construcción). Si venció o fue invalidado, se
+    reconstruye en segundo plano y mientras tanto se sigue usando el anterior.
+    """
+    if task_index.built_at is None:
+        with _rebuild_lock:
+            if task_index.built_at is None:
+                _rebuild()
+    elif task_index.is_stale(AUTOCOMPLETE_MAX_AGE):
+        _rebuild_in_background()
+    return task_index
+
+
+def invalidate_task_index():
+    """Marca el índice como desactualizado (p. ej. tras cambios masivos); se reconstruye en segundo plano."""
+    task_index.invalidated_at = time.monotonic()
+
+
+def reset_task_index():
+    """Descarta el índice del proceso: la próxima búsqueda lo construye de nuevo (tests y comandos)."""
+    with _rebuild_lock:
+        task_index.load([])
+        task_index.built_at = None
+
+
+def _add_tasks(entries):
+    if task_index.built_at is None:
+        return
+    for pk, title, assigned_to_id in entries:
+        task_index.add(('task', pk), title, 'task', assigned_to_id)
+
+    # Emails de los usuarios asignados que aún no están en el índice, en una sola consulta
+    user_ids = {assigned_to_id for _, _, assigned_to_id in entries if assigned_to_id}
+    missing = [user_id for user_id in user_ids if ('user', user_id) not in task_index]
+    if missing:
+        for user_id, email in User.objects.filter(pk__in=missing).values_list('pk', 'email'):
+            task_index.add(('user', user_id), email, 'user', user_id)
+
+
+def _apply_changes(changes):
+    # changes: {pk: (pk, título, asignado) o None si la tarea se eliminó}
+    for pk, entry in changes.items():
+        if entry is None:
+            task_index.remove(('task', pk))
+    _add_tasks([entry for entry in changes.values() if entry is not None])
+
+
+def _schedule_changes(changes):
+    pending = _pending_index_changes.get()
+    if pending is not None:
+        # El último cambio de cada tarea es el que vale
+        for pk, entry in changes.items():
+            pending.pop(pk, None)
+            pending[pk] = entry
+        return
+    transaction.on_commit(lambda: _apply_changes(changes))
+
+
+def index_tasks(tasks):
+    """Actualiza las tareas en el índice al confirmarse la transacción (si el índice ya fue construido).
+
+    Un cambio de usuario asignado reemplaza al dueño anterior de la entrada.
+    """
+    if task_index.built_at is None:
+        return
+    _schedule_changes({task.pk: (task.pk, task.title, task.assigned_to_id) for task in tasks})
+
+
+def index_task(task):
+    """Actualiza una tarea en el índice al confirmarse la transacción."""
+    index_tasks([task])
+
+
+def unindex_task(task):
+    """Quita una tarea del índice al confirmarse la transacción."""
+    if task_index.built_at is None:
+        return
+    _schedule_changes({task.pk: None})
+
+
+@contextmanager
+def batched_index_changes():
+    """Agrupa los cambios del índice pedidos en el bloque y los aplica en un solo ``on_commit``.
+
+    Pensado para operaciones masivas, donde las señales de cada fila
+    registrarían un ``on_commit`` por tarea.
+    """
+    if _pending_index_changes.get() is not None:
+        yield
+        return
+
+    pending = {}
+    token = _pending_index_changes.set(pending)
+    try:
+        yield
+    finally:
+        _pending_index_changes.reset(token)
+    if pending:
+        transaction.on_commit(lambda: _apply_changes(pending))
+
+
+def suggest(user, text, limit=AUTOCOMPLETE_LIMIT):
+    """Sugerencias para la búsqueda: títulos y emails para administradores, solo sus tareas al resto."""
+    index = get_task_index()
+    if getattr(user, 'is_admin_or_superuser', False):
+        return index.search(text, limit)
+    return index.search(text, limit, owner_id=user.pk, kind='task')
@@ -0,0 +1,217 @@
+import statistics
+import time
+import tracemalloc
+from contextlib import contextmanager
+from importlib import import_module
+from io import BytesIO
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY
+from django.db import transaction
+from openpyxl import Workbook
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
+
+from .autocomplete import reset_task_index
+from .seeding import seed as seed_data
+from .stats import invalidate_task_stats
+
+
+@contextmanager
+def rollback_dataset(rows, batch_size=5000, seed=42, users=100):
+    """Crea tareas y usuarios sintéticos (``seeding.seed``) dentro de una transacción que se revierte al salir.
+
+    Todos los benchmarks usan los mismos datos para una misma semilla.
+    """
+    try:
+        with transaction.atomic():
+            seed_data(rows, users=users, seed=seed, batch_size=batch_size)
+            try:
+                yield
+            finally:
+                transaction.set_rollback(True)
+    finally:
+        # Las cachés se llenaron con datos que ya no existen
+        invalidate_task_stats()
+        reset_task_index()
+
+
+# Escenarios de run_benchmarks: (nombre, método, URL, parámetros, usa el id de una tarea)
+BENCHMARK_SCENARIOS = [
+    ('task_list', 'GET', 'tasks:task_list', {}, False),
+    ('task_list_partial_search', 'GET', 'tasks:task_list_partial', {'search': 'factura'}, False),
+    ('dashboard', 'GET', 'tasks:dashboard', {}, False),
+    ('api_list', 'GET', 'tasks:task-list', {}, False),
+    ('api_toggle', 'POST', 'tasks:task-toggle', {}, True),
+    ('export_csv', 'GET', 'tasks:export_csv', {}, False),
+    ('export_excel', 'GET', 'tasks:export_excel', {}, False),
+    ('export_pdf', 'GET', 'tasks:export_pdf', {}, False),
+]
+
+# Escenarios que recorren todas las tareas: se repiten menos veces
+EXPORT_SCENARIOS = {'export_csv', 'export_excel', 'export_pdf'}
+
+
+def get_request_host():
+    """Primer host concreto de ``ALLOWED_HOSTS`` para las peticiones simuladas."""
+    hosts = [host for host in settings.ALLOWED_HOSTS if host not in ('*', '') and not host.startswith('.')]
+    return hosts[0] if hosts else 'localhost'
+
+
+def create_login_session(user):
+    """Sesión autenticada para medir con un cliente HTTP externo (el llamador la elimina)."""
+    session = import_module(settings.SESSION_ENGINE).SessionStore()
+    session[SESSION_KEY] = user._meta.pk.value_to_string(user)
+    session[BACKEND_SESSION_KEY] = settings.AUTHENTICATION_BACKENDS[0]
+    session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+    session.save()
+    return session
+
+
+def latency_summary(timings):
+    """Percentiles de una lista de tiempos en milisegundos."""
+    if len(timings) < 2:
+        value = timings[0] if timings else 0
+        return {'p50_ms': value, 'p95_ms': value, 'p99_ms': value, 'mean_ms': value}
+    cuts = statistics.quantiles(timings, n=100, method='inclusive')
+    return {
+        'p50_ms': round(cuts[49], 3),
+        'p95_ms': round(cuts[94], 3),
+        'p99_ms': round(cuts[98], 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+    }
+
+
+def compare_results(results, baseline, threshold=0.25, min_delta_ms=2.0, min_delta_kb=64):
+    """Compara resultados con una línea base y retorna las regresiones.
+
+    Una regresión es: más consultas SQL, o un p50 o pico de memoria mayor que
+    la base en más de ``threshold`` (proporción). Las diferencias de tiempo
+    y memoria menores a ``min_delta_ms`` y ``min_delta_kb`` se ignoran (ruido
+    en los escenarios rápidos).
+    Retorna ``[(escenario, filas, métrica, base, actual)]``.
+    """
+    previous = {(result['scenario'], result['rows']): result for result in baseline['results']}
+    regressions = []
+    for result in results['results']:
+        before = previous.get((result['scenario'], result['rows']))
+        if before is None:
+            continue
+        if None not in (before['queries'], result['queries']) and result['queries'] > before['queries']:
+            regressions.append((result['scenario'], result['rows'], 'queries', before['queries'], result['queries']))
+        if (
+            result['p50_ms'] > before['p50_ms'] * (1 + threshold)
+            and result['p50_ms'] - before['p50_ms'] >= min_delta_ms
+        ):
+            regressions.append((result['scenario'], result['rows'], 'p50_ms', before['p50_ms'], result['p50_ms']))
+        if (
+            None not in (before['peak_kb'], result['peak_kb'])
+            and result['peak_kb'] > before['peak_kb'] * (1 + threshold)
+            and result['peak_kb'] - before['peak_kb'] >= min_delta_kb
+        ):
+            regressions.append((result['scenario'], result['rows'], 'peak_kb', before['peak_kb'], result['peak_kb']))
+    return regressions
+
+
+def measure(func, memory=True):
+    """Ejecuta una función y retorna (segundos, pico de memoria en bytes)."""
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+
+    peak = None
+    if memory:
+        # Segunda ejecución con tracemalloc para no distorsionar el tiempo medido
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    return elapsed, peak
+
+
+def legacy_excel(queryset):
+    """Implementación anterior de la exportación Excel (libro completo en memoria).
+
+    Se conserva solo como referencia para comparar en los benchmarks.
+    """
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "Tareas"
+
+    header_font = Font(bold=True, color="FFFFFF", size=12)
+    header_fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
+    header_alignment = Alignment(horizontal="center", vertical="center")
+    border = Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
+
+    headers = ['ID', 'Título', 'Descripción', 'Estado', 'Fecha de Creación', 'Última Actualización']
+    for col_num, header in enumerate(headers, 1):
+        cell = ws.cell(row=1, column=col_num)
+        cell.value = header
+        cell.font = header_font
+        cell.fill = header_fill
+        cell.alignment = header_alignment
+        cell.border = border
+
+    for row_num, task in enumerate(queryset.order_by('-created_at'), 2):
+        ws.cell(row=row_num, column=1).value = task.id
+        ws.cell(row=row_num, column=2).value = task.title
+        ws.cell(row=row_num, column=3).value = task.description
+        ws.cell(row=row_num, column=4).value = 'Completada' if task.completed else 'Pendiente'
+        ws.cell(row=row_num, column=5).value = task.created_at.strftime('%d/%m/%Y %H:%M')
+        ws.cell(row=row_num, column=6).value = task.updated_at.strftime('%d/%m/%Y %H:%M')
+        for col in range(1, 7):
+            ws.cell(row=row_num, column=col).border = border
+            ws.cell(row=row_num, column=col).alignment = Alignment(vertical="center")
+
+    output = BytesIO()
+    wb.save(output)
+    return output.getvalue()
+
+
+def legacy_pdf(queryset):
+    """Implementación anterior de la tabla PDF (una sola tabla con todas las tareas).
+
+    Se conserva solo como referencia para comparar en los benchmarks.
+    """
+    buffer = BytesIO()
+    doc = SimpleDocTemplate(buffer, pagesize=A4)
+
+    tasks_data = [['ID', 'Título', 'Estado', 'Fecha Creación']]
+    for task in queryset.order_by('-created_at'):
+        tasks_data.append([
+            str(task.id),
+            task.title[:40] + '...' if len(task.title) > 40 else task.title,
+            '✓ Completada' if task.completed else '○ Pendiente',
+            task.created_at.strftime('%d/%m/%Y'),
+        ])
+
+    tasks_table = Table(tasks_data, colWidths=[0.5 * inch, 3.5 * inch, 1.5 * inch, 1.5 * inch])
+    tasks_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 11),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+        ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 9),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+        ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ]))
+
+    doc.build([tasks_table])
+    return buffer.getvalue()
@@ -0,0 +1,75 @@
+import hashlib
+from functools import wraps
+
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+
+from .fragments import FRAGMENT_VERSION
+from .models import TaskCounter
+
+
+def get_list_validators(scope_user_id=None, variant=''):
+    """Calcula (ETag, Last-Modified) de una lista de tareas sin leer la tabla de tareas.
+
+    Usa la fila del contador del alcance (global o del usuario): cada alta,
+    baja, edición o cambio de estado de una tarea del alcance actualiza su
+    fecha, así que basta una lectura por clave única. ``variant`` distingue las
+    respuestas del mismo alcance (rol, filtros).
+    """
+    counter = (
+        TaskCounter.objects.filter(user_id=scope_user_id)
+        .values_list('updated_at', 'total', 'completed').first()
+    )
+    last_modified, total, completed = counter or (None, 0, 0)
+
+    raw = '|'.join(str(part) for part in (
+        FRAGMENT_VERSION,
+        variant,
+        total,
+        completed,
+        last_modified and last_modified.isoformat(),
+    ))
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), last_modified
+
+
+def get_object_validators(task, variant=''):
+    """Calcula (ETag, Last-Modified) de una sola tarea."""
+    raw = f'{FRAGMENT_VERSION}|{variant}|{task.pk}|{task.updated_at.isoformat()}'
+    return quote_etag(hashlib.md5(raw.encode()).hexdigest()), task.updated_at
+
+
+def conditional_response(request, etag, last_modified, render):
+    """Retorna 304 si el cliente ya tiene la versión actual; si no, llama a ``render()``.
+
+    Las respuestas quedan como privadas y el navegador las revalida en cada uso.
+    """
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is None:
+        response = render()
+        if response.status_code != 200:
+            return response
+
+    response.headers.setdefault('ETag', etag)
+    if timestamp is not None:
+        response.headers.setdefault('Last-Modified', http_date(timestamp))
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def condition_on_tasks(get_validators):
+    """Decorador de vistas GET que responden 304 si la lista de tareas no cambió.
+
+    ``get_validators(request, *args, **kwargs)`` retorna (ETag, Last-Modified).
+    """
+    def decorator(view_func):
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_func(request, *args, **kwargs)
+            etag, last_modified = get_validators(request, *args, **kwargs)
+            return conditional_response(
+                request, etag, last_modified, lambda: view_func(request, *args, **kwargs)
+            )
+        return _wrapped_view
+    return decorator
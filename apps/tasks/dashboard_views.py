@@ -1,16 +1,25 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
+from django.conf import settings
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import HttpResponse, JsonResponse
+from django.core.handlers.asgi import ASGIRequest
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.utils.crypto import constant_time_compare
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q, Count
-from django.contrib import messages
-from .models import Task
+from django.db.models.functions import Coalesce
+from .events import EVENTS_MAX_ROWS, stream_task_events
+from .models import ExportJob, Task
+from .filters import filter_tasks, get_filter_params
+from .fragments import get_fragment_cache_stats
+from .profiling import view_metrics
+from .rendering import render_task_page, render_task_rows
+from .stats import get_counter_stats
 from apps.users.models import User
 
 
 def is_admin_or_superuser(user):
-    """Verifica si el usuario es administrador o superusuario."""
-    return user.is_superuser or user.groups.filter(name='Administrador').exists()
+    """Verifica si el usuario es administrador o superusuario (memoizado por request)."""
+    return getattr(user, 'is_admin_or_superuser', False)
 
 
 @login_required
@@ -22,59 +31,124 @@ def dashboard(request):
     tasks = Task.objects.select_related('assigned_to', 'created_by').all()
     
     # Aplicar filtros
-    search = request.GET.get('search', '')
-    filter_status = request.GET.get('filter', 'all')
-    filter_user = request.GET.get('user', '')
+    filters = get_filter_params(request)
+    search = filters['search']
+    filter_status = filters['filter_status']
+    filter_user = filters['filter_user']
+    tasks = filter_tasks(tasks, **filters)
     
-    if search:
-        tasks = tasks.filter(
-            Q(title__icontains=search) | 
-            Q(description__icontains=search) |
-            Q(assigned_to__email__icontains=search)
-        )
-    
-    if filter_status == 'completed':
-        tasks = tasks.filter(completed=True)
-    elif filter_status == 'pending':
-        tasks = tasks.filter(completed=False)
-    
-    if filter_user:
-        tasks = tasks.filter(assigned_to_id=filter_user)
+    # Estadísticas generales (fila global de los contadores)
+    stats = get_counter_stats()
     
-    # Estadísticas generales
-    total_tasks = Task.objects.count()
-    completed_tasks = Task.objects.filter(completed=True).count()
-    pending_tasks = Task.objects.filter(completed=False).count()
-    completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
-    
-    # Estadísticas por usuario
+    # Estadísticas por usuario desde los contadores: O(usuarios) en vez de O(tareas)
     user_stats = User.objects.filter(
         groups__name='Usuario Limitado'
     ).annotate(
-        total=Count('assigned_tasks'),
-        completed=Count('assigned_tasks', filter=Q(assigned_tasks__completed=True))
+        total=Coalesce('task_counter__total', 0),
+        completed=Coalesce('task_counter__completed', 0)
     ).order_by('-total')
     
     # Lista de usuarios para asignar
     users_list = User.objects.filter(groups__name='Usuario Limitado')
+
+    # Últimas exportaciones en segundo plano del usuario
+    export_jobs = ExportJob.objects.filter(requested_by=request.user)[:5]
     
+    # Solo se renderiza la primera página; las siguientes se cargan al hacer scroll
+    task_rows = render_task_page(
+        request,
+        'tasks/partials/dashboard_task_item.html',
+        tasks,
+        reverse('tasks:dashboard_tasks_partial'),
+    )
+
     context = {
-        'tasks': tasks,
+        'task_rows': task_rows,
+        'tasks_count': tasks.count(),
         'search': search,
         'filter_status': filter_status,
         'filter_user': filter_user,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'pending_tasks': pending_tasks,
-        'completion_rate': completion_rate,
+        'total_tasks': stats['total'],
+        'completed_tasks': stats['completed'],
+        'pending_tasks': stats['pending'],
+        'completion_rate': stats['completion_rate'],
         'user_stats': user_stats,
         'users_list': users_list,
+        'export_jobs': export_jobs,
+        'export_formats': ExportJob.FORMAT_CHOICES,
         'is_dashboard': True,
     }
     
     return render(request, 'tasks/dashboard.html', context)
 
 
+@login_required
+@user_passes_test(is_admin_or_superuser, login_url='tasks:task_list')
+@require_http_methods(["GET"])
+def dashboard_tasks_partial(request):
+    """Página siguiente de la lista de tareas del dashboard (HTMX, ``?cursor=``)."""
+    tasks = filter_tasks(
+        Task.objects.select_related('assigned_to', 'created_by'),
+        **get_filter_params(request)
+    )
+    task_rows = render_task_page(
+        request,
+        'tasks/partials/dashboard_task_item.html',
+        tasks,
+        reverse('tasks:dashboard_tasks_partial'),
+    )
+    return HttpResponse(task_rows)
+
+
+@login_required
+@user_passes_test(is_admin_or_superuser, login_url='tasks:task_list')
+@require_http_methods(["GET"])
+def dashboard_task_rows(request):
+    """Filas del dashboard de las tareas indicadas (``?id=1&id=2``), para aplicar eventos."""
+    ids = [int(value) for value in request.GET.getlist('id') if value.isdigit()][:EVENTS_MAX_ROWS]
+    tasks = Task.objects.select_related('assigned_to', 'created_by').filter(pk__in=ids).order_by('-created_at', '-id')
+    return HttpResponse(render_task_rows(request, 'tasks/partials/dashboard_task_item.html', list(tasks)))
+
+
+@login_required
+@user_passes_test(is_admin_or_superuser, login_url='tasks:task_list')
+@require_http_methods(["GET"])
+async def dashboard_task_events(request):
+    """Stream Server-Sent Events con los cambios de tareas para el dashboard.
+
+    Requiere un servidor ASGI; bajo WSGI responde 204 y el navegador no reconecta.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    response = StreamingHttpResponse(stream_task_events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@login_required
+@user_passes_test(is_admin_or_superuser, login_url='tasks:task_list')
+@require_http_methods(["GET"])
+def fragment_cache_stats(request):
+    """Métricas de aciertos y fallos de la caché de fragmentos de este proceso."""
+    return JsonResponse(get_fragment_cache_stats())
+
+
+@require_http_methods(["GET"])
+def profiling_metrics(request):
+    """Métricas de las peticiones en formato Prometheus (token ``PROFILING_METRICS_TOKEN`` o administrador)."""
+    token = getattr(settings, 'PROFILING_METRICS_TOKEN', '')
+    authorization = request.headers.get('Authorization', '')
+    allowed = (
+        constant_time_compare(authorization, f'Bearer {token}') if token and authorization
+        else is_admin_or_superuser(request.user)
+    )
+    if not allowed:
+        return HttpResponseForbidden()
+    return HttpResponse(view_metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
+
 @login_required
 @user_passes_test(is_admin_or_superuser, login_url='tasks:task_list')
 @require_http_methods(["POST"])
@@ -153,7 +227,7 @@ def dashboard_task_detail(request, pk):
 def dashboard_task_update(request, pk):
     """Actualiza una tarea desde el dashboard (HTMX)."""
     try:
-        task = get_object_or_404(Task, pk=pk)
+        task = get_object_or_404(Task.objects.select_related('created_by'), pk=pk)
 
         title = request.POST.get('title', '').strip()
         description = request.POST.get('description', '').strip()
@@ -200,7 +274,7 @@ def dashboard_task_update(request, pk):
 def dashboard_task_toggle(request, pk):
     """Alterna el estado completado de una tarea desde dashboard (HTMX)."""
     try:
-        task = get_object_or_404(Task, pk=pk)
+        task = get_object_or_404(Task.objects.select_related('assigned_to', 'created_by'), pk=pk)
         task.toggle_completed()
 
         context = {
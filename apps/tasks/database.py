@@ -0,0 +1,19 @@
+from django.conf import settings
+
+
+def apply_sqlite_pragmas(connection):
+    """Aplica ``SQLITE_PRAGMAS`` a una conexión SQLite recién abierta.
+
+    WAL permite leer mientras otro proceso escribe (servidor y workers), y
+    ``busy_timeout`` espera el bloqueo de escritura en vez de fallar con
+    "database is locked".
+    """
+    if connection.vendor != 'sqlite':
+        return
+    # Cursor de sqlite3 directo: no pasa por el registro de consultas de Django
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
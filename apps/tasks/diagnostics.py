@@ -0,0 +1,171 @@
+import logging
+import re
+import time
+from collections import Counter
+from contextlib import ContextDecorator, ExitStack, contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+from .explain import explain_sql, parse_plan
+from .profiling import get_call_site, template_stack
+
+logger = logging.getLogger(__name__)
+
+# Identificadores entre comillas (se conservan), textos, marcadores y números (se reemplazan por ?)
+_LITERAL_RE = re.compile(r""""(?:[^"]|"")*"|'(?:[^']|'')*'|%s|\?|\b\d+(?:\.\d+)?\b""")
+
+# Listas de valores de largo variable: IN (?, ?, ?) y VALUES (...), (...)
+_LIST_RE = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS_RE = re.compile(r'\(\.\.\.\)(?:\s*,\s*\(\.\.\.\))+')
+_SPACE_RE = re.compile(r'\s+')
+
+# Solo las lecturas cuentan como N+1 y se explican
+_READ_RE = re.compile(r'\s*(?:SELECT|WITH)\b', re.IGNORECASE)
+
+
+class NPlusOneDetected(AssertionError):
+    """Una misma consulta se repitió más veces que las permitidas (probable N+1)."""
+
+
+def fingerprint(sql):
+    """Huella de una consulta: los literales y listas de valores se reemplazan por ``?`` y ``(...)``.
+
+    Dos consultas que solo difieren en sus valores tienen la misma huella.
+    """
+    sql = _LITERAL_RE.sub(lambda match: match.group() if match.group().startswith('"') else '?', sql)
+    sql = _ROWS_RE.sub('(...)', _LIST_RE.sub('(...)', sql))
+    return _SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryDiagnostics:
+    """Agrupa las consultas por huella y guarda las lentas; se instala como ``execute_wrapper``.
+
+    Una huella de lectura que se repite ``threshold`` veces se marca como N+1
+    con el origen de esa repetición. Las consultas de ``slow_ms`` o más se
+    guardan para explicarlas al terminar (``slow_ms=None`` no guarda ninguna).
+    """
+
+    def __init__(self, threshold=5, slow_ms=None):
+        self.threshold = threshold
+        self.slow = slow_ms / 1000 if slow_ms is not None else None
+        self.counts = Counter()
+        self.repeated = {}
+        self.slow_queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record(sql, params, time.perf_counter() - start, context['connection'].alias, many)
+
+    def record(self, sql, params, duration, using=DEFAULT_DB_ALIAS, many=False):
+        if many or not _READ_RE.match(sql):
+            return
+        if self.slow is not None and duration >= self.slow:
+            self.slow_queries.append((duration, sql, params, using, get_call_site()))
+        key = fingerprint(sql)
+        self.counts[key] += 1
+        if self.counts[key] == self.threshold:
+            self.repeated[key] = (sql, get_call_site())
+
+    @contextmanager
+    def capture(self):
+        """Instala el wrapper en todas las conexiones y sigue las plantillas en render."""
+        with ExitStack() as stack:
+            stack.enter_context(template_stack())
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(self))
+            yield self
+
+    def n_plus_one(self):
+        """Consultas repetidas: [(huella, veces, sql de ejemplo, origen)], de más a menos veces."""
+        return sorted(
+            ((key, self.counts[key], sql, site) for key, (sql, site) in self.repeated.items()),
+            key=lambda item: -item[1],
+        )
+
+    def explain_slow(self):
+        """Consultas lentas con su plan: [(segundos, sql, origen, plan)]."""
+        explained = []
+        for duration, sql, params, using, site in sorted(self.slow_queries, key=lambda item: -item[0]):
+            try:
+                plan = explain_sql(sql, params, using)
+            except DatabaseError as error:
+                # Transacción abortada o consulta que el motor no puede explicar
+                plan = f'(sin plan: {error})'
+            explained.append((duration, sql, site, plan))
+        return explained
+
+    def check(self, label, strict=False):
+        """Registra las consultas lentas y los N+1; con ``strict`` los N+1 lanzan ``NPlusOneDetected``."""
+        for duration, sql, site, plan in self.explain_slow():
+            indexes, sorts, full_scan = parse_plan(plan)
+            notes = [f'índices: {", ".join(indexes) or "ninguno"}']
+            if sorts:
+                notes.append('ordena aparte')
+            if full_scan:
+                notes.append('recorre la tabla completa de tareas')
+            logger.warning(
+                f'{label}: consulta lenta de {duration * 1000:.1f} ms en {site} ({"; ".join(notes)})\n'
+                f'  {sql}\n  ' + plan.replace('\n', '\n  ')
+            )
+
+        repeated = self.n_plus_one()
+        if not repeated:
+            return
+        message = f'{label}: {len(repeated)} consultas repetidas (probable N+1):\n' + '\n'.join(
+            f'  {count} veces en {site}: {key}' for key, count, _, site in repeated
+        )
+        if strict:
+            raise NPlusOneDetected(message)
+        logger.warning(message)
+
+
+class detect_n_plus_one(ContextDecorator):
+    """Falla si el bloque (o la función decorada) repite una lectura ``threshold`` veces o más.
+
+    Uso: ``with detect_n_plus_one(): ...`` o ``@detect_n_plus_one(3)``.
+    """
+
+    def __init__(self, threshold=None):
+        self.threshold = threshold or getattr(settings, 'QUERY_DIAGNOSTICS_N_PLUS_ONE', 5)
+
+    def __enter__(self):
+        self.diagnostics = QueryDiagnostics(self.threshold)
+        self.context = self.diagnostics.capture()
+        return self.context.__enter__()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None:
+            self.diagnostics.check('bloque', strict=True)
+        return False
+
+
+class QueryDiagnosticsMiddleware:
+    """Detecta N+1 y consultas lentas en cada petición, activado con ``QUERY_DIAGNOSTICS_ENABLED``.
+
+    Las consultas de ``QUERY_DIAGNOSTICS_SLOW_QUERY_MS`` o más se registran con
+    su plan (``EXPLAIN``). Una lectura repetida ``QUERY_DIAGNOSTICS_N_PLUS_ONE``
+    veces se registra como N+1, o hace fallar la petición con
+    ``QUERY_DIAGNOSTICS_STRICT`` (pensado para los tests).
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'QUERY_DIAGNOSTICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.threshold = getattr(settings, 'QUERY_DIAGNOSTICS_N_PLUS_ONE', 5)
+        self.slow_ms = getattr(settings, 'QUERY_DIAGNOSTICS_SLOW_QUERY_MS', 100)
+        self.strict = getattr(settings, 'QUERY_DIAGNOSTICS_STRICT', False)
+
+    def __call__(self, request):
+        diagnostics = QueryDiagnostics(self.threshold, self.slow_ms)
+        with diagnostics.capture():
+            response = self.get_response(request)
+        # El plan se pide fuera del wrapper para no registrar el propio EXPLAIN
+        diagnostics.check(f'{request.method} {request.path}', strict=self.strict)
+        return response
@@ -0,0 +1,208 @@
+import asyncio
+import json
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import transaction
+from django.utils.module_loading import import_string
+
+# Acciones que se notifican a los dashboards suscritos
+EVENT_ACTIONS = ('created', 'updated', 'deleted')
+
+# Segundos entre comentarios keep-alive del stream (evita que proxies corten la conexión)
+EVENTS_KEEPALIVE = 15
+
+# Milisegundos que espera el navegador antes de reconectar
+EVENTS_RETRY = 3000
+
+# Eventos pendientes por suscriptor; si se llena, el cliente recibe ``resync``
+EVENTS_QUEUE_SIZE = 1000
+
+# Filas que el cliente puede pedir de una vez tras un evento
+EVENTS_MAX_ROWS = 100
+
+
+class Subscription:
+    """Cola de eventos de un cliente conectado, consumida desde su event loop.
+
+    ``put()`` puede llamarse desde cualquier hilo (p. ej. una vista síncrona
+    que guardó una tarea); el evento se encola en el loop del suscriptor.
+    """
+
+    def __init__(self, broker, loop):
+        self.broker = broker
+        self.loop = loop
+        self.queue = asyncio.Queue(EVENTS_QUEUE_SIZE)
+        self.overflowed = False
+
+    def put(self, event):
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            # El loop ya se cerró: el cliente se desconectó sin cancelar la suscripción
+            self.close()
+
+    def _put(self, event):
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Espera el próximo evento; lanza ``TimeoutError`` si no llega ninguno a tiempo."""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def drain(self):
+        """Retorna los eventos ya encolados sin esperar."""
+        events = []
+        while not self.queue.empty():
+            events.append(self.queue.get_nowait())
+        return events
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class InProcessBroker:
+    """Broker en memoria: entrega los eventos a los suscriptores de este proceso.
+
+    Un backend compartido entre procesos (Redis pub/sub, LISTEN/NOTIFY de
+    PostgreSQL) hereda de esta clase, redefine ``publish()`` para enviar el
+    evento al canal compartido y llama a ``deliver()`` al recibirlo.
+    """
+
+    def __init__(self):
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._subscribers)
+
+    def subscribe(self):
+        """Registra un suscriptor en el event loop actual."""
+        subscription = Subscription(self, asyncio.get_running_loop())
+        with self._lock:
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        self.deliver(event)
+
+    def deliver(self, event):
+        """Entrega un evento a los suscriptores locales."""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscription in subscribers:
+            subscription.put(event)
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """Retorna el broker configurado en ``TASK_EVENTS_BROKER`` (uno por proceso)."""
+    global _broker
+    if _broker is None:
+        with _broker_lock:
+            if _broker is None:
+                path = getattr(settings, 'TASK_EVENTS_BROKER', 'apps.tasks.events.InProcessBroker')
+                _broker = import_string(path)()
+    return _broker
+
+
+# Ids pendientes por acción mientras se ejecuta un bloque batched_task_events()
+_pending_events = ContextVar('task_events', default=None)
+
+
+def publish_task_event(action, task_ids):
+    """Publica el cambio de una o varias tareas cuando se confirma la transacción."""
+    pending = _pending_events.get()
+    if pending is not None:
+        pending[action].update(dict.fromkeys(task_ids))
+        return
+    event = {'action': action, 'ids': list(task_ids)}
+    if event['ids']:
+        transaction.on_commit(lambda: get_broker().publish(event))
+
+
+@contextmanager
+def batched_task_events():
+    """Agrupa los eventos publicados en el bloque (p. ej. por las señales de cada fila) y al
+    final publica uno por acción con todos los ids.
+
+    Pensado para operaciones masivas: un evento por fila llenaría la cola de
+    cada suscriptor y forzaría un ``resync`` en todos los dashboards.
+    """
+    if _pending_events.get() is not None:
+        yield
+        return
+
+    pending = {action: {} for action in EVENT_ACTIONS}
+    token = _pending_events.set(pending)
+    try:
+        yield
+    finally:
+        _pending_events.reset(token)
+    for action, ids in pending.items():
+        publish_task_event(action, ids)
+
+
+def merge_events(events):
+    """Agrupa eventos en un diff ``{created, updated, deleted}`` con los ids de cada acción.
+
+    Una tarea creada y luego modificada queda como creada; una eliminada solo
+    aparece en ``deleted``.
+    """
+    diff = {action: {} for action in EVENT_ACTIONS}
+    for event in events:
+        for task_id in event['ids']:
+            if event['action'] == 'deleted':
+                diff['created'].pop(task_id, None)
+                diff['updated'].pop(task_id, None)
+                diff['deleted'][task_id] = None
+            elif event['action'] == 'updated' and task_id in diff['created']:
+                continue
+            else:
+                diff[event['action']][task_id] = None
+    return {action: list(ids) for action, ids in diff.items()}
+
+
+def format_sse(event, data):
+    """Mensaje Server-Sent Events con datos JSON."""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
+
+
+async def stream_task_events(keepalive=EVENTS_KEEPALIVE):
+    """Stream SSE con los diffs de tareas publicados mientras el cliente está conectado.
+
+    Los eventos que llegan juntos se envían en un solo mensaje ``tasks``. Si la
+    cola del cliente se llenó se envía ``resync`` y el cliente recarga la lista.
+    """
+    subscription = get_broker().subscribe()
+    try:
+        yield f'retry: {EVENTS_RETRY}\n\n'
+        while True:
+            try:
+                first = await subscription.get(timeout=keepalive)
+            except TimeoutError:
+                yield ': keepalive\n\n'
+                continue
+
+            if subscription.overflowed:
+                subscription.drain()
+                subscription.overflowed = False
+                yield format_sse('resync', {})
+                continue
+
+            yield format_sse('tasks', merge_events([first, *subscription.drain()]))
+    finally:
+        subscription.close()
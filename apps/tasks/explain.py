@@ -0,0 +1,66 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.utils import timezone
+
+from .models import Task
+from .rendering import encode_cursor, page_queryset
+
+# Índices usados en el plan: SQLite ("USING INDEX x") y PostgreSQL ("Index Scan using x")
+_INDEX_RE = re.compile(
+    r'USING (?:COVERING )?INDEX (\w+)'
+    r'|Index (?:Only )?Scan(?: Backward)? using (\w+)'
+    r'|Bitmap Index Scan on (\w+)'
+)
+
+# Ordenamiento aparte: el índice no entrega las filas en el orden pedido
+_SORT_RE = re.compile(r'USE TEMP B-TREE FOR (?:RIGHT PART OF )?ORDER BY|^\s*(?:->\s*)?(?:Incremental )?Sort\b', re.MULTILINE)
+
+# Recorrido de la tabla completa de tareas
+_FULL_SCAN_RE = re.compile(rf'SCAN {Task._meta.db_table}$|Seq Scan on {Task._meta.db_table}\b', re.MULTILINE)
+
+
+def get_hot_queries(user_id):
+    """Consultas frecuentes de las listas y el dashboard: [(nombre, queryset)].
+
+    Las páginas se construyen con ``page_queryset``, el mismo código de las vistas.
+    """
+    # Posición arbitraria para las páginas siguientes; el plan no depende del valor
+    cursor = encode_cursor(Task(pk=1, created_at=timezone.now()))
+    tasks = Task.objects.all()
+    mine = tasks.filter(assigned_to_id=user_id)
+    return [
+        ('lista', page_queryset(tasks)),
+        ('lista página siguiente', page_queryset(tasks, cursor)),
+        ('pendientes', page_queryset(tasks.filter(completed=False))),
+        ('completadas', page_queryset(tasks.filter(completed=True))),
+        ('usuario', page_queryset(mine)),
+        ('usuario página siguiente', page_queryset(mine, cursor)),
+        ('usuario pendientes', page_queryset(mine.filter(completed=False))),
+        ('usuario completadas', page_queryset(mine.filter(completed=True))),
+    ]
+
+
+def parse_plan(plan):
+    """Índices usados, si ordena aparte y si recorre la tabla completa de tareas."""
+    indexes = []
+    for match in _INDEX_RE.finditer(plan):
+        name = next(group for group in match.groups() if group)
+        if name not in indexes:
+            indexes.append(name)
+    return indexes, bool(_SORT_RE.search(plan)), bool(_FULL_SCAN_RE.search(plan))
+
+
+def explain(queryset, **options):
+    """Plan de una consulta: (texto, índices usados, ordena aparte, recorre la tabla completa)."""
+    plan = queryset.explain(**options)
+    return (plan, *parse_plan(plan))
+
+
+def explain_sql(sql, params=None, using=DEFAULT_DB_ALIAS):
+    """Plan de una consulta SQL ya generada (p. ej. la capturada por un ``execute_wrapper``)."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(f'{connection.ops.explain_query_prefix()} {sql}', params)
+        # SQLite retorna (id, padre, -, detalle) por nodo; PostgreSQL una línea por fila
+        return '\n'.join(str(row[-1]) for row in cursor.fetchall())
@@ -0,0 +1,310 @@
+import csv
+from datetime import datetime
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, Border, Side, NamedStyle
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib.enums import TA_CENTER
+
+# Tamaño de bloque para leer filas desde la base de datos con cursores del servidor
+EXPORT_CHUNK_SIZE = 2000
+
+EXPORT_HEADERS = [
+    'ID',
+    'Título',
+    'Descripción',
+    'Estado',
+    'Fecha de Creación',
+    'Última Actualización'
+]
+
+EXPORT_FIELDS = ('id', 'title', 'description', 'completed', 'created_at', 'updated_at')
+
+
+def iter_task_rows(queryset, chunk_size=EXPORT_CHUNK_SIZE, progress=None):
+    """Genera las filas de exportación leyendo la base de datos por bloques.
+
+    Si se entrega ``progress``, se llama con el número de filas procesadas
+    al terminar cada bloque y al final.
+    """
+    rows = queryset.order_by('-created_at').values_list(*EXPORT_FIELDS).iterator(chunk_size=chunk_size)
+    count = 0
+    for task_id, title, description, completed, created_at, updated_at in rows:
+        count += 1
+        if progress and count % chunk_size == 0:
+            progress(count)
+        yield [
+            task_id,
+            title,
+            description,
+            'Completada' if completed else 'Pendiente',
+            created_at.strftime('%d/%m/%Y %H:%M'),
+            updated_at.strftime('%d/%m/%Y %H:%M'),
+        ]
+    if progress:
+        progress(count)
+
+
+class Echo:
+    """Pseudo-buffer que devuelve lo escrito en vez de almacenarlo."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, progress=None):
+    """Genera el CSV línea por línea, con BOM inicial para Excel."""
+    writer = csv.writer(Echo())
+    yield '\ufeff'
+    yield writer.writerow(EXPORT_HEADERS)
+    for row in iter_task_rows(queryset, progress=progress):
+        yield writer.writerow(row)
+
+
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+XLSX_COLUMN_WIDTHS = {'A': 8, 'B': 40, 'C': 50, 'D': 15, 'E': 20, 'F': 20}
+
+_thin = Side(style='thin')
+_border = Border(left=_thin, right=_thin, top=_thin, bottom=_thin)
+
+
+def _xlsx_styles():
+    """Crea los estilos compartidos de encabezado y cuerpo (una sola vez por libro)."""
+    header = NamedStyle(
+        name='task_header',
+        font=Font(bold=True, color="FFFFFF", size=12),
+        fill=PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid"),
+        alignment=Alignment(horizontal="center", vertical="center"),
+        border=_border,
+    )
+    body = NamedStyle(
+        name='task_body',
+        alignment=Alignment(vertical="center"),
+        border=_border,
+    )
+    return header, body
+
+
+def _styled_row(ws, values, style_name):
+    """Construye una fila de celdas de solo escritura con un estilo con nombre."""
+    row = []
+    for value in values:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.style = style_name
+        row.append(cell)
+    return row
+
+
+def write_tasks_csv(output, queryset, progress=None):
+    """Escribe el CSV en un archivo binario abierto."""
+    for line in iter_csv(queryset, progress=progress):
+        output.write(line.encode('utf-8'))
+
+
+def write_tasks_xlsx(output, queryset, stats, progress=None):
+    """Escribe el libro Excel en modo solo escritura sobre un archivo abierto.
+
+    Las filas se agregan en bloque a medida que se leen de la base de datos,
+    por lo que la memoria usada no depende del número de tareas.
+    """
+    wb = Workbook(write_only=True)
+    header_style, body_style = _xlsx_styles()
+    wb.add_named_style(header_style)
+    wb.add_named_style(body_style)
+
+    # Hoja de tareas
+    ws = wb.create_sheet("Tareas")
+    for column, width in XLSX_COLUMN_WIDTHS.items():
+        ws.column_dimensions[column].width = width
+
+    ws.append(_styled_row(ws, EXPORT_HEADERS, header_style.name))
+    for values in iter_task_rows(queryset, progress=progress):
+        ws.append(_styled_row(ws, values, body_style.name))
+
+    # Hoja de estadísticas
+    ws_stats = wb.create_sheet("Estadísticas")
+    ws_stats.column_dimensions['A'].width = 25
+    ws_stats.column_dimensions['B'].width = 15
+
+    ws_stats.append(_styled_row(ws_stats, ['Métrica', 'Valor'], header_style.name))
+    stats_data = [
+        ['Total de Tareas', stats['total']],
+        ['Tareas Completadas', stats['completed']],
+        ['Tareas Pendientes', stats['pending']],
+        ['Porcentaje Completado', f"{stats['completion_rate']:.2f}%"],
+    ]
+    for values in stats_data:
+        ws_stats.append(_styled_row(ws_stats, values, body_style.name))
+
+    wb.save(output)
+
+
+# Filas por tabla del PDF: cada bloque cabe en una página y repite el encabezado
+PDF_ROWS_PER_TABLE = 30
+
+PDF_HEADERS = ['ID', 'Título', 'Estado', 'Fecha Creación']
+
+PDF_COLUMN_WIDTHS = [0.5 * inch, 3.5 * inch, 1.5 * inch, 1.5 * inch]
+
+# Estilo compartido por todas las tablas de tareas (se crea una sola vez)
+PDF_TASKS_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 11),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.whitesmoke),
+    ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
+    ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 1), (-1, -1), 9),
+    ('TOPPADDING', (0, 1), (-1, -1), 6),
+    ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+])
+
+
+class LazyFlowables(list):
+    """Lista de flowables que se rellena desde un generador a medida que se consume.
+
+    ``SimpleDocTemplate.build`` consulta ``len()`` antes de procesar cada
+    elemento; en ese momento se agregan los siguientes bloques, así nunca
+    hay en memoria más que unas pocas tablas. Depende de ese detalle interno
+    de reportlab (igual en 4.0.7 y 5.0.1); ``test_pdf_build_consumes_flowables_lazily``
+    falla si una actualización lo cambia.
+    """
+
+    def __init__(self, head, source, prefetch=2):
+        super().__init__(head)
+        self._source = source
+        self._prefetch = prefetch
+
+    def __len__(self):
+        while self._source is not None and list.__len__(self) < self._prefetch:
+            try:
+                self.append(next(self._source))
+            except StopIteration:
+                self._source = None
+        return list.__len__(self)
+
+
+def iter_pdf_tables(queryset, rows_per_table=PDF_ROWS_PER_TABLE, progress=None):
+    """Genera tablas de tamaño fijo leyendo las tareas por bloques."""
+    rows = queryset.order_by('-created_at').values_list(
+        'id', 'title', 'completed', 'created_at'
+    ).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    count = 0
+    chunk = [PDF_HEADERS]
+    for task_id, title, completed, created_at in rows:
+        chunk.append([
+            str(task_id),
+            title[:40] + '...' if len(title) > 40 else title,
+            '✓ Completada' if completed else '○ Pendiente',
+            created_at.strftime('%d/%m/%Y'),
+        ])
+        count += 1
+        if len(chunk) > rows_per_table:
+            yield Table(chunk, colWidths=PDF_COLUMN_WIDTHS, style=PDF_TASKS_TABLE_STYLE, repeatRows=1)
+            chunk = [PDF_HEADERS]
+            if progress and count % EXPORT_CHUNK_SIZE < rows_per_table:
+                progress(count)
+
+    if len(chunk) > 1:
+        yield Table(chunk, colWidths=PDF_COLUMN_WIDTHS, style=PDF_TASKS_TABLE_STYLE, repeatRows=1)
+    if progress:
+        progress(count)
+
+
+def write_tasks_pdf(output, queryset, stats, progress=None):
+    """Escribe el reporte PDF de tareas en un archivo abierto.
+
+    Las tareas se dividen en tablas pequeñas con encabezado repetido que se
+    construyen a medida que reportlab las consume, de modo que el tiempo de
+    maquetación crece linealmente con el número de tareas.
+    """
+
+    # Crear el PDF
+    doc = SimpleDocTemplate(output, pagesize=A4)
+    elements = []
+
+    # Estilos
+    styles = getSampleStyleSheet()
+    title_style = ParagraphStyle(
+        'CustomTitle',
+        parent=styles['Heading1'],
+        fontSize=24,
+        textColor=colors.HexColor('#1e40af'),
+        spaceAfter=30,
+        alignment=TA_CENTER
+    )
+
+    heading_style = ParagraphStyle(
+        'CustomHeading',
+        parent=styles['Heading2'],
+        fontSize=16,
+        textColor=colors.HexColor('#1e40af'),
+        spaceAfter=12,
+        spaceBefore=12
+    )
+
+    # Título
+    title = Paragraph("Reporte de Tareas", title_style)
+    elements.append(title)
+
+    # Fecha del reporte
+    date_text = Paragraph(
+        f"Generado el: {datetime.now().strftime('%d/%m/%Y %H:%M')}",
+        styles['Normal']
+    )
+    elements.append(date_text)
+    elements.append(Spacer(1, 20))
+
+    # Estadísticas
+    stats_title = Paragraph("Estadísticas Generales", heading_style)
+    elements.append(stats_title)
+
+    stats_data = [
+        ['Métrica', 'Valor'],
+        ['Total de Tareas', str(stats['total'])],
+        ['Tareas Completadas', str(stats['completed'])],
+        ['Tareas Pendientes', str(stats['pending'])],
+        ['Porcentaje Completado', f"{stats['completion_rate']:.2f}%"],
+    ]
+
+    stats_table = Table(stats_data, colWidths=[3 * inch, 2 * inch])
+    stats_table.setStyle(TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#4472C4')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('BACKGROUND', (0, 1), (-1, -1), colors.beige),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('TOPPADDING', (0, 1), (-1, -1), 6),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
+    ]))
+
+    elements.append(stats_table)
+    elements.append(Spacer(1, 30))
+
+    # Lista de tareas
+    tasks_title = Paragraph("Detalle de Tareas", heading_style)
+    elements.append(tasks_title)
+
+    if stats['total'] > 0:
+        tables = iter_pdf_tables(queryset, progress=progress)
+    else:
+        tables = iter([Paragraph("No hay tareas para mostrar.", styles['Normal'])])
+
+    # Construir PDF
+    doc.build(LazyFlowables(elements, tables))
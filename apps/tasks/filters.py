@@ -0,0 +1,31 @@
+from django.db.models import Q
+
+from .search import search_condition
+
+
+def get_filter_params(request):
+    """Obtiene los filtros de búsqueda, estado y usuario desde la query string."""
+    return {
+        'search': request.GET.get('search', '').strip(),
+        'filter_status': request.GET.get('filter', 'all'),
+        'filter_user': request.GET.get('user', ''),
+    }
+
+
+def filter_tasks(queryset, search='', filter_status='all', filter_user='', search_email=True):
+    """Aplica los mismos filtros del dashboard a un queryset de tareas."""
+    if search:
+        condition = search_condition(search)
+        if search_email:
+            condition |= Q(assigned_to__email__icontains=search)
+        queryset = queryset.filter(condition)
+
+    if filter_status == 'completed':
+        queryset = queryset.filter(completed=True)
+    elif filter_status == 'pending':
+        queryset = queryset.filter(completed=False)
+
+    if filter_user and str(filter_user).isdigit():
+        queryset = queryset.filter(assigned_to_id=filter_user)
+
+    return queryset
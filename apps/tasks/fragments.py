@@ -0,0 +1,108 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+# Incrementar al modificar las plantillas de fila para descartar los fragmentos anteriores
+FRAGMENT_VERSION = 1
+
+# Segundos que se mantienen los fragmentos en la caché compartida
+FRAGMENT_SHARED_TIMEOUT = 60 * 60
+
+
+class LRUFragmentCache:
+    """Caché en memoria de fragmentos HTML con expulsión LRU y métricas.
+
+    Si ``TASK_FRAGMENT_CACHE_ALIAS`` apunta a una caché de Django, se usa como
+    segundo nivel compartido entre procesos.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+        self.reset_stats()
+
+    def __len__(self):
+        return len(self._items)
+
+    @property
+    def shared(self):
+        alias = getattr(settings, 'TASK_FRAGMENT_CACHE_ALIAS', '')
+        return caches[alias] if alias else None
+
+    def get_many(self, keys):
+        """Retorna {llave: html} con los fragmentos encontrados en memoria o en la caché compartida."""
+        found = {}
+        with self._lock:
+            for key in keys:
+                html = self._items.get(key)
+                if html is not None:
+                    self._items.move_to_end(key)
+                    found[key] = html
+        self.hits += len(found)
+
+        missing = [key for key in keys if key not in found]
+        shared = self.shared
+        if missing and shared is not None:
+            from_shared = shared.get_many(missing)
+            self.shared_hits += len(from_shared)
+            self._store(from_shared)
+            found.update(from_shared)
+
+        self.misses += len(keys) - len(found)
+        return found
+
+    def set_many(self, fragments):
+        """Guarda fragmentos en memoria y, si está configurada, en la caché compartida."""
+        self._store(fragments)
+        shared = self.shared
+        if fragments and shared is not None:
+            shared.set_many(fragments, FRAGMENT_SHARED_TIMEOUT)
+
+    def _store(self, fragments):
+        with self._lock:
+            for key, html in fragments.items():
+                self._items[key] = html
+                self._items.move_to_end(key)
+            while len(self._items) > self.max_size:
+                self._items.popitem(last=False)
+                self.evictions += 1
+
+    def stats(self):
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            'size': len(self),
+            'max_size': self.max_size,
+            'hits': self.hits,
+            'shared_hits': self.shared_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round((self.hits + self.shared_hits) / lookups * 100, 1) if lookups else 0,
+            'shared_backend': getattr(settings, 'TASK_FRAGMENT_CACHE_ALIAS', '') or None,
+        }
+
+
+fragment_cache = LRUFragmentCache(getattr(settings, 'TASK_FRAGMENT_CACHE_SIZE', 5000))
+
+
+def fragment_key(template_name, task, variant=''):
+    """Llave del fragmento de una tarea: plantilla, id, fecha de actualización y rol."""
+    return f'tasks:fragment:{FRAGMENT_VERSION}:{template_name}:{task.pk}:{task.updated_at.timestamp()}:{variant}'
+
+
+def get_fragment_cache_stats():
+    """Métricas de aciertos y fallos de la caché de fragmentos de este proceso."""
+    return fragment_cache.stats()
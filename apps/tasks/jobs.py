@@ -0,0 +1,118 @@
+import tempfile
+import traceback
+from datetime import datetime, timedelta
+
+from django.core.files import File
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .exporters import write_tasks_csv, write_tasks_pdf, write_tasks_xlsx
+from .filters import filter_tasks
+from .models import ExportJob, Task
+from .stats import get_task_stats
+
+EXPORT_EXTENSIONS = {
+    ExportJob.FORMAT_CSV: 'csv',
+    ExportJob.FORMAT_EXCEL: 'xlsx',
+    ExportJob.FORMAT_PDF: 'pdf',
+}
+
+
+# Tiempo sin avance tras el cual un trabajo en proceso se considera abandonado (worker detenido)
+EXPORT_JOB_LEASE = timedelta(minutes=10)
+
+
+def fail_stale_jobs(now=None):
+    """Marca como fallidos los trabajos en proceso sin señal del worker durante ``EXPORT_JOB_LEASE``.
+
+    El worker actualiza ``heartbeat_at`` con cada bloque de filas; si se cae
+    a mitad de un trabajo, este queda fallido en vez de seguir en proceso
+    para siempre. No se reintenta solo: un trabajo que hace caer al worker
+    lo volvería a hacer caer. Retorna la cantidad de trabajos marcados.
+    """
+    now = now or timezone.now()
+    expired = now - EXPORT_JOB_LEASE
+    # Los trabajos tomados antes de existir heartbeat_at solo tienen started_at
+    stale = Q(heartbeat_at__lt=expired) | Q(heartbeat_at__isnull=True, started_at__lt=expired)
+    return ExportJob.objects.filter(stale, status=ExportJob.STATUS_RUNNING).update(
+        status=ExportJob.STATUS_FAILED,
+        error='El worker se detuvo antes de terminar la exportación',
+        finished_at=now,
+    )
+
+
+def claim_next_job():
+    """Toma el trabajo pendiente más antiguo y lo marca como en proceso.
+
+    El cambio de estado se hace con un UPDATE condicionado al estado
+    pendiente, así dos workers nunca procesan el mismo trabajo. Antes se
+    liberan los trabajos abandonados por un worker detenido.
+    """
+    fail_stale_jobs()
+    while True:
+        with transaction.atomic():
+            job = ExportJob.objects.filter(status=ExportJob.STATUS_PENDING).order_by('created_at').first()
+            if job is None:
+                return None
+            now = timezone.now()
+            claimed = ExportJob.objects.filter(
+                pk=job.pk,
+                status=ExportJob.STATUS_PENDING
+            ).update(status=ExportJob.STATUS_RUNNING, started_at=now, heartbeat_at=now)
+        if claimed:
+            job.refresh_from_db()
+            return job
+
+
+def run_export_job(job):
+    """Genera el archivo de un trabajo de exportación y lo guarda en disco."""
+    try:
+        queryset = Task.objects.all()
+        requester = job.requested_by
+        if requester is not None and not requester.is_admin_or_superuser:
+            # Trabajos encolados antes de restringir la creación: solo las tareas propias
+            queryset = queryset.filter(assigned_to=requester)
+        queryset = filter_tasks(queryset, **job.filters)
+        stats = get_task_stats(queryset)
+        ExportJob.objects.filter(pk=job.pk).update(total_rows=stats['total'])
+
+        def progress(count):
+            ExportJob.objects.filter(pk=job.pk).update(progress=count, heartbeat_at=timezone.now())
+
+        with tempfile.TemporaryFile() as output:
+            if job.format == ExportJob.FORMAT_CSV:
+                write_tasks_csv(output, queryset, progress=progress)
+            elif job.format == ExportJob.FORMAT_EXCEL:
+                write_tasks_xlsx(output, queryset, stats, progress=progress)
+            else:
+                write_tasks_pdf(output, queryset, stats, progress=progress)
+
+            output.seek(0)
+            filename = f'tareas_{datetime.now().strftime("%Y%m%d_%H%M%S")}_{job.pk}.{EXPORT_EXTENSIONS[job.format]}'
+            job.file.save(filename, File(output), save=False)
+
+        job.status = ExportJob.STATUS_DONE
+        job.progress = stats['total']
+        job.total_rows = stats['total']
+        job.finished_at = timezone.now()
+        job.save(update_fields=['file', 'status', 'progress', 'total_rows', 'finished_at'])
+    except Exception:
+        job.status = ExportJob.STATUS_FAILED
+        job.error = traceback.format_exc()
+        job.finished_at = timezone.now()
+        job.save(update_fields=['status', 'error', 'finished_at'])
+
+    return job
+
+
+def process_pending_jobs(limit=None):
+    """Procesa trabajos pendientes hasta vaciar la cola o alcanzar el límite."""
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_next_job()
+        if job is None:
+            break
+        run_export_job(job)
+        processed += 1
+    return processed
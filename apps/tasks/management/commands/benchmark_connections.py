@@ -0,0 +1,103 @@
+import statistics
+import time
+
+from django.core import signals
+from django.core.management.base import BaseCommand
+from django.db import connections, DEFAULT_DB_ALIAS
+from django.db.backends.signals import connection_created
+from apps.tasks.models import Task
+from apps.tasks.rendering import page_queryset
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide el costo de abrir la conexión a la base de datos en cada petición: '
+        'CONN_MAX_AGE=0 contra conexiones persistentes (o el pool de PostgreSQL si está configurado)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=500,
+            help='Ciclos de petición simulados por modo (default: 500)',
+        )
+        parser.add_argument(
+            '--max-age',
+            type=int,
+            default=600,
+            help='CONN_MAX_AGE del modo persistente (default: 600)',
+        )
+        parser.add_argument(
+            '--database',
+            default=DEFAULT_DB_ALIAS,
+            help='Alias de la base de datos (default: default)',
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        settings_dict = connection.settings_dict
+        original_max_age = settings_dict['CONN_MAX_AGE']
+
+        if settings_dict.get('OPTIONS', {}).get('pool'):
+            # El pool exige CONN_MAX_AGE=0: las conexiones vuelven al pool al cerrar
+            modes = [('pool', 0)]
+        else:
+            modes = [('nueva por petición', 0), (f'persistente ({options["max_age"]}s)', options['max_age'])]
+
+        self.stdout.write(
+            f'{connection.vendor}, {options["requests"]} peticiones por modo '
+            f'(sesión de usuario + primera página de tareas)'
+        )
+        self.stdout.write(f'  {"modo":<24} {"conexiones":>10} {"req/s":>8} {"p50":>9} {"p95":>9}')
+
+        user_id = User.objects.using(connection.alias).values_list('pk', flat=True).first()
+        opened = []
+
+        def counter(sender, connection, **kwargs):
+            opened.append(connection.alias)
+
+        connection_created.connect(counter)
+        try:
+            for name, max_age in modes:
+                settings_dict['CONN_MAX_AGE'] = max_age
+                connection.close()
+                opened.clear()
+                elapsed, timings = self.run(connection, user_id, options['requests'])
+                p50, p95 = self.percentiles(timings)
+                self.stdout.write(
+                    f'  {name:<24} {len(opened):>10} {len(timings) / elapsed:>8.1f} '
+                    f'{p50:>7.2f}ms {p95:>7.2f}ms'
+                )
+        finally:
+            connection_created.disconnect(counter)
+            settings_dict['CONN_MAX_AGE'] = original_max_age
+            connection.close()
+
+    def run(self, connection, user_id, requests):
+        """Repite el ciclo de una petición: ``request_started``, consultas y ``request_finished``.
+
+        Django cierra la conexión al terminar cada petición salvo que
+        ``CONN_MAX_AGE`` permita reutilizarla.
+        """
+        users = User.objects.using(connection.alias)
+        tasks = Task.objects.using(connection.alias)
+        timings = []
+        start = time.perf_counter()
+        for _ in range(requests):
+            request_start = time.perf_counter()
+            signals.request_started.send(sender=self.__class__)
+            try:
+                users.filter(pk=user_id).first()
+                list(page_queryset(tasks.select_related('assigned_to', 'created_by')))
+            finally:
+                signals.request_finished.send(sender=self.__class__)
+            timings.append((time.perf_counter() - request_start) * 1000)
+        return time.perf_counter() - start, timings
+
+    def percentiles(self, timings):
+        if len(timings) < 2:
+            return (timings[0], timings[0]) if timings else (0, 0)
+        cuts = statistics.quantiles(timings, n=100)
+        return cuts[49], cuts[94]
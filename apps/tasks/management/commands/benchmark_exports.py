@@ -0,0 +1,69 @@
+import tempfile
+
+from django.core.management.base import BaseCommand
+from apps.tasks.benchmarking import legacy_excel, legacy_pdf, measure, rollback_dataset
+from apps.tasks.exporters import write_tasks_pdf, write_tasks_xlsx
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Compara el rendimiento de las exportaciones (los datos se revierten al terminar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 10000],
+            help='Cantidades de tareas a generar para cada medición (default: 1000 10000)',
+        )
+        parser.add_argument(
+            '--formats',
+            nargs='+',
+            choices=['excel', 'pdf'],
+            default=['excel', 'pdf'],
+            help='Formatos a medir (default: excel pdf)',
+        )
+        parser.add_argument(
+            '--skip-legacy',
+            action='store_true',
+            help='No medir las implementaciones anteriores (útil con muchas filas)',
+        )
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='No medir el pico de memoria (más rápido)',
+        )
+
+    def handle(self, *args, **options):
+        memory = not options['no_memory']
+        formats = options['formats']
+
+        for rows in options['rows']:
+            results = []
+            with rollback_dataset(rows):
+                queryset = Task.objects.all()
+                stats = {'total': rows, 'completed': 0, 'pending': rows, 'completion_rate': 0}
+
+                def streaming_excel():
+                    with tempfile.TemporaryFile() as output:
+                        write_tasks_xlsx(output, queryset, stats)
+
+                def chunked_pdf():
+                    with tempfile.SpooledTemporaryFile(max_size=5 * 1024 * 1024) as output:
+                        write_tasks_pdf(output, queryset, stats)
+
+                if 'excel' in formats:
+                    if not options['skip_legacy']:
+                        results.append(('excel (anterior)', measure(lambda: legacy_excel(queryset), memory)))
+                    results.append(('excel (solo escritura)', measure(streaming_excel, memory)))
+
+                if 'pdf' in formats:
+                    if not options['skip_legacy']:
+                        results.append(('pdf (tabla única)', measure(lambda: legacy_pdf(queryset), memory)))
+                    results.append(('pdf (por bloques)', measure(chunked_pdf, memory)))
+
+            self.stdout.write(self.style.SUCCESS(f'\n{rows} tareas'))
+            for name, (elapsed, peak) in results:
+                peak_text = f'{peak / 1024 / 1024:8.1f} MB' if peak is not None else '       -'
+                self.stdout.write(f'  {name:<28} {elapsed:8.3f} s  {peak_text}  {elapsed / rows * 1e6:8.1f} µs/fila')
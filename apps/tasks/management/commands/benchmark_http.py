@@ -0,0 +1,206 @@
+import asyncio
+import statistics
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from urllib.parse import urlsplit
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from apps.tasks.benchmarking import create_login_session, get_request_host
+from apps.users.models import User
+
+DEFAULT_PATHS = ['tasks:task_list_partial', 'tasks:dashboard']
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide peticiones por segundo de las vistas de lectura. Sin --server compara en el mismo '
+        'proceso el handler WSGI (hilos) con el ASGI (asyncio); con --server mide un servidor '
+        'en ejecución (p. ej. uvicorn y luego gunicorn)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--paths',
+            nargs='+',
+            default=None,
+            help='Rutas o nombres de URL a medir (default: lista parcial y dashboard)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=200,
+            help='Peticiones por ruta y modo (default: 200)',
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=10,
+            help='Peticiones simultáneas (default: 10)',
+        )
+        parser.add_argument(
+            '--email',
+            help='Usuario con el que se autentican las peticiones (default: el primer superusuario)',
+        )
+        parser.add_argument(
+            '--server',
+            help='URL base de un servidor en ejecución, p. ej. http://127.0.0.1:8000',
+        )
+
+    def handle(self, *args, **options):
+        user = self.get_user(options['email'])
+        paths = [self.resolve_path(path) for path in options['paths'] or DEFAULT_PATHS]
+        session = create_login_session(user)
+        cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}'
+
+        if options['server']:
+            modes = [(options['server'], lambda path: self.run_http(options['server'], path, cookie, options))]
+        else:
+            modes = [
+                ('wsgi', lambda path: self.run_wsgi(WSGIHandler(), path, cookie, options)),
+                ('asgi', lambda path: asyncio.run(self.run_asgi(ASGIHandler(), path, cookie, options))),
+            ]
+
+        self.stdout.write(
+            f'{options["requests"]} peticiones por ruta, {options["concurrency"]} simultáneas, usuario {user.email}'
+        )
+        self.stdout.write(f'  {"ruta":<28} {"modo":<24} {"req/s":>8} {"p50":>9} {"p95":>9} {"errores":>8}')
+        try:
+            for path in paths:
+                for name, run in modes:
+                    elapsed, timings, errors = run(path)
+                    p50, p95 = self.percentiles(timings)
+                    self.stdout.write(
+                        f'  {path:<28} {name:<24} {len(timings) / elapsed:>8.1f} '
+                        f'{p50:>7.1f}ms {p95:>7.1f}ms {errors:>8}'
+                    )
+        finally:
+            session.delete()
+
+    def get_user(self, email):
+        users = User.objects.filter(email=email) if email else User.objects.filter(is_superuser=True)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No existe el usuario para autenticar las peticiones (usa --email)')
+        return user
+
+    def resolve_path(self, path):
+        return path if path.startswith('/') else reverse(path)
+
+    def percentiles(self, timings):
+        if len(timings) < 2:
+            return (timings[0], timings[0]) if timings else (0, 0)
+        cuts = statistics.quantiles(timings, n=100)
+        return cuts[49], cuts[94]
+
+    def run_wsgi(self, handler, path, cookie, options):
+        """Llama al handler WSGI desde un pool de hilos, como un servidor con hilos."""
+        path, _, query = path.partition('?')
+        host = get_request_host()
+
+        def request():
+            environ = {
+                'REQUEST_METHOD': 'GET',
+                'PATH_INFO': path,
+                'QUERY_STRING': query,
+                'SERVER_NAME': host,
+                'SERVER_PORT': '80',
+                'SERVER_PROTOCOL': 'HTTP/1.1',
+                'HTTP_HOST': host,
+                'HTTP_COOKIE': cookie,
+                'wsgi.input': BytesIO(),
+                'wsgi.errors': self.stderr,
+                'wsgi.url_scheme': 'http',
+            }
+            status = []
+            start = time.perf_counter()
+            result = handler(environ, lambda status_line, headers: status.append(int(status_line[:3])))
+            for _ in result:
+                pass
+            result.close()
+            return (time.perf_counter() - start) * 1000, status[0] == 200
+
+        request()  # Calentamiento: plantillas, índices y caché de fragmentos
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(lambda _: request(), range(options['requests'])))
+            elapsed = time.perf_counter() - start
+        return elapsed, [timing for timing, _ in results], sum(1 for _, ok in results if not ok)
+
+    async def run_asgi(self, handler, path, cookie, options):
+        """Llama al handler ASGI con tareas asyncio concurrentes, como uvicorn."""
+        path, _, query = path.partition('?')
+        host = get_request_host()
+
+        async def request():
+            scope = {
+                'type': 'http',
+                'asgi': {'version': '3.0'},
+                'http_version': '1.1',
+                'method': 'GET',
+                'scheme': 'http',
+                'path': path,
+                'raw_path': path.encode(),
+                'query_string': query.encode(),
+                'headers': [(b'host', host.encode()), (b'cookie', cookie.encode())],
+                'client': ('127.0.0.1', 0),
+                'server': (host, 80),
+            }
+            body_sent = asyncio.Event()
+            status = []
+
+            async def receive():
+                if not body_sent.is_set():
+                    body_sent.set()
+                    return {'type': 'http.request', 'body': b'', 'more_body': False}
+                # El cliente no se desconecta; Django cancela esta espera al terminar
+                await asyncio.Future()
+
+            async def send(message):
+                if message['type'] == 'http.response.start':
+                    status.append(message['status'])
+
+            start = time.perf_counter()
+            await handler(scope, receive, send)
+            return (time.perf_counter() - start) * 1000, status[0] == 200
+
+        await request()
+        semaphore = asyncio.Semaphore(options['concurrency'])
+
+        async def limited():
+            async with semaphore:
+                return await request()
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(limited() for _ in range(options['requests'])))
+        elapsed = time.perf_counter() - start
+        return elapsed, [timing for timing, _ in results], sum(1 for _, ok in results if not ok)
+
+    def run_http(self, server, path, cookie, options):
+        """Peticiones HTTP reales contra un servidor en ejecución."""
+        url = server.rstrip('/') + path
+        host = urlsplit(server).netloc
+
+        def request():
+            req = urllib.request.Request(url, headers={'Cookie': cookie, 'Host': host})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(req, timeout=30) as response:
+                    response.read()
+                    ok = response.status == 200
+            except (urllib.error.URLError, OSError):
+                ok = False
+            return (time.perf_counter() - start) * 1000, ok
+
+        request()
+        with ThreadPoolExecutor(options['concurrency']) as pool:
+            start = time.perf_counter()
+            results = list(pool.map(lambda _: request(), range(options['requests'])))
+            elapsed = time.perf_counter() - start
+        return elapsed, [timing for timing, _ in results], sum(1 for _, ok in results if not ok)
@@ -0,0 +1,88 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from apps.tasks.autocomplete import get_task_index, rebuild_task_index, reset_task_index
+from apps.tasks.benchmarking import rollback_dataset
+from apps.tasks.models import Task
+from apps.tasks.search import is_full_text_available, rank_tasks, search_tasks
+
+DEFAULT_QUERIES = ['factura', 'reunión cliente', 'migr', 'ref77777']
+
+
+class Command(BaseCommand):
+    help = 'Compara la búsqueda icontains con el índice de texto completo (los datos se revierten al terminar)'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[10000, 100000],
+            help='Cantidades de tareas a generar para cada medición (default: 10000 100000)',
+        )
+        parser.add_argument(
+            '--queries',
+            nargs='+',
+            default=DEFAULT_QUERIES,
+            help='Textos a buscar',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Repeticiones por búsqueda; se informa la mediana (default: 5)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla para generar las tareas (default: 42)',
+        )
+
+    def handle(self, *args, **options):
+        if not is_full_text_available():
+            self.stderr.write(self.style.WARNING('La base de datos no tiene índice de texto completo; solo se mide icontains'))
+
+        for rows in options['rows']:
+            start = time.perf_counter()
+            with rollback_dataset(rows, seed=options['seed']):
+                self.stdout.write(self.style.SUCCESS(f'\n{rows} tareas (carga: {time.perf_counter() - start:.1f} s)'))
+                self.stdout.write(f'  {"búsqueda":<18} {"método":<10} {"resultados":>10} {"conteo":>10} {"página":>10} {"ranking":>10}')
+
+                for text in options['queries']:
+                    methods = [('icontains', Task.objects.filter(Q(title__icontains=text) | Q(description__icontains=text)))]
+                    if is_full_text_available():
+                        methods.append(('texto', search_tasks(Task.objects.all(), text)))
+
+                    for name, queryset in methods:
+                        total = queryset.count()
+                        count_ms = self.median_ms(lambda: queryset.count(), options['repeat'])
+                        page_ms = self.median_ms(lambda: list(queryset.values_list('id', flat=True)[:50]), options['repeat'])
+                        rank_ms = '-'
+                        if name == 'texto':
+                            rank_ms = f"{self.median_ms(lambda: rank_tasks(Task.objects.all(), text), options['repeat']):.1f}ms"
+                        self.stdout.write(
+                            f'  {text:<18} {name:<10} {total:>10} {count_ms:>8.1f}ms {page_ms:>8.1f}ms {rank_ms:>10}'
+                        )
+
+                # Índice de prefijos en memoria usado por las sugerencias del buscador
+                start = time.perf_counter()
+                rebuild_task_index()
+                index = get_task_index()
+                self.stdout.write(f'  autocompletado: índice construido en {time.perf_counter() - start:.2f} s')
+                for text in options['queries']:
+                    prefix = text[:4]
+                    lookup_ms = self.median_ms(lambda: index.search(prefix), options['repeat'])
+                    self.stdout.write(f'  {prefix:<18} {"prefijos":<10} {len(index.search(prefix)):>10} {lookup_ms * 1000:>8.1f}µs')
+                # El índice tiene datos que se revierten
+                reset_task_index()
+
+    def median_ms(self, func, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            func()
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from apps.tasks.models import Task
+from apps.tasks.stats import get_task_stats
 import random
 
 
@@ -140,15 +141,13 @@ class Command(BaseCommand):
                 )
 
         # Estadísticas finales
-        total = Task.objects.count()
-        completed = Task.objects.filter(completed=True).count()
-        pending = Task.objects.filter(completed=False).count()
+        stats = get_task_stats()
 
         self.stdout.write(self.style.SUCCESS('\n' + '=' * 50))
         self.stdout.write(
             self.style.SUCCESS(f'✓ Se crearon {created_count} tareas de demostración')
         )
-        self.stdout.write(self.style.SUCCESS(f'Total de tareas: {total}'))
-        self.stdout.write(self.style.SUCCESS(f'Completadas: {completed}'))
-        self.stdout.write(self.style.SUCCESS(f'Pendientes: {pending}'))
+        self.stdout.write(self.style.SUCCESS(f'Total de tareas: {stats["total"]}'))
+        self.stdout.write(self.style.SUCCESS(f'Completadas: {stats["completed"]}'))
+        self.stdout.write(self.style.SUCCESS(f'Pendientes: {stats["pending"]}'))
         self.stdout.write(self.style.SUCCESS('=' * 50))
\ No newline at end of file
@@ -0,0 +1,86 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from apps.tasks.explain import explain, get_hot_queries
+from apps.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Muestra con EXPLAIN qué índice usa cada consulta frecuente de las listas y el dashboard'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=int,
+            help='Id del usuario para las consultas de usuario limitado (default: el que tiene más tareas)',
+        )
+        parser.add_argument(
+            '--plans',
+            action='store_true',
+            help='Muestra el plan completo de cada consulta',
+        )
+        parser.add_argument(
+            '--analyze',
+            action='store_true',
+            help='Ejecuta EXPLAIN ANALYZE (solo PostgreSQL)',
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Ejecuciones de cada consulta para medir la mediana; 0 para no medir (default: 5)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Termina con error si alguna consulta recorre la tabla completa u ordena sin índice',
+        )
+
+    def handle(self, *args, **options):
+        user_id = options['user'] or self.busiest_user_id()
+        explain_options = {'analyze': True} if options['analyze'] and connection.vendor == 'postgresql' else {}
+
+        self.stdout.write(f'{connection.vendor}, {Task.objects.count()} tareas, usuario {user_id}')
+        self.stdout.write(f'  {"consulta":<26} {"índices":<42} {"orden":<8} {"tabla":<8} {"tiempo":>9}')
+
+        problems = []
+        for name, queryset in get_hot_queries(user_id):
+            plan, indexes, sorts, full_scan = explain(queryset, **explain_options)
+            elapsed = f'{self.median_ms(queryset, options["repeat"]):.2f}ms' if options['repeat'] else '-'
+            self.stdout.write(
+                f'  {name:<26} {", ".join(indexes) or "-":<42} '
+                f'{"aparte" if sorts else "índice":<8} {"completa" if full_scan else "-":<8} {elapsed:>9}'
+            )
+            if options['plans']:
+                for line in plan.splitlines():
+                    self.stdout.write(f'      {line}')
+            if sorts or full_scan:
+                problems.append(name)
+
+        if problems:
+            message = f'Consultas sin índice adecuado: {", ".join(problems)}'
+            if options['check']:
+                raise CommandError(message)
+            self.stderr.write(self.style.WARNING(message))
+
+    def busiest_user_id(self):
+        busiest = (
+            Task.objects.exclude(assigned_to=None)
+            .values('assigned_to')
+            .annotate(total=Count('pk'))
+            .order_by('-total')
+            .values_list('assigned_to', flat=True)
+            .first()
+        )
+        return busiest or 0
+
+    def median_ms(self, queryset, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            list(queryset.all())
+            timings.append((time.perf_counter() - start) * 1000)
+        return statistics.median(timings)
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from apps.tasks.search import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = 'Reconstruye el índice de texto completo de las tareas y recrea sus triggers (solo SQLite)'
+
+    def handle(self, *args, **options):
+        restored = rebuild_search_index()
+        if restored is None:
+            self.stdout.write(self.style.WARNING('La base de datos no tiene índice FTS5; no hay nada que reconstruir'))
+            return
+        if restored:
+            self.stdout.write(self.style.WARNING(f'Se recrearon los triggers: {", ".join(restored)}'))
+        self.stdout.write(self.style.SUCCESS('Índice de texto completo reconstruido'))
@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+from apps.tasks.models import TaskCounter
+
+
+class Command(BaseCommand):
+    help = 'Recalcula o verifica los contadores desnormalizados de tareas'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Solo informa las diferencias sin modificar los contadores',
+        )
+
+    def handle(self, *args, **options):
+        expected = TaskCounter.compute()
+        stored = {
+            counter.user_id: (counter.total, counter.completed)
+            for counter in TaskCounter.objects.all()
+        }
+
+        differences = []
+        for user_id in sorted(set(expected) | set(stored), key=lambda value: value or 0):
+            # Los usuarios sin tareas pueden no tener fila o tenerla en cero
+            real = expected.get(user_id, (0, 0))
+            current = stored.get(user_id, (0, 0))
+            if real != current:
+                differences.append((user_id, current, real))
+
+        for user_id, current, real in differences:
+            scope = f'Usuario {user_id}' if user_id else 'Global'
+            self.stdout.write(
+                self.style.WARNING(f'{scope}: guardado {current[0]}/{current[1]}, real {real[0]}/{real[1]}')
+            )
+
+        if options['check']:
+            if differences:
+                self.stdout.write(self.style.ERROR(f'{len(differences)} contadores desincronizados'))
+            else:
+                self.stdout.write(self.style.SUCCESS('Los contadores están sincronizados'))
+            return
+
+        TaskCounter.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Contadores recalculados ({len(differences)} corregidos)'))
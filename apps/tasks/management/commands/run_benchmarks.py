@@ -0,0 +1,266 @@
+import json
+import platform
+import time
+import tracemalloc
+import urllib.error
+import urllib.request
+from urllib.parse import urlencode, urlsplit
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, reset_queries
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.crypto import get_random_string
+from apps.tasks.benchmarking import (
+    BENCHMARK_SCENARIOS,
+    EXPORT_SCENARIOS,
+    compare_results,
+    create_login_session,
+    get_request_host,
+    latency_summary,
+    rollback_dataset,
+)
+from apps.tasks.models import Task
+from apps.tasks.seeding import SEED_EMAIL_DOMAIN
+from apps.users.models import User
+from apps.users.roles import ADMIN_GROUP
+
+
+class Command(BaseCommand):
+    help = (
+        'Mide latencia (p50/p95/p99), consultas SQL y pico de memoria de las listas, el dashboard, '
+        'la API y las exportaciones con varios tamaños de datos; guarda JSON y compara con una línea base'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            nargs='+',
+            default=[1000, 100000],
+            help='Tamaños de datos generados con seed_tasks y revertidos al terminar (default: 1000 100000)',
+        )
+        parser.add_argument(
+            '--scenarios',
+            nargs='+',
+            choices=[scenario[0] for scenario in BENCHMARK_SCENARIOS],
+            help='Escenarios a medir (default: todos)',
+        )
+        parser.add_argument(
+            '--iterations',
+            type=int,
+            default=20,
+            help='Peticiones medidas por escenario (default: 20)',
+        )
+        parser.add_argument(
+            '--export-iterations',
+            type=int,
+            default=2,
+            help='Peticiones medidas por exportación (default: 2)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla de los datos generados (default: 42)',
+        )
+        parser.add_argument(
+            '--no-memory',
+            action='store_true',
+            help='No medir el pico de memoria (evita una petición extra con tracemalloc)',
+        )
+        parser.add_argument(
+            '--output',
+            help='Archivo JSON donde guardar los resultados',
+        )
+        parser.add_argument(
+            '--baseline',
+            help='Archivo JSON de una ejecución anterior para detectar regresiones',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.25,
+            help='Aumento máximo de p50 y memoria respecto a la línea base (default: 0.25 = 25 %%)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Termina con error si hay regresiones respecto a --baseline',
+        )
+        parser.add_argument(
+            '--server',
+            help='URL base de un servidor en ejecución; mide sus datos actuales sin generar ni revertir',
+        )
+        parser.add_argument(
+            '--email',
+            help='Usuario para --server (default: el primer superusuario)',
+        )
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as baseline_file:
+                baseline = json.load(baseline_file)
+
+        scenarios = [
+            scenario for scenario in BENCHMARK_SCENARIOS
+            if not options['scenarios'] or scenario[0] in options['scenarios']
+        ]
+        results = {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'vendor': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'server': options['server'],
+                'seed': options['seed'],
+                'iterations': options['iterations'],
+                'export_iterations': options['export_iterations'],
+            },
+            'results': [],
+        }
+
+        self.stdout.write(
+            f'  {"escenario":<26} {"filas":>8} {"p50":>10} {"p95":>10} {"p99":>10} {"consultas":>9} {"memoria":>10}'
+        )
+        if options['server']:
+            results['results'] += self.run_server(options['server'], scenarios, options)
+        else:
+            for rows in options['rows']:
+                start = time.perf_counter()
+                with rollback_dataset(rows, seed=options['seed']):
+                    self.stdout.write(f'{rows} tareas generadas en {time.perf_counter() - start:.1f} s')
+                    results['results'] += self.run_client(rows, scenarios, options)
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+            self.stdout.write(self.style.SUCCESS(f'Resultados guardados en {options["output"]}'))
+
+        if baseline is not None:
+            regressions = compare_results(results, baseline, options['threshold'])
+            for scenario, rows, metric, before, after in regressions:
+                self.stdout.write(self.style.WARNING(f'  {scenario} ({rows} filas): {metric} {before} -> {after}'))
+            if regressions and options['check']:
+                raise CommandError(f'{len(regressions)} regresiones respecto a {options["baseline"]}')
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f'Sin regresiones respecto a {options["baseline"]}'))
+
+    def run_client(self, rows, scenarios, options):
+        """Mide los escenarios con el cliente de pruebas de Django sobre los datos generados."""
+        user = User.objects.filter(groups__name=ADMIN_GROUP, email__endswith=f'@{SEED_EMAIL_DOMAIN}').first()
+        client = Client(SERVER_NAME=get_request_host())
+        client.force_login(user)
+        task_id = Task.objects.order_by('-created_at', '-id').values_list('pk', flat=True).first()
+
+        def make_request(method, path, params):
+            def request():
+                response = client.get(path, params) if method == 'GET' else client.post(path, params)
+                # Las exportaciones responden en streaming: se consume el cuerpo sin acumularlo
+                # (el cliente cierra la respuesta al terminar, sin cerrar la conexión a la base de datos)
+                if response.streaming:
+                    return response.status_code, sum(len(chunk) for chunk in response.streaming_content)
+                return response.status_code, len(response.content)
+            return request
+
+        results = []
+        for name, method, url_name, params, with_task in scenarios:
+            path = reverse(url_name, args=[task_id] if with_task else [])
+            request = make_request(method, path, params)
+
+            # Primera petición: llena las cachés y cuenta las consultas. El registro de
+            # consultas tiene un máximo de entradas y la carga de datos ya lo llenó
+            reset_queries()
+            with CaptureQueriesContext(connection) as queries:
+                status, size = request()
+            # Se cuenta ahora: cada petición siguiente limpia el registro de consultas
+            query_count = len(queries)
+            timings = self.time_requests(request, self.iterations(name, options))
+            peak = None
+            if not options['no_memory']:
+                tracemalloc.start()
+                try:
+                    request()
+                    _, peak = tracemalloc.get_traced_memory()
+                finally:
+                    tracemalloc.stop()
+
+            results.append(self.report(name, rows, status, size, timings, query_count, peak))
+        return results
+
+    def run_server(self, server, scenarios, options):
+        """Mide los escenarios con peticiones HTTP a un servidor en ejecución (sin consultas ni memoria)."""
+        users = User.objects.filter(email=options['email']) if options['email'] else User.objects.filter(is_superuser=True)
+        user = users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No existe el usuario para autenticar las peticiones (usa --email)')
+
+        rows = Task.objects.count()
+        task_id = Task.objects.order_by('-created_at', '-id').values_list('pk', flat=True).first()
+        session = create_login_session(user)
+        csrf_token = get_random_string(32)
+        headers = {
+            'Cookie': f'{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf_token}',
+            'X-CSRFToken': csrf_token,
+            'Host': urlsplit(server).netloc,
+        }
+
+        def make_request(method, path, params):
+            url = server.rstrip('/') + path
+            if method == 'GET' and params:
+                url += '?' + urlencode(params)
+
+            def request():
+                data = urlencode(params).encode() if method == 'POST' else None
+                try:
+                    with urllib.request.urlopen(urllib.request.Request(url, data, headers, method=method), timeout=300) as response:
+                        return response.status, len(response.read())
+                except urllib.error.HTTPError as error:
+                    return error.code, 0
+            return request
+
+        results = []
+        try:
+            for name, method, url_name, params, with_task in scenarios:
+                request = make_request(method, reverse(url_name, args=[task_id] if with_task else []), params)
+                status, size = request()
+                timings = self.time_requests(request, self.iterations(name, options))
+                results.append(self.report(name, rows, status, size, timings, None, None))
+        finally:
+            session.delete()
+        return results
+
+    def iterations(self, name, options):
+        return options['export_iterations'] if name in EXPORT_SCENARIOS else options['iterations']
+
+    def time_requests(self, request, iterations):
+        timings = []
+        for _ in range(iterations):
+            start = time.perf_counter()
+            request()
+            timings.append((time.perf_counter() - start) * 1000)
+        return timings
+
+    def report(self, name, rows, status, size, timings, queries, peak):
+        result = {
+            'scenario': name,
+            'rows': rows,
+            'status': status,
+            'bytes': size,
+            'iterations': len(timings),
+            **latency_summary(timings),
+            'queries': queries,
+            'peak_kb': round(peak / 1024, 1) if peak is not None else None,
+        }
+        memory = f'{result["peak_kb"]:.0f}KB' if peak is not None else '-'
+        line = (
+            f'  {name:<26} {rows:>8} {result["p50_ms"]:>8.1f}ms {result["p95_ms"]:>8.1f}ms '
+            f'{result["p99_ms"]:>8.1f}ms {queries if queries is not None else "-":>9} {memory:>10}'
+        )
+        self.stdout.write(line if status in (200, 201) else self.style.ERROR(f'{line} (HTTP {status})'))
+        return result
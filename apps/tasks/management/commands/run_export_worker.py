@@ -0,0 +1,38 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.tasks.jobs import process_pending_jobs
+
+
+class Command(BaseCommand):
+    help = 'Procesa en segundo plano los trabajos de exportación pendientes'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Procesa los trabajos pendientes y termina',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=2.0,
+            help='Segundos de espera cuando no hay trabajos pendientes (default: 2)',
+        )
+
+    def handle(self, *args, **options):
+        if options['once']:
+            processed = process_pending_jobs()
+            self.stdout.write(self.style.SUCCESS(f'Se procesaron {processed} exportaciones'))
+            return
+
+        self.stdout.write('Worker de exportaciones iniciado (Ctrl+C para detener)')
+        try:
+            while True:
+                processed = process_pending_jobs()
+                if processed:
+                    self.stdout.write(self.style.SUCCESS(f'Se procesaron {processed} exportaciones'))
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker detenido'))
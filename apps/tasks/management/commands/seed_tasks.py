@@ -0,0 +1,91 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.tasks.seeding import SEED_EMAIL_DOMAIN, SEED_PASSWORD, clear_seeded_data, seed
+from apps.tasks.stats import get_task_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Genera usuarios y tareas sintéticas con bulk_create para pruebas de carga y benchmarks '
+        '(distribuciones sesgadas, reproducibles con --seed)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tasks',
+            type=int,
+            default=100000,
+            help='Tareas a crear (default: 100000)',
+        )
+        parser.add_argument(
+            '--users',
+            type=int,
+            default=100,
+            help='Usuarios limitados a crear o reutilizar (default: 100)',
+        )
+        parser.add_argument(
+            '--admins',
+            type=int,
+            default=3,
+            help='Administradores a crear o reutilizar (default: 3)',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=42,
+            help='Semilla del generador; la misma semilla genera los mismos datos en el mismo día (default: 42)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Tareas por lote y transacción (default: 5000)',
+        )
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=730,
+            help='Antigüedad máxima de las tareas en días (default: 730)',
+        )
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Elimina los usuarios generados y sus tareas (creadas o asignadas) antes de crear los nuevos',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size debe ser mayor que 0')
+
+        if options['clear']:
+            tasks, users = clear_seeded_data()
+            self.stdout.write(self.style.WARNING(f'Se eliminaron {tasks} tareas y {users} usuarios generados'))
+
+        start = time.perf_counter()
+        step = max(options['tasks'] // 10, options['batch_size'])
+
+        def progress(inserted):
+            if inserted % step < options['batch_size'] or inserted == options['tasks']:
+                elapsed = time.perf_counter() - start
+                self.stdout.write(f'  {inserted} tareas ({inserted / elapsed:.0f} por segundo)')
+
+        result = seed(
+            options['tasks'],
+            users=options['users'],
+            admins=options['admins'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+            days=options['days'],
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - start
+
+        stats = get_task_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Se crearon {result["tasks"]} tareas en {elapsed:.1f} s para {result["users"]} usuarios '
+            f'y {result["admins"]} administradores (@{SEED_EMAIL_DOMAIN}, contraseña {SEED_PASSWORD})'
+        ))
+        self.stdout.write(self.style.SUCCESS(
+            f'Total de tareas: {stats["total"]}, completadas: {stats["completed"]}, pendientes: {stats["pending"]}'
+        ))
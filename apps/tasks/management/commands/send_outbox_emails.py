@@ -0,0 +1,50 @@
+import time
+
+from django.core.management.base import BaseCommand
+from apps.tasks.notifications import OUTBOX_BATCH_SIZE, process_outbox
+
+
+class Command(BaseCommand):
+    help = 'Envía los emails pendientes de la bandeja de salida'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Envía los emails pendientes y termina',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5.0,
+            help='Segundos de espera cuando no hay emails pendientes (default: 5)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=OUTBOX_BATCH_SIZE,
+            help=f'Emails enviados por conexión SMTP (default: {OUTBOX_BATCH_SIZE})',
+        )
+
+    def report(self, sent, failed):
+        self.stdout.write(self.style.SUCCESS(f'Se enviaron {sent} emails'))
+        if failed:
+            self.stdout.write(self.style.WARNING(f'{failed} emails se reintentarán más tarde'))
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+
+        if options['once']:
+            self.report(*process_outbox(batch_size))
+            return
+
+        self.stdout.write('Worker de emails iniciado (Ctrl+C para detener)')
+        try:
+            while True:
+                sent, failed = process_outbox(batch_size)
+                if sent or failed:
+                    self.report(sent, failed)
+                else:
+                    time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.WARNING('Worker detenido'))
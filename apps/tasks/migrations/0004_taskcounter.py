@@ -0,0 +1,49 @@
+# Generated by Django 5.2.7 on 2026-10-18 20:22
+
+import django.db.models.deletion
+import django.db.models.functions.comparison
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def populate_counters(apps, schema_editor):
+    """Calcula los contadores iniciales a partir de las tareas existentes."""
+    Task = apps.get_model('tasks', 'Task')
+    TaskCounter = apps.get_model('tasks', 'TaskCounter')
+    aggregates = {'total': Count('pk'), 'completed': Count('pk', filter=Q(completed=True))}
+
+    counters = [
+        TaskCounter(user_id=row['assigned_to'], total=row['total'], completed=row['completed'])
+        for row in Task.objects.order_by().exclude(assigned_to=None).values('assigned_to').annotate(**aggregates)
+    ]
+    totals = Task.objects.order_by().aggregate(**aggregates)
+    counters.append(TaskCounter(user_id=None, total=totals['total'], completed=totals['completed']))
+    TaskCounter.objects.bulk_create(counters)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_exportjob'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total', models.IntegerField(default=0, verbose_name='Total de tareas')),
+                ('completed', models.IntegerField(default=0, verbose_name='Tareas completadas')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Última actualización')),
+                ('user', models.OneToOneField(blank=True, help_text='Usuario asignado (vacío para los totales globales)', null=True, on_delete=django.db.models.deletion.CASCADE, related_name='task_counter', to=settings.AUTH_USER_MODEL, verbose_name='Usuario')),
+            ],
+            options={
+                'verbose_name': 'Contador de tareas',
+                'verbose_name_plural': 'Contadores de tareas',
+                'constraints': [models.UniqueConstraint(django.db.models.functions.comparison.Coalesce('user', models.Value(0)), name='taskcounter_scope_uniq')],
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.7 on 2026-10-18 22:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_task_query_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, help_text='Se actualiza con el progreso; si deja de avanzar el trabajo se da por abandonado', null=True, verbose_name='Última señal del worker'),
+        ),
+    ]
@@ -1,7 +1,12 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F, Q, Value
+from django.db.models.functions import Coalesce
 from django.core.validators import MinLengthValidator
-from django.core.mail import send_mail
+from django.utils import timezone
 
 
 class Task(models.Model):
@@ -63,47 +68,412 @@ class Task(models.Model):
         verbose_name_plural = 'Tareas'
         ordering = ['-created_at']
         indexes = [
-            models.Index(fields=['-created_at'], name='task_created_idx'),
-            models.Index(fields=['completed'], name='task_completed_idx'),
-            models.Index(fields=['assigned_to'], name='task_assigned_idx'),
+            # Orden de las listas paginadas por keyset (-created_at, -id)
+            models.Index(fields=['-created_at', '-id'], name='task_created_id_idx'),
+            # Listas de un usuario limitado
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='task_assigned_created_idx'),
+            # Filtro de pendientes (dashboard y usuarios): solo indexan las tareas sin completar.
+            # Django filtra los booleanos como "NOT completed", que SQLite no compara contra
+            # una columna del índice, por eso el estado va en la condición y no en los campos
+            models.Index(
+                fields=['-created_at', '-id'],
+                condition=models.Q(completed=False),
+                name='task_pending_created_idx',
+            ),
+            models.Index(
+                fields=['assigned_to', '-created_at', '-id'],
+                condition=models.Q(completed=False),
+                name='task_assigned_pending_idx',
+            ),
         ]
 
     def __str__(self):
         status = "✓" if self.completed else "○"
         return f"{status} {self.title}"
 
+    def save(self, *args, **kwargs):
+        """Guarda la tarea y actualiza los contadores en la misma transacción.
+
+        El estado anterior se lee de la base de datos con la fila bloqueada: no
+        depende de los campos cargados en la instancia (``only``/``defer``) y
+        dos guardados simultáneos de la misma tarea no aplican el mismo delta.
+        """
+        update_fields = kwargs.get('update_fields')
+
+        with transaction.atomic():
+            previous = None
+            if not self._state.adding and self.pk is not None:
+                previous = (
+                    Task.objects.select_for_update().filter(pk=self.pk)
+                    .values_list('assigned_to_id', 'completed').first()
+                )
+            super().save(*args, **kwargs)
+
+            assigned_to_id, completed = self.assigned_to_id, self.completed
+            if previous is not None and update_fields is not None:
+                # Los campos que no se guardaron mantienen su valor en la base de datos
+                if 'assigned_to' not in update_fields and 'assigned_to_id' not in update_fields:
+                    assigned_to_id = previous[0]
+                if 'completed' not in update_fields:
+                    completed = previous[1]
+
+            TaskCounter.track_change(previous, (assigned_to_id, completed))
+
     def toggle_completed(self):
-        """Cambia el estado de completado de la tarea y envía email al administrador."""
+        """Cambia el estado de completado de la tarea y encola el email al administrador."""
         was_completed = self.completed
         self.completed = not self.completed
-        self.save(update_fields=['completed', 'updated_at'])
-        
-        # Enviar email solo si la tarea pasó de pendiente a completada
-        if not was_completed and self.completed:
-            self.send_completion_email()
-        
+        with transaction.atomic():
+            self.save(update_fields=['completed', 'updated_at'])
+
+            # Encolar email solo si la tarea pasó de pendiente a completada
+            if not was_completed and self.completed:
+                self.send_completion_email()
+
         return self.completed
 
     def send_completion_email(self):
-        """Envía email al administrador cuando se completa una tarea."""
+        """Encola el email al administrador; lo envía el comando send_outbox_emails."""
+        OutboxEmail.enqueue([self])
+
+
+class ExportJob(models.Model):
+    """Trabajo de exportación que se genera en segundo plano."""
+
+    FORMAT_CSV = 'csv'
+    FORMAT_EXCEL = 'excel'
+    FORMAT_PDF = 'pdf'
+    FORMAT_CHOICES = [
+        (FORMAT_CSV, 'CSV'),
+        (FORMAT_EXCEL, 'Excel'),
+        (FORMAT_PDF, 'PDF'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_RUNNING, 'En proceso'),
+        (STATUS_DONE, 'Terminado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    format = models.CharField(
+        max_length=10,
+        choices=FORMAT_CHOICES,
+        verbose_name='Formato'
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+
+    filters = models.JSONField(
+        default=dict,
+        blank=True,
+        verbose_name='Filtros',
+        help_text='Filtros de búsqueda, estado y usuario aplicados a la exportación'
+    )
+
+    progress = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Progreso',
+        help_text='Número de tareas procesadas'
+    )
+
+    total_rows = models.PositiveIntegerField(
+        default=0,
+        verbose_name='Total de filas'
+    )
+
+    file = models.FileField(
+        upload_to='exports/',
+        blank=True,
+        verbose_name='Archivo'
+    )
+
+    error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Error'
+    )
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='export_jobs',
+        verbose_name='Solicitado por'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+
+    started_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Inicio'
+    )
+
+    heartbeat_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Última señal del worker',
+        help_text='Se actualiza con el progreso; si deja de avanzar el trabajo se da por abandonado'
+    )
+
+    finished_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Término'
+    )
+
+    class Meta:
+        verbose_name = 'Exportación'
+        verbose_name_plural = 'Exportaciones'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at'], name='exportjob_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_format_display()} #{self.pk} ({self.get_status_display()})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def progress_percent(self):
+        if self.status == self.STATUS_DONE:
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(100, int(self.progress * 100 / self.total_rows))
+
+
+# Deltas pendientes mientras se ejecuta un bloque TaskCounter.deferred()
+_pending_counter_deltas = ContextVar('task_counter_deltas', default=None)
+
+
+class TaskCounter(models.Model):
+    """Contadores desnormalizados de tareas por usuario asignado.
+
+    La fila sin usuario guarda los totales globales. Se mantienen al guardar y
+    eliminar tareas; ``rebuild_task_counters`` los recalcula desde cero.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='task_counter',
+        verbose_name='Usuario',
+        help_text='Usuario asignado (vacío para los totales globales)'
+    )
+
+    total = models.IntegerField(
+        default=0,
+        verbose_name='Total de tareas'
+    )
+
+    completed = models.IntegerField(
+        default=0,
+        verbose_name='Tareas completadas'
+    )
+
+    updated_at = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Última actualización'
+    )
+
+    class Meta:
+        verbose_name = 'Contador de tareas'
+        verbose_name_plural = 'Contadores de tareas'
+        constraints = [
+            # Una sola fila por usuario y una sola fila global (user NULL)
+            models.UniqueConstraint(Coalesce('user', Value(0)), name='taskcounter_scope_uniq'),
+        ]
+
+    def __str__(self):
+        scope = self.user_id or 'global'
+        return f"{scope}: {self.completed}/{self.total}"
+
+    @property
+    def pending(self):
+        return self.total - self.completed
+
+    @classmethod
+    def apply_delta(cls, user_id, total=0, completed=0):
+        """Suma los deltas al contador del usuario (o al global si ``user_id`` es None)."""
+        # update() no aplica auto_now; la fecha marca el último cambio en el alcance del contador
+        changes = {
+            'total': F('total') + total,
+            'completed': F('completed') + completed,
+            'updated_at': timezone.now(),
+        }
+        if not cls.objects.filter(user_id=user_id).update(**changes):
+            cls.objects.get_or_create(user_id=user_id)
+            cls.objects.filter(user_id=user_id).update(**changes)
+
+    @classmethod
+    def track_change(cls, previous, current):
+        """Aplica la diferencia entre dos estados ``(assigned_to_id, completed)``.
+
+        ``previous`` es None para tareas nuevas y ``current`` es None para tareas eliminadas.
+        """
+        pending = _pending_counter_deltas.get()
+        deltas = pending if pending is not None else {}
+        for state, sign in ((previous, -1), (current, 1)):
+            if state is None:
+                continue
+            assigned_to_id, completed = state
+            scopes = [None] if assigned_to_id is None else [None, assigned_to_id]
+            for scope in scopes:
+                total_delta, completed_delta = deltas.get(scope, (0, 0))
+                deltas[scope] = (total_delta + sign, completed_delta + sign * int(bool(completed)))
+
+        if pending is None:
+            cls._flush(deltas)
+
+    @classmethod
+    def _flush(cls, deltas):
+        # También los alcances sin cambio neto (ediciones): su fecha valida los ETag de las listas
+        for scope, (total_delta, completed_delta) in deltas.items():
+            cls.apply_delta(scope, total_delta, completed_delta)
+
+    @classmethod
+    @contextmanager
+    def deferred(cls):
+        """Acumula los cambios del bloque y los aplica al final, una consulta por usuario.
+
+        Pensado para operaciones masivas: los deltas de miles de tareas se
+        agrupan y se escriben dentro de la misma transacción.
+        """
+        if _pending_counter_deltas.get() is not None:
+            yield
+            return
+
+        deltas = {}
+        token = _pending_counter_deltas.set(deltas)
         try:
-            if self.created_by and self.assigned_to:
-                subject = f'Tarea completada: {self.title}'
-                message = f'''
-Tarea completada exitosamente.
-
-Detalles:
-- Tarea: {self.title}
-- Completada por: {self.assigned_to.email}
-- Fecha de completación: {self.updated_at.strftime("%d/%m/%Y %H:%M")}
-- Descripción: {self.description or "Sin descripción"}
-'''
-                send_mail(
-                    subject=subject,
-                    message=message,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[self.created_by.email],
-                    fail_silently=True,
-                )
-        except Exception:
-            pass
\ No newline at end of file
+            with transaction.atomic():
+                yield
+                _pending_counter_deltas.reset(token)
+                token = None
+                cls._flush(deltas)
+        finally:
+            if token is not None:
+                _pending_counter_deltas.reset(token)
+
+    @classmethod
+    def compute(cls):
+        """Calcula los contadores reales desde la tabla de tareas: {user_id: (total, completadas)}."""
+        aggregates = {'total': Count('pk'), 'completed': Count('pk', filter=Q(completed=True))}
+        counters = {
+            row['assigned_to']: (row['total'], row['completed'])
+            for row in Task.objects.order_by().exclude(assigned_to=None).values('assigned_to').annotate(**aggregates)
+        }
+        totals = Task.objects.order_by().aggregate(**aggregates)
+        counters[None] = (totals['total'], totals['completed'])
+        return counters
+
+    @classmethod
+    def rebuild(cls):
+        """Reemplaza todos los contadores por los valores calculados desde las tareas."""
+        counters = cls.compute()
+        with transaction.atomic():
+            cls.objects.all().delete()
+            cls.objects.bulk_create(
+                cls(user_id=user_id, total=total, completed=completed)
+                for user_id, (total, completed) in counters.items()
+            )
+        return counters
+
+
+class OutboxEmail(models.Model):
+    """Email de tarea completada pendiente de envío por el worker de correos."""
+
+    STATUS_PENDING = 'pending'
+    STATUS_SENDING = 'sending'
+    STATUS_SENT = 'sent'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pendiente'),
+        (STATUS_SENDING, 'Enviando'),
+        (STATUS_SENT, 'Enviado'),
+        (STATUS_FAILED, 'Fallido'),
+    ]
+
+    task = models.ForeignKey(
+        Task,
+        on_delete=models.CASCADE,
+        related_name='outbox_emails',
+        verbose_name='Tarea'
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=STATUS_PENDING,
+        verbose_name='Estado'
+    )
+
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Intentos'
+    )
+
+    next_attempt_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Próximo intento'
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        default='',
+        verbose_name='Último error'
+    )
+
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Fecha de creación'
+    )
+
+    sent_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Fecha de envío'
+    )
+
+    class Meta:
+        verbose_name = 'Email pendiente'
+        verbose_name_plural = 'Emails pendientes'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"Email de {self.task_id} ({self.get_status_display()})"
+
+    @classmethod
+    def enqueue(cls, tasks):
+        """Registra los emails de las tareas completadas que tienen creador y asignado.
+
+        Debe llamarse dentro de la misma transacción que completa las tareas.
+        """
+        return cls.objects.bulk_create(
+            cls(task_id=task.pk)
+            for task in tasks
+            if task.created_by_id and task.assigned_to_id
+        )
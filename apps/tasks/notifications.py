@@ -0,0 +1,145 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+# Emails que se envían por cada conexión SMTP
+OUTBOX_BATCH_SIZE = 50
+
+# Intentos antes de marcar un email como fallido
+OUTBOX_MAX_ATTEMPTS = 5
+
+# Espera base entre reintentos; se duplica en cada intento (1, 2, 4, 8... minutos)
+OUTBOX_RETRY_DELAY = timedelta(minutes=1)
+
+# Tiempo tras el cual un lote en envío se considera abandonado (worker detenido)
+OUTBOX_SENDING_LEASE = timedelta(minutes=5)
+
+
+def build_completion_message(task, completed_by_email, recipient_email, completed_at=None):
+    """Construye el email que avisa al creador que una tarea fue completada."""
+    completed_at = completed_at or task.updated_at
+    subject = f'Tarea completada: {task.title}'
+    message = f'''
+Tarea completada exitosamente.
+
+Detalles:
+- Tarea: {task.title}
+- Completada por: {completed_by_email}
+- Fecha de completación: {timezone.localtime(completed_at).strftime("%d/%m/%Y %H:%M")}
+- Descripción: {task.description or "Sin descripción"}
+'''
+    return EmailMessage(
+        subject=subject,
+        body=message,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[recipient_email],
+    )
+
+
+def get_retry_delay(attempts):
+    """Retorna la espera antes del siguiente intento (backoff exponencial)."""
+    return OUTBOX_RETRY_DELAY * (2 ** (attempts - 1))
+
+
+def claim_outbox_batch(batch_size=OUTBOX_BATCH_SIZE):
+    """Toma un lote de emails listos para enviar y los marca como en envío.
+
+    Los emails quedan reservados por ``OUTBOX_SENDING_LEASE``; si el worker
+    se detiene antes de terminar, otro los vuelve a tomar después.
+    """
+    now = timezone.now()
+    ready = Q(status=OutboxEmail.STATUS_PENDING) | Q(status=OutboxEmail.STATUS_SENDING)
+
+    with transaction.atomic():
+        ids = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(ready, next_attempt_at__lte=now)
+            .order_by('next_attempt_at')
+            .values_list('id', flat=True)[:batch_size]
+        )
+        if ids:
+            OutboxEmail.objects.filter(pk__in=ids).update(
+                status=OutboxEmail.STATUS_SENDING,
+                next_attempt_at=now + OUTBOX_SENDING_LEASE,
+            )
+
+    return list(
+        OutboxEmail.objects.filter(pk__in=ids)
+        .select_related('task__created_by', 'task__assigned_to')
+        .order_by('next_attempt_at', 'pk')
+    )
+
+
+def _mark_failed_attempt(email, error):
+    email.attempts += 1
+    email.last_error = error
+    if email.attempts >= OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.STATUS_FAILED
+    else:
+        email.status = OutboxEmail.STATUS_PENDING
+        email.next_attempt_at = timezone.now() + get_retry_delay(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def send_outbox_batch(emails):
+    """Envía un lote de emails reutilizando una sola conexión SMTP.
+
+    Retorna la cantidad de emails enviados; los que fallan se reprograman.
+    """
+    sent_ids = []
+    connection = get_connection()
+    try:
+        connection.open()
+    except Exception as exc:
+        for email in emails:
+            _mark_failed_attempt(email, f'No se pudo conectar: {exc}')
+        return 0
+
+    try:
+        for email in emails:
+            task = email.task
+            if not (task.created_by and task.assigned_to):
+                # El creador o el asignado se eliminaron después de encolar el email: no se reintenta
+                email.status = OutboxEmail.STATUS_FAILED
+                email.last_error = 'La tarea ya no tiene creador o usuario asignado'
+                email.save(update_fields=['status', 'last_error'])
+                continue
+
+            message = build_completion_message(
+                task, task.assigned_to.email, task.created_by.email, completed_at=email.created_at
+            )
+            try:
+                connection.send_messages([message])
+            except Exception as exc:
+                _mark_failed_attempt(email, str(exc))
+            else:
+                sent_ids.append(email.pk)
+    finally:
+        connection.close()
+
+    if sent_ids:
+        OutboxEmail.objects.filter(pk__in=sent_ids).update(
+            status=OutboxEmail.STATUS_SENT,
+            sent_at=timezone.now(),
+            last_error='',
+        )
+    return len(sent_ids)
+
+
+def process_outbox(batch_size=OUTBOX_BATCH_SIZE):
+    """Envía los emails listos por lotes hasta vaciar la cola: (enviados, fallidos)."""
+    sent = failed = 0
+    while True:
+        emails = claim_outbox_batch(batch_size)
+        if not emails:
+            break
+        batch_sent = send_outbox_batch(emails)
+        sent += batch_sent
+        failed += len(emails) - batch_sent
+    return sent, failed
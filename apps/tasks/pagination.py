@@ -0,0 +1,15 @@
+from rest_framework.pagination import CursorPagination
+
+
+class TaskCursorPagination(CursorPagination):
+    """Paginación por cursor (keyset) para la API de tareas.
+
+    Ordena por ``-created_at, -id``, el mismo orden de los índices
+    ``task_created_id_idx`` y ``task_assigned_created_idx`` y del keyset de las
+    listas HTML; el cursor es estable ante inserciones concurrentes.
+    """
+
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 200
+    ordering = ('-created_at', '-id')
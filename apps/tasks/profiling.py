@@ -0,0 +1,322 @@
+import cProfile
+import heapq
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.template.base import Template
+from django.utils import timezone
+
+from .fragments import get_fragment_cache_stats
+
+logger = logging.getLogger(__name__)
+
+# Límites (segundos) del histograma de duración por vista
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+# Límites del histograma de consultas SQL por petición
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# Directorio del proyecto: el origen de una consulta es el primer archivo propio en la pila
+PROJECT_DIR = f'{Path(settings.BASE_DIR).resolve()}{os.sep}'
+
+# Módulos que instalan execute_wrapper: nunca son el origen de una consulta
+INSTRUMENTATION_MODULES = frozenset({__name__, 'apps.tasks.diagnostics'})
+
+_current_profile = ContextVar('request_profile', default=None)
+_current_templates = ContextVar('rendering_templates', default=None)
+
+
+@contextmanager
+def template_stack():
+    """Registra las plantillas en render mientras dura el bloque; retorna la pila (reutiliza la activa)."""
+    templates = _current_templates.get()
+    if templates is not None:
+        yield templates
+        return
+    install_template_timer()
+    templates = []
+    token = _current_templates.set(templates)
+    try:
+        yield templates
+    finally:
+        _current_templates.reset(token)
+
+
+def get_call_site(templates=None):
+    """Primer archivo del proyecto en la pila (``ruta:línea (función)``) y la plantilla en render."""
+    if templates is None:
+        templates = _current_templates.get() or ()
+    site = '?'
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if (
+            filename.startswith(PROJECT_DIR)
+            and 'site-packages' not in filename
+            and frame.f_globals.get('__name__') not in INSTRUMENTATION_MODULES
+        ):
+            site = f'{filename[len(PROJECT_DIR):]}:{frame.f_lineno} ({frame.f_code.co_name})'
+            break
+        frame = frame.f_back
+    return f'{site} en {templates[-1]}' if templates else site
+
+
+class RequestProfile:
+    """Mediciones de una petición: consultas SQL, tiempo de plantillas y consultas más lentas.
+
+    Se instala como ``execute_wrapper`` de las conexiones mientras dura la petición.
+    """
+
+    def __init__(self, slowest=5, templates=None):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        # Consultas ejecutadas dentro de las plantillas (se descuentan del tiempo de plantillas)
+        self.template_sql_time = 0.0
+        self.templates = templates if templates is not None else []
+        self.slowest_limit = slowest
+        self._slowest = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.record_query(sql, time.perf_counter() - start)
+
+    def record_query(self, sql, duration):
+        self.queries += 1
+        self.sql_time += duration
+        if self.templates:
+            self.template_sql_time += duration
+        # El origen solo se calcula para las consultas que entran entre las más lentas
+        if self.slowest_limit and (len(self._slowest) < self.slowest_limit or duration > self._slowest[0][0]):
+            entry = (duration, self.queries, sql, get_call_site(self.templates))
+            if len(self._slowest) < self.slowest_limit:
+                heapq.heappush(self._slowest, entry)
+            else:
+                heapq.heapreplace(self._slowest, entry)
+
+    @property
+    def slowest(self):
+        """Consultas más lentas: [(segundos, sql, origen)], de mayor a menor."""
+        return [(duration, sql, site) for duration, _, sql, site in sorted(self._slowest, reverse=True)]
+
+    def timings(self, total):
+        """Segundos por componente; ``app`` es el resto (vista, middleware, serialización)."""
+        template = max(self.template_time - self.template_sql_time, 0)
+        return {
+            'sql': self.sql_time,
+            'tpl': template,
+            'app': max(total - self.sql_time - template, 0),
+            'total': total,
+        }
+
+
+def install_template_timer():
+    """Envuelve ``Template.render`` (una sola vez) para medir las plantillas de la petición en curso.
+
+    Solo se cuenta la plantilla exterior; las incluidas quedan dentro de su tiempo.
+    """
+    if getattr(Template.render, 'profiled', False):
+        return
+    original = Template.render
+
+    @wraps(original)
+    def render(self, context):
+        templates = _current_templates.get()
+        if templates is None:
+            return original(self, context)
+        templates.append(self.name or '<string>')
+        start = time.perf_counter()
+        try:
+            return original(self, context)
+        finally:
+            templates.pop()
+            profile = _current_profile.get()
+            if not templates and profile is not None:
+                profile.template_time += time.perf_counter() - start
+
+    render.profiled = True
+    Template.render = render
+
+
+def format_server_timing(timings, queries):
+    """Cabecera ``Server-Timing`` con los tiempos en milisegundos."""
+    descriptions = {'sql': f'{queries} consultas', 'tpl': 'Plantillas', 'app': 'Vista', 'total': 'Total'}
+    return ', '.join(
+        f'{name};dur={seconds * 1000:.1f};desc="{descriptions[name]}"' for name, seconds in timings.items()
+    )
+
+
+def _escape_label(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_escape_label(value)}"' for name, value in labels.items()) + '}'
+
+
+class ViewMetrics:
+    """Histogramas por vista y método de la duración y las consultas SQL de las peticiones.
+
+    Se guardan en memoria de cada proceso: con varios workers cada uno expone
+    sus propias métricas.
+    """
+
+    def __init__(self, duration_buckets=DURATION_BUCKETS, query_buckets=QUERY_BUCKETS):
+        self.duration_buckets = duration_buckets
+        self.query_buckets = query_buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._views = {}
+            self.sampled = 0
+
+    def observe(self, view, method, timings, queries):
+        with self._lock:
+            entry = self._views.get((view, method))
+            if entry is None:
+                entry = self._views[(view, method)] = {
+                    'duration': [0] * len(self.duration_buckets),
+                    'queries': [0] * len(self.query_buckets),
+                    'count': 0,
+                    'duration_sum': 0.0,
+                    'queries_sum': 0,
+                    'sql': 0.0,
+                    'tpl': 0.0,
+                }
+            entry['count'] += 1
+            entry['duration_sum'] += timings['total']
+            entry['queries_sum'] += queries
+            entry['sql'] += timings['sql']
+            entry['tpl'] += timings['tpl']
+            for index, bound in enumerate(self.duration_buckets):
+                if timings['total'] <= bound:
+                    entry['duration'][index] += 1
+            for index, bound in enumerate(self.query_buckets):
+                if queries <= bound:
+                    entry['queries'][index] += 1
+
+    def add_sample(self):
+        with self._lock:
+            self.sampled += 1
+
+    def render(self):
+        """Métricas en el formato de texto de Prometheus, incluida la caché de fragmentos."""
+        with self._lock:
+            views = sorted((key, {**entry, 'duration': list(entry['duration']), 'queries': list(entry['queries'])})
+                           for key, entry in self._views.items())
+            sampled = self.sampled
+
+        lines = []
+
+        def histogram(name, help_text, buckets, field, sum_field):
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} histogram'])
+            for (view, method), entry in views:
+                for bound, count in zip(buckets, entry[field]):
+                    lines.append(f'{name}_bucket{_labels(view=view, method=method, le=bound)} {count}')
+                lines.append(f'{name}_bucket{_labels(view=view, method=method, le="+Inf")} {entry["count"]}')
+                lines.append(f'{name}_sum{_labels(view=view, method=method)} {entry[sum_field]}')
+                lines.append(f'{name}_count{_labels(view=view, method=method)} {entry["count"]}')
+
+        def metric(name, kind, help_text, samples):
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} {kind}'])
+            lines.extend(f'{name}{labels} {value}' for labels, value in samples)
+
+        histogram('tasks_request_duration_seconds', 'Duración de las peticiones por vista',
+                  self.duration_buckets, 'duration', 'duration_sum')
+        histogram('tasks_request_queries', 'Consultas SQL por petición y vista',
+                  self.query_buckets, 'queries', 'queries_sum')
+        metric('tasks_request_sql_seconds_total', 'counter', 'Tiempo en consultas SQL por vista',
+               [(_labels(view=view, method=method), entry['sql']) for (view, method), entry in views])
+        metric('tasks_request_template_seconds_total', 'counter', 'Tiempo en plantillas (sin SQL) por vista',
+               [(_labels(view=view, method=method), entry['tpl']) for (view, method), entry in views])
+        metric('tasks_profiles_sampled_total', 'counter', 'Peticiones perfiladas con cProfile', [('', sampled)])
+
+        fragments = get_fragment_cache_stats()
+        metric('tasks_fragment_cache_size', 'gauge', 'Fragmentos en la caché de este proceso', [('', fragments['size'])])
+        metric('tasks_fragment_cache_max_size', 'gauge', 'Capacidad de la caché de fragmentos',
+               [('', fragments['max_size'])])
+        for field in ('hits', 'shared_hits', 'misses', 'evictions'):
+            metric(f'tasks_fragment_cache_{field}_total', 'counter', f'Caché de fragmentos: {field}',
+                   [('', fragments[field])])
+        return '\n'.join(lines) + '\n'
+
+
+view_metrics = ViewMetrics()
+
+
+class ProfilingMiddleware:
+    """Perfil de cada petición, activado con ``PROFILING_ENABLED``.
+
+    Mide el tiempo total, las consultas SQL (cantidad y tiempo) y el tiempo de
+    las plantillas; los expone en la cabecera ``Server-Timing`` y en los
+    histogramas de ``view_metrics``. Las peticiones más lentas que
+    ``PROFILING_SLOW_REQUEST_MS`` se registran con sus consultas más lentas y
+    su origen. Una fracción ``PROFILING_SAMPLE_RATE`` de las peticiones se
+    ejecuta con cProfile y se guarda en ``PROFILING_DIR``.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILING_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slowest = getattr(settings, 'PROFILING_SLOWEST_QUERIES', 5)
+        self.slow_request = getattr(settings, 'PROFILING_SLOW_REQUEST_MS', 500) / 1000
+        self.sample_rate = getattr(settings, 'PROFILING_SAMPLE_RATE', 0.0)
+        self.profile_dir = Path(getattr(settings, 'PROFILING_DIR', settings.BASE_DIR / 'profiles'))
+
+    def __call__(self, request):
+        profiler = cProfile.Profile() if self.sample_rate and random.random() < self.sample_rate else None
+        with ExitStack() as stack:
+            profile = RequestProfile(self.slowest, stack.enter_context(template_stack()))
+            stack.callback(_current_profile.reset, _current_profile.set(profile))
+            for alias in connections:
+                stack.enter_context(connections[alias].execute_wrapper(profile))
+            if profiler is not None:
+                profiler.enable()
+                stack.callback(profiler.disable)
+            response = self.get_response(request)
+
+        total = time.perf_counter() - profile.started
+        timings = profile.timings(total)
+        match = request.resolver_match
+        view = match.view_name if match is not None else '<sin ruta>'
+        response['Server-Timing'] = format_server_timing(timings, profile.queries)
+        view_metrics.observe(view, request.method, timings, profile.queries)
+
+        if total >= self.slow_request:
+            self.log_slow_request(request, response, profile, timings)
+        if profiler is not None:
+            self.dump_profile(profiler, view)
+        return response
+
+    def log_slow_request(self, request, response, profile, timings):
+        lines = [
+            f'{request.method} {request.path} {response.status_code}: {timings["total"] * 1000:.0f} ms, '
+            f'{profile.queries} consultas en {timings["sql"] * 1000:.0f} ms, plantillas {timings["tpl"] * 1000:.0f} ms'
+        ]
+        lines += [f'  {duration * 1000:.1f} ms {site}: {sql}' for duration, sql, site in profile.slowest]
+        logger.warning('\n'.join(lines))
+
+    def dump_profile(self, profiler, view):
+        """Guarda el perfil en un archivo ``.prof`` (leer con ``pstats`` o snakeviz)."""
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        name = f'{view.replace(":", "-")}-{timezone.now():%Y%m%d-%H%M%S-%f}-{os.getpid()}.prof'
+        profiler.dump_stats(self.profile_dir / name)
+        view_metrics.add_sample()
@@ -0,0 +1,82 @@
+from contextlib import ContextDecorator
+
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test.utils import CaptureQueriesContext
+
+from .diagnostics import detect_n_plus_one
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Se ejecutaron más consultas SQL que las permitidas."""
+
+
+def format_queries(queries):
+    """Lista numerada de las consultas capturadas, para los mensajes de error."""
+    return '\n'.join(f'{number}. {query["sql"]}' for number, query in enumerate(queries, 1))
+
+
+class query_budget(ContextDecorator):
+    """Falla si el bloque (o la función decorada) ejecuta más de ``max_queries`` consultas.
+
+    Uso: ``with query_budget(3): ...`` o ``@query_budget(3)``.
+    """
+
+    def __init__(self, max_queries, using=DEFAULT_DB_ALIAS):
+        self.max_queries = max_queries
+        self.using = using
+
+    def __enter__(self):
+        self.context = CaptureQueriesContext(connections[self.using])
+        self.context.__enter__()
+        return self.context
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.context.__exit__(exc_type, exc_value, traceback)
+        if exc_type is None and len(self.context) > self.max_queries:
+            raise QueryBudgetExceeded(
+                f'{len(self.context)} consultas ejecutadas, máximo {self.max_queries}:\n'
+                f'{format_queries(self.context.captured_queries)}'
+            )
+        return False
+
+
+def count_queries(func, using=DEFAULT_DB_ALIAS):
+    """Ejecuta ``func()`` y retorna las consultas capturadas."""
+    with CaptureQueriesContext(connections[using]) as context:
+        func()
+    return context.captured_queries
+
+
+class QueryBudgetMixin:
+    """Aserciones de cantidad de consultas para los TestCase."""
+
+    def assertQueryBudget(self, max_queries, using=DEFAULT_DB_ALIAS):
+        return query_budget(max_queries, using)
+
+    def assertNoNPlusOne(self, threshold=None):
+        """Falla si el bloque repite una misma lectura ``threshold`` veces o más."""
+        return detect_n_plus_one(threshold)
+
+    def assertConstantQueries(self, func, add_rows, sizes=(2, 20), using=DEFAULT_DB_ALIAS):
+        """Verifica que ``func()`` ejecute las mismas consultas con cualquier cantidad de filas.
+
+        ``add_rows(n)`` crea ``n`` filas más. Para cada tamaño se ejecuta
+        ``func()`` una vez para llenar las cachés (roles, estadísticas) y se
+        cuentan las consultas de la segunda ejecución. Retorna esa cantidad.
+        """
+        counts = []
+        created = 0
+        for size in sizes:
+            add_rows(size - created)
+            created = size
+            func()
+            counts.append(count_queries(func, using))
+
+        first = counts[0]
+        for size, queries in zip(sizes[1:], counts[1:]):
+            if len(queries) != len(first):
+                self.fail(
+                    f'{len(first)} consultas con {sizes[0]} filas y {len(queries)} con {size}:\n'
+                    f'{format_queries(queries)}'
+                )
+        return len(first)
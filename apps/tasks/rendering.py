@@ -0,0 +1,110 @@
+import base64
+import binascii
+from datetime import datetime
+
+from django.db.models import Q
+from django.template import RequestContext
+from django.template.loader import get_template
+from django.utils.html import format_html
+from django.utils.safestring import mark_safe
+
+from .fragments import fragment_cache, fragment_key
+
+# Tareas por página en las listas HTMX
+TASK_PAGE_SIZE = 25
+
+
+def encode_cursor(task):
+    """Codifica la posición (created_at, id) de una tarea para la página siguiente."""
+    value = f'{task.created_at.isoformat()}|{task.pk}'
+    return base64.urlsafe_b64encode(value.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """Retorna (created_at, id) desde un cursor, o None si no es válido."""
+    try:
+        created_at, pk = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(pk)
+    except (binascii.Error, UnicodeError, ValueError):
+        return None
+
+
+def page_queryset(queryset, cursor=None, page_size=TASK_PAGE_SIZE):
+    """Consulta de una página: orden ``-created_at, -id``, posición del cursor y una tarea extra."""
+    queryset = queryset.order_by('-created_at', '-id')
+
+    position = decode_cursor(cursor) if cursor else None
+    if position is not None:
+        created_at, pk = position
+        # Equivale a created_at < x OR (created_at = x AND id < y), pero el rango sobre
+        # created_at permite recorrer el índice en orden sin un OR entre dos índices
+        queryset = queryset.filter(Q(created_at__lt=created_at) | Q(id__lt=pk), created_at__lte=created_at)
+
+    # Se pide una tarea extra para saber si existe una página siguiente
+    return queryset[:page_size + 1]
+
+
+def paginate_tasks(queryset, cursor=None, page_size=TASK_PAGE_SIZE):
+    """Retorna (tareas, cursor siguiente) usando paginación por keyset.
+
+    Las tareas se ordenan por ``-created_at, -id`` y cada página continúa
+    desde la última tarea de la anterior, por lo que el costo no depende de
+    cuántas páginas se hayan recorrido.
+    """
+    tasks = list(page_queryset(queryset, cursor, page_size))
+    if len(tasks) > page_size:
+        return tasks[:page_size], encode_cursor(tasks[page_size - 1])
+    return tasks, None
+
+
+def render_task_rows(request, template_name, tasks, context=None, use_cache=True):
+    """Renderiza una fila por tarea con la plantilla indicada.
+
+    Las filas se toman de la caché de fragmentos, con llave (tarea, fecha de
+    actualización, variables del contexto, p. ej. el rol). Solo las filas que
+    faltan se renderizan, contra un único contexto con los context processors
+    ya ejecutados. Las plantillas de fila no deben depender del request.
+    """
+    context = context or {}
+    variant = ','.join(f'{name}={value}' for name, value in sorted(context.items()))
+    keys = [fragment_key(template_name, task, variant) for task in tasks]
+    cached = fragment_cache.get_many(keys) if use_cache else {}
+
+    missing = [(key, task) for key, task in zip(keys, tasks) if key not in cached]
+    if missing:
+        template = get_template(template_name).template
+        request_context = RequestContext(request, context)
+        rendered = {}
+        with request_context.bind_template(template):
+            for key, task in missing:
+                with request_context.push(task=task):
+                    rendered[key] = template.render(request_context)
+        if use_cache:
+            fragment_cache.set_many(rendered)
+        cached = {**cached, **rendered}
+
+    return mark_safe(''.join(cached[key] for key in keys))
+
+
+def render_next_page_trigger(request, url, cursor):
+    """Elemento que carga la página siguiente cuando se hace visible (hx-trigger="revealed")."""
+    if cursor is None:
+        return mark_safe('')
+    params = request.GET.copy()
+    params['cursor'] = cursor
+    return format_html(
+        '<div hx-get="{}?{}" hx-trigger="revealed" hx-swap="outerHTML" '
+        'class="p-4 text-center text-sm text-gray-400">Cargando más tareas...</div>',
+        url,
+        params.urlencode(),
+    )
+
+
+def render_task_page(request, template_name, queryset, url, context=None):
+    """Renderiza la página pedida (``?cursor=``) y el disparador de la siguiente.
+
+    Retorna un texto vacío si la página no tiene tareas.
+    """
+    tasks, next_cursor = paginate_tasks(queryset, request.GET.get('cursor'))
+    html = render_task_rows(request, template_name, tasks, context)
+    return html + render_next_page_trigger(request, url, next_cursor)
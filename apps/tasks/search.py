@@ -0,0 +1,160 @@
+import re
+
+from django.db import DEFAULT_DB_ALIAS, connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+from .models import Task
+
+# Tabla FTS5 (SQLite) y columna tsvector (PostgreSQL) creadas en la migración 0006
+FTS_TABLE = 'tasks_task_fts'
+SEARCH_VECTOR_COLUMN = 'search_vector'
+SEARCH_CONFIG = 'spanish'
+
+# Cantidad máxima de resultados de la búsqueda con ranking
+SEARCH_RESULTS_LIMIT = 50
+
+_WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+# Resultado de la verificación del índice por base de datos
+_full_text_available = {}
+
+
+def get_search_terms(text):
+    """Separa el texto de búsqueda en palabras."""
+    return _WORD_RE.findall(text or '')
+
+
+def is_full_text_available():
+    """Indica si la base de datos actual tiene el índice de texto completo."""
+    if connection.vendor == 'postgresql':
+        return True
+    if connection.vendor != 'sqlite':
+        return False
+
+    # La tabla FTS5 no existe si SQLite se compiló sin FTS5 (la migración la omite)
+    name = connection.settings_dict['NAME']
+    if name not in _full_text_available:
+        _full_text_available[name] = FTS_TABLE in connection.introspection.table_names()
+    return _full_text_available[name]
+
+
+def _match_query(terms):
+    # Cada palabra se busca como prefijo para que la búsqueda en vivo funcione mientras se escribe
+    if connection.vendor == 'postgresql':
+        return ' & '.join(f'{term}:*' for term in terms)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def _match_ids_sql():
+    if connection.vendor == 'postgresql':
+        return (
+            f'SELECT id FROM {Task._meta.db_table} '
+            f"WHERE {SEARCH_VECTOR_COLUMN} @@ to_tsquery('{SEARCH_CONFIG}', %s)"
+        )
+    return f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s'
+
+
+def search_condition(text):
+    """Retorna la condición (Q) que busca el texto en el título o la descripción.
+
+    Usa el índice de texto completo cuando existe y ``icontains`` en otro caso
+    (o si el texto no contiene palabras).
+    """
+    terms = get_search_terms(text)
+    if not terms or not is_full_text_available():
+        return Q(title__icontains=text) | Q(description__icontains=text)
+    return Q(pk__in=RawSQL(_match_ids_sql(), [_match_query(terms)]))
+
+
+def search_tasks(queryset, text):
+    """Filtra un queryset de tareas por texto en el título o la descripción."""
+    return queryset.filter(search_condition(text))
+
+
+def rank_tasks(queryset, text, limit=SEARCH_RESULTS_LIMIT):
+    """Retorna las tareas del queryset que coinciden con el texto, ordenadas por relevancia.
+
+    El título pesa más que la descripción. Sin índice de texto completo se
+    ordenan por fecha de creación.
+    """
+    terms = get_search_terms(text)
+    if not terms or not is_full_text_available():
+        return list(search_tasks(queryset, text).order_by('-created_at')[:limit])
+
+    match = _match_query(terms)
+    if connection.vendor == 'postgresql':
+        rank = RawSQL(
+            f"ts_rank({Task._meta.db_table}.{SEARCH_VECTOR_COLUMN}, to_tsquery('{SEARCH_CONFIG}', %s))",
+            [match]
+        )
+        return list(
+            search_tasks(queryset, text).annotate(search_rank=rank).order_by('-search_rank', '-created_at')[:limit]
+        )
+
+    # En SQLite el ranking se calcula en una sola consulta a la tabla FTS5 (bm25 es menor
+    # cuanto más relevante); una subconsulta por fila recorrería el índice por cada tarea
+    scope_sql, scope_params = queryset.order_by().values('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s AND +rowid IN ({scope_sql}) '
+            f'ORDER BY bm25({FTS_TABLE}, 10.0, 1.0) LIMIT %s',
+            [match, *scope_params, limit]
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    tasks = queryset.in_bulk(ids)
+    return [tasks[pk] for pk in ids if pk in tasks]
+
+
+# Triggers que mantienen la tabla FTS5. SQLite los elimina junto con la tabla de
+# tareas cuando una migración la reconstruye (p. ej. al cambiar una columna)
+FTS_TRIGGERS = {
+    'tasks_task_fts_insert': f"""
+        CREATE TRIGGER tasks_task_fts_insert AFTER INSERT ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+    'tasks_task_fts_delete': f"""
+        CREATE TRIGGER tasks_task_fts_delete AFTER DELETE ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+        END
+    """,
+    'tasks_task_fts_update': f"""
+        CREATE TRIGGER tasks_task_fts_update AFTER UPDATE OF title, description ON tasks_task BEGIN
+            INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+            VALUES ('delete', old.id, old.title, old.description);
+            INSERT INTO {FTS_TABLE}(rowid, title, description)
+            VALUES (new.id, new.title, new.description);
+        END
+    """,
+}
+
+
+def repair_search_index(using=DEFAULT_DB_ALIAS, rebuild=False):
+    """Recrea los triggers FTS5 que falten y reconstruye el índice (solo SQLite).
+
+    Sin ``rebuild`` el índice solo se reconstruye si faltaba algún trigger,
+    porque entonces pudo quedar desactualizado. Retorna los triggers
+    recreados, o ``None`` si la base no tiene índice FTS5. En PostgreSQL la
+    columna tsvector es generada y no requiere mantenimiento.
+    """
+    connection = connections[using]
+    if connection.vendor != 'sqlite' or FTS_TABLE not in connection.introspection.table_names():
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [Task._meta.db_table])
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in FTS_TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(FTS_TRIGGERS[name])
+        if missing or rebuild:
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+    return missing
+
+
+def rebuild_search_index(using=DEFAULT_DB_ALIAS):
+    """Reconstruye el índice FTS5 desde la tabla de tareas, recreando los triggers que falten."""
+    return repair_search_index(using, rebuild=True)
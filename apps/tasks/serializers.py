@@ -2,7 +2,29 @@ from rest_framework import serializers
 from .models import Task
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """Permite limitar los campos de las lecturas con ``?fields=id,title``."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+
+        requested = get_requested_fields(request)
+        if requested:
+            for name in set(self.fields) - requested:
+                self.fields.pop(name)
+
+
+def get_requested_fields(request):
+    """Retorna el conjunto de campos pedidos en ``?fields=`` (vacío si no se indicó)."""
+    fields = request.query_params.get('fields', '')
+    return {name.strip() for name in fields.split(',') if name.strip()}
+
+
+class TaskSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
     created_at_formatted = serializers.SerializerMethodField()
     updated_at_formatted = serializers.SerializerMethodField()
@@ -38,7 +60,7 @@ class TaskSerializer(serializers.ModelSerializer):
         return value.strip()
 
 
-class TaskListSerializer(serializers.ModelSerializer):
+class TaskListSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
 
 
     created_at_formatted = serializers.SerializerMethodField()
@@ -63,4 +85,40 @@ class TaskToggleSerializer(serializers.ModelSerializer):
     class Meta:
         model = Task
         fields = ['id', 'completed']
-        read_only_fields = ['id']
\ No newline at end of file
+        read_only_fields = ['id']
+
+# Máximo de tareas por petición en los endpoints masivos
+BULK_MAX_ITEMS = 5000
+
+
+class TaskBulkUpdateSerializer(serializers.ModelSerializer):
+
+    id = serializers.IntegerField(min_value=1)
+
+    class Meta:
+        model = Task
+        fields = ['id', 'title', 'description', 'completed']
+
+    def validate_title(self, value):
+
+        if len(value.strip()) < 3:
+            raise serializers.ValidationError(
+                "El título debe tener al menos 3 caracteres."
+            )
+        return value.strip()
+
+    def validate(self, attrs):
+
+        if 'id' not in attrs:
+            raise serializers.ValidationError({'id': 'Este campo es requerido.'})
+        return attrs
+
+
+class TaskBulkIdsSerializer(serializers.Serializer):
+
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        allow_empty=False,
+        max_length=BULK_MAX_ITEMS,
+    )
+    completed = serializers.BooleanField(required=False, allow_null=True, default=None)
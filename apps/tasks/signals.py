@@ -0,0 +1,94 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.dispatch import receiver
+
+from .autocomplete import batched_index_changes, index_task, unindex_task
+from .database import apply_sqlite_pragmas
+from .events import batched_task_events, publish_task_event
+from .models import Task, TaskCounter
+from .search import repair_search_index
+from .stats import deferred_stats_invalidation, invalidate_task_stats
+
+
+@contextmanager
+def batched_task_signals():
+    """Agrupa el trabajo de las señales de cada fila durante una operación masiva.
+
+    Los contadores se escriben una vez por usuario, las estadísticas se
+    invalidan una sola vez, el índice de autocompletado se actualiza en un
+    solo ``on_commit`` y se publica un evento por acción.
+    """
+    with ExitStack() as stack:
+        stack.enter_context(batched_task_events())
+        stack.enter_context(batched_index_changes())
+        stack.enter_context(deferred_stats_invalidation())
+        stack.enter_context(TaskCounter.deferred())
+        yield
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def task_changed(sender, instance, **kwargs):
+    """Invalida las estadísticas en caché cuando cambia una tarea."""
+    invalidate_task_stats()
+
+
+@receiver(pre_delete, sender=Task)
+def task_deleting(sender, instance, **kwargs):
+    """Lee el estado de la tarea desde la fila bloqueada, dentro de la transacción del borrado.
+
+    No depende de los campos cargados en la instancia (``only``/``defer``),
+    que ya no se podrían leer después de borrar la fila, ni de si la
+    instancia quedó desactualizada.
+    """
+    instance._counter_state = (
+        Task.objects.select_for_update().filter(pk=instance.pk)
+        .values_list('assigned_to_id', 'completed').first()
+    )
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted(sender, instance, **kwargs):
+    """Descuenta la tarea eliminada de los contadores (también en eliminaciones masivas)."""
+    state = getattr(instance, '_counter_state', None)
+    if state is not None:
+        TaskCounter.track_change(state, None)
+
+
+@receiver(post_save, sender=Task)
+def task_saved_autocomplete(sender, instance, **kwargs):
+    """Actualiza la tarea en el índice de autocompletado del proceso."""
+    index_task(instance)
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted_autocomplete(sender, instance, **kwargs):
+    """Quita la tarea eliminada del índice de autocompletado del proceso."""
+    unindex_task(instance)
+
+
+@receiver(post_save, sender=Task)
+def task_saved_event(sender, instance, created, **kwargs):
+    """Notifica la tarea creada o modificada a los dashboards conectados."""
+    publish_task_event('created' if created else 'updated', [instance.pk])
+
+
+@receiver(post_delete, sender=Task)
+def task_deleted_event(sender, instance, **kwargs):
+    """Notifica la tarea eliminada a los dashboards conectados."""
+    publish_task_event('deleted', [instance.pk])
+
+
+@receiver(connection_created)
+def sqlite_connection_created(sender, connection, **kwargs):
+    """Configura cada conexión SQLite nueva (WAL, busy_timeout, synchronous)."""
+    apply_sqlite_pragmas(connection)
+
+
+@receiver(post_migrate)
+def tasks_migrated(sender, using, **kwargs):
+    """Restaura los triggers del índice de texto completo si una migración reconstruyó la tabla de tareas."""
+    if sender.name == 'apps.tasks':
+        repair_search_index(using)
@@ -0,0 +1,99 @@
+import hashlib
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models import Count, Q
+
+from apps.cache import CacheNamespace
+from .filters import filter_tasks
+from .models import Task, TaskCounter
+
+# Segundos que se mantienen las estadísticas en caché
+STATS_CACHE_TIMEOUT = 60
+
+# Estadísticas por alcance y filtros; toda escritura de tareas cambia la versión
+task_stats_cache = CacheNamespace('tasks:stats', STATS_CACHE_TIMEOUT)
+
+# Invalidaciones pedidas dentro de deferred_stats_invalidation (lista con un elemento si hubo alguna)
+_pending_invalidation = ContextVar('task_stats_invalidation', default=None)
+
+
+def _build_stats(total, completed):
+    return {
+        'total': total,
+        'completed': completed,
+        'pending': total - completed,
+        'completion_rate': (completed / total * 100) if total > 0 else 0,
+    }
+
+
+def get_task_stats(queryset=None, user=None):
+    """Calcula total, completadas, pendientes y porcentaje en una sola consulta.
+
+    Se puede acotar por usuario asignado y/o entregando un queryset ya filtrado.
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    if user is not None:
+        queryset = queryset.filter(assigned_to=user)
+
+    result = queryset.order_by().aggregate(
+        total=Count('pk'),
+        completed=Count('pk', filter=Q(completed=True)),
+    )
+    return _build_stats(result['total'], result['completed'])
+
+
+def invalidate_task_stats():
+    """Invalida todas las estadísticas en caché (también al confirmar la transacción)."""
+    pending = _pending_invalidation.get()
+    if pending is not None:
+        pending[:] = [True]
+        return
+    task_stats_cache.invalidate()
+
+
+@contextmanager
+def deferred_stats_invalidation():
+    """Agrupa las invalidaciones del bloque en una sola al final.
+
+    Pensado para operaciones masivas: las señales de cada fila piden una
+    invalidación, y cada una escribe en la caché y registra un ``on_commit``.
+    """
+    if _pending_invalidation.get() is not None:
+        yield
+        return
+
+    pending = []
+    token = _pending_invalidation.set(pending)
+    try:
+        yield
+    finally:
+        _pending_invalidation.reset(token)
+    if pending:
+        task_stats_cache.invalidate()
+
+
+def get_cached_task_stats(user=None, timeout=None, **filters):
+    """Versión en caché de ``get_task_stats`` para el total o un usuario asignado.
+
+    Los filtros adicionales (``filter_tasks``) forman parte de la llave.
+    """
+    scope = f'user:{user.pk}' if user is not None else 'all'
+    filters_key = ','.join(f'{name}={value}' for name, value in sorted(filters.items()) if value)
+    filters_key = hashlib.md5(filters_key.encode('utf-8')).hexdigest() if filters_key else ''
+
+    def compute():
+        queryset = filter_tasks(Task.objects.all(), **filters) if filters else None
+        return get_task_stats(queryset, user=user)
+
+    return task_stats_cache.get_or_set((scope, filters_key), compute, timeout)
+
+
+def get_counter_stats(user=None):
+    """Lee las estadísticas desde los contadores desnormalizados (sin recorrer las tareas)."""
+    user_id = user.pk if user is not None else None
+    counter = TaskCounter.objects.filter(user_id=user_id).values('total', 'completed').first()
+    if counter is None:
+        return _build_stats(0, 0)
+    return _build_stats(counter['total'], counter['completed'])
@@ -1,8 +1,49 @@
-from django.test import TestCase
+import json
+import os
+import pstats
+import re
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.contrib.auth.models import Group
+from django.contrib.sessions.models import Session
+from django.core import mail
+from django.core.cache.backends.filebased import FileBasedCache
+from django.core.mail import get_connection
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.management.sql import emit_post_migrate_signal
+from django.db import connection, transaction
+from django.db.backends.sqlite3.base import DatabaseWrapper as SQLiteDatabaseWrapper
+from django.test import LiveServerTestCase, RequestFactory, TestCase, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from rest_framework.test import APITestCase
 from rest_framework import status
-from .models import Task
+from openpyxl import load_workbook
+from reportlab.platypus import SimpleDocTemplate, Spacer
+from apps.cache import CacheNamespace, get_cache
+from apps.users.models import User
+from .autocomplete import PrefixIndex, get_task_index, invalidate_task_index, reset_task_index, suggest
+from .benchmarking import compare_results
+from .diagnostics import NPlusOneDetected, fingerprint
+from .events import get_broker, merge_events, stream_task_events
+from .explain import explain, get_hot_queries
+from .pagination import TaskCursorPagination
+from .exporters import PDF_ROWS_PER_TABLE, LazyFlowables, iter_pdf_tables
+from .fragments import LRUFragmentCache, fragment_cache
+from .jobs import EXPORT_JOB_LEASE, claim_next_job, process_pending_jobs, run_export_job
+from .notifications import OUTBOX_MAX_ATTEMPTS, process_outbox
+from .profiling import RequestProfile, view_metrics
+from .query_budget import QueryBudgetExceeded, QueryBudgetMixin, count_queries, format_queries, query_budget
+from .models import ExportJob, OutboxEmail, Task, TaskCounter
+from .rendering import TASK_PAGE_SIZE, paginate_tasks, render_task_rows
+from .search import FTS_TRIGGERS, is_full_text_available, rank_tasks, repair_search_index, search_tasks
+from .seeding import SEED_EMAIL_DOMAIN, clear_seeded_data, seed
+from .stats import get_cached_task_stats, get_counter_stats, get_task_stats, task_stats_cache
 
 
 class TaskModelTest(TestCase):
@@ -50,7 +91,7 @@ class TaskAPITest(APITestCase):
         """Test de listado de tareas."""
         response = self.client.get(self.list_url)
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_create_task(self):
         """Test de creación de tarea."""
@@ -105,11 +146,1541 @@ class TaskAPITest(APITestCase):
         Task.objects.create(title='Completed Task', description='Test', completed=True)
         response = self.client.get(self.list_url, {'completed': 'true'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
+        self.assertEqual(len(response.data['results']), 1)
 
     def test_search_tasks(self):
         """Test de búsqueda de tareas."""
         Task.objects.create(title='Special Task', description='Test')
         response = self.client.get(self.list_url, {'search': 'Special'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertEqual(len(response.data), 1)
\ No newline at end of file
+        self.assertEqual(len(response.data['results']), 1)
+
+    def test_cursor_pagination(self):
+        """Test de paginación por cursor sin repetir ni omitir tareas."""
+        for i in range(4):
+            Task.objects.create(title=f'Paginada {i}')
+        response = self.client.get(self.list_url, {'page_size': 2})
+        first_page = [task['id'] for task in response.data['results']]
+        self.assertEqual(len(first_page), 2)
+        self.assertIsNotNone(response.data['next'])
+
+        # Una inserción concurrente no desplaza las páginas siguientes
+        Task.objects.create(title='Insertada entre páginas')
+
+        seen = list(first_page)
+        next_url = response.data['next']
+        while next_url:
+            response = self.client.get(next_url)
+            seen.extend(task['id'] for task in response.data['results'])
+            next_url = response.data['next']
+        self.assertEqual(len(seen), 5)
+        self.assertEqual(len(set(seen)), 5)
+
+    def test_sparse_fieldsets(self):
+        """Test del parámetro fields para limitar los campos."""
+        response = self.client.get(self.list_url, {'fields': 'id,title,completed'})
+        self.assertEqual(set(response.data['results'][0]), {'id', 'title', 'completed'})
+
+        response = self.client.get(self.detail_url, {'fields': 'title'})
+        self.assertEqual(set(response.data), {'title'})
+
+
+class TaskBulkAPITest(APITestCase):
+    """Tests para los endpoints masivos de la API."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='bulk@test.com', password='test1234')
+        self.creator = User.objects.create_user(email='creador@test.com', password='test1234')
+        self.tasks = [
+            Task.objects.create(title=f'Masiva {i}', assigned_to=self.user, created_by=self.creator)
+            for i in range(3)
+        ]
+        self.bulk_url = reverse('tasks:task-bulk')
+
+    def assertCounter(self, user, total, completed):
+        counter = TaskCounter.objects.get(user=user)
+        self.assertEqual((counter.total, counter.completed), (total, completed))
+
+    def test_bulk_create(self):
+        """Test de creación masiva con una sola actualización de contadores."""
+        data = [{'title': f'Nueva {i}'} for i in range(5)]
+        response = self.client.post(self.bulk_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(response.data['data']), 5)
+        self.assertEqual(Task.objects.count(), 8)
+        self.assertCounter(None, 8, 0)
+
+    def test_bulk_create_validation_is_atomic(self):
+        """Test de que un elemento inválido impide crear el lote completo."""
+        data = [{'title': 'Válida'}, {'title': 'AB'}]
+        response = self.client.post(self.bulk_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Task.objects.count(), 3)
+
+    def test_bulk_update(self):
+        """Test de actualización masiva con ids inexistentes."""
+        data = [
+            {'id': self.tasks[0].pk, 'title': 'Editada'},
+            {'id': self.tasks[1].pk, 'completed': True},
+            {'id': 999999, 'title': 'No existe'},
+        ]
+        response = self.client.patch(self.bulk_url, data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in response.data['data']],
+            ['updated', 'updated', 'not_found']
+        )
+        self.tasks[0].refresh_from_db()
+        self.assertEqual(self.tasks[0].title, 'Editada')
+        self.assertCounter(self.user, 3, 1)
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_bulk_toggle(self):
+        """Test de cambio de estado masivo con valor explícito e inversión."""
+        ids = [task.pk for task in self.tasks]
+        url = reverse('tasks:task-bulk-toggle')
+
+        response = self.client.post(url, {'ids': ids, 'completed': True}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertCounter(self.user, 3, 3)
+        self.assertCounter(None, 3, 3)
+        self.assertEqual(OutboxEmail.objects.count(), 3)
+
+        Task.objects.filter(pk=ids[0]).update(completed=False)
+        TaskCounter.rebuild()
+        response = self.client.post(url, {'ids': ids}, format='json')
+        states = {item['id']: item['completed'] for item in response.data['data']}
+        self.assertEqual(states, {ids[0]: True, ids[1]: False, ids[2]: False})
+        self.assertCounter(self.user, 3, 1)
+
+    def test_bulk_delete(self):
+        """Test de eliminación masiva."""
+        url = reverse('tasks:task-bulk-delete')
+        response = self.client.post(url, {'ids': [self.tasks[0].pk, 999999]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [item['status'] for item in response.data['data']],
+            ['deleted', 'not_found']
+        )
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertCounter(self.user, 2, 0)
+
+
+class TaskExportTest(TestCase):
+    """Tests para las exportaciones de tareas."""
+
+    def setUp(self):
+        Task.objects.create(title='Exportar pendiente', description='Primera')
+        Task.objects.create(title='Exportar completada', description='Segunda', completed=True)
+
+    def test_export_csv_streaming(self):
+        """Test de exportación CSV en streaming."""
+        response = self.client.get(reverse('tasks:export_csv'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode('utf-8')
+        lines = content.lstrip('\ufeff').strip().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertTrue(lines[0].startswith('ID,'))
+
+    def test_export_csv_filters(self):
+        """Test de exportación CSV respetando los filtros del dashboard."""
+        response = self.client.get(reverse('tasks:export_csv'), {'filter': 'completed'})
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('Exportar completada', content)
+        self.assertNotIn('Exportar pendiente', content)
+
+    def test_export_excel(self):
+        """Test de exportación Excel en modo solo escritura."""
+        response = self.client.get(reverse('tasks:export_excel'))
+        self.assertEqual(response.status_code, 200)
+        workbook = load_workbook(BytesIO(b''.join(response.streaming_content)), read_only=True)
+        self.assertEqual(workbook.sheetnames, ['Tareas', 'Estadísticas'])
+        self.assertEqual(len(list(workbook['Tareas'].iter_rows())), 3)
+
+    def test_export_pdf_chunked(self):
+        """Test de exportación PDF dividida en varias tablas."""
+        Task.objects.bulk_create(Task(title=f'Tarea PDF {i}') for i in range(PDF_ROWS_PER_TABLE * 2))
+        response = self.client.get(reverse('tasks:export_pdf'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+
+    def test_pdf_tables_have_fixed_size(self):
+        """Test de que cada tabla del PDF tiene a lo más PDF_ROWS_PER_TABLE filas."""
+        Task.objects.bulk_create(Task(title=f'Tarea PDF {i}') for i in range(PDF_ROWS_PER_TABLE + 5))
+        tables = list(iter_pdf_tables(Task.objects.all()))
+        self.assertEqual(len(tables), 2)
+        self.assertEqual(tables[0]._nrows, PDF_ROWS_PER_TABLE + 1)
+        self.assertEqual(tables[1]._nrows, 8)
+
+    def test_pdf_build_consumes_flowables_lazily(self):
+        """Test de que reportlab consume LazyFlowables de a poco con la versión instalada.
+
+        ``doc.build`` debe pedir ``len()`` en cada vuelta y sacar los elementos
+        del inicio de la lista; si una versión de reportlab copiara o
+        recorriera la lista de una vez, el generador se agotaría al comenzar
+        o se perderían tablas.
+        """
+        laid_out = set()
+        lookahead = []
+
+        class Probe(Spacer):
+            def wrap(self, available_width, available_height):
+                laid_out.add(self.number)
+                return super().wrap(available_width, available_height)
+
+        def source(count):
+            for number in range(count):
+                lookahead.append(number - len(laid_out))
+                probe = Probe(1, 300)
+                probe.number = number
+                yield probe
+
+        SimpleDocTemplate(BytesIO()).build(LazyFlowables([], source(50), prefetch=2))
+        self.assertEqual(laid_out, set(range(50)))
+        self.assertLessEqual(max(lookahead), 2)
+
+
+@override_settings(MEDIA_ROOT=tempfile.mkdtemp())
+class ExportJobTest(TestCase):
+    """Tests para las exportaciones en segundo plano."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        self.user = User.objects.create_user(email='export@test.com', password='test1234')
+        self.user.groups.add(admin_group)
+        self.client.force_login(self.user)
+        Task.objects.create(title='Tarea exportable', description='Test')
+
+    def test_limited_user_cannot_export_other_tasks(self):
+        """Test de que un usuario limitado no puede exportar las tareas de otros usuarios."""
+        limited_group, _ = Group.objects.get_or_create(name='Usuario Limitado')
+        limited = User.objects.create_user(email='limitado@test.com', password='test1234')
+        limited.groups.add(limited_group)
+        Task.objects.create(title='Tarea propia', assigned_to=limited)
+        self.client.force_login(limited)
+
+        url = reverse('tasks:export_job_create', args=['csv'])
+        response = self.client.post(url)
+        self.assertRedirects(response, f"{reverse('tasks:task_list')}?next={url}", fetch_redirect_response=False)
+        self.assertFalse(ExportJob.objects.exists())
+
+        # Un trabajo encolado antes de la restricción solo exporta sus tareas
+        job = ExportJob.objects.create(format=ExportJob.FORMAT_CSV, requested_by=limited)
+        process_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.total_rows, 1)
+        response = self.client.get(reverse('tasks:export_job_download', args=[job.pk]))
+        content = b''.join(response.streaming_content).decode('utf-8')
+        self.assertIn('Tarea propia', content)
+        self.assertNotIn('Tarea exportable', content)
+
+    def test_job_lifecycle(self):
+        """Test de creación, procesamiento y descarga de una exportación."""
+        response = self.client.post(reverse('tasks:export_job_create', args=['csv']))
+        self.assertEqual(response.status_code, 200)
+        job = ExportJob.objects.get()
+        self.assertEqual(job.status, ExportJob.STATUS_PENDING)
+        self.assertContains(response, 'hx-trigger="every 2s"')
+
+        self.assertEqual(process_pending_jobs(), 1)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertEqual(job.progress, 1)
+
+        response = self.client.get(reverse('tasks:export_job_status', args=[job.pk]))
+        self.assertNotContains(response, 'hx-trigger="every 2s"')
+
+        response = self.client.get(reverse('tasks:export_job_download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Tarea exportable', b''.join(response.streaming_content).decode('utf-8'))
+
+    def test_job_pdf(self):
+        """Test de exportación PDF en segundo plano."""
+        job = ExportJob.objects.create(format=ExportJob.FORMAT_PDF, requested_by=self.user)
+        process_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertTrue(job.file.name.endswith('.pdf'))
+
+    def test_stale_running_job_fails(self):
+        """Test de que un trabajo abandonado por un worker detenido queda fallido."""
+        abandoned = timezone.now() - EXPORT_JOB_LEASE - timedelta(minutes=1)
+        stale = ExportJob.objects.create(
+            format=ExportJob.FORMAT_CSV, requested_by=self.user,
+            status=ExportJob.STATUS_RUNNING, started_at=abandoned, heartbeat_at=abandoned,
+        )
+        legacy = ExportJob.objects.create(
+            format=ExportJob.FORMAT_CSV, requested_by=self.user,
+            status=ExportJob.STATUS_RUNNING, started_at=abandoned,
+        )
+        alive = ExportJob.objects.create(
+            format=ExportJob.FORMAT_CSV, requested_by=self.user,
+            status=ExportJob.STATUS_RUNNING, started_at=abandoned, heartbeat_at=timezone.now(),
+        )
+
+        self.assertIsNone(claim_next_job())
+        for job in (stale, legacy):
+            job.refresh_from_db()
+            self.assertEqual(job.status, ExportJob.STATUS_FAILED)
+            self.assertIn('worker se detuvo', job.error)
+            self.assertIsNotNone(job.finished_at)
+        alive.refresh_from_db()
+        self.assertEqual(alive.status, ExportJob.STATUS_RUNNING)
+
+        response = self.client.get(reverse('tasks:export_job_status', args=[stale.pk]))
+        self.assertNotContains(response, 'hx-trigger="every 2s"')
+
+    def test_progress_renews_heartbeat(self):
+        """Test de que el progreso del worker renueva la señal del trabajo."""
+        job = ExportJob.objects.create(format=ExportJob.FORMAT_CSV, requested_by=self.user)
+        claimed = claim_next_job()
+        self.assertEqual(claimed.heartbeat_at, claimed.started_at)
+        run_export_job(claimed)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.STATUS_DONE)
+        self.assertGreater(job.heartbeat_at, job.started_at)
+
+    def test_job_not_visible_to_other_users(self):
+        """Test de que un usuario no puede ver exportaciones ajenas."""
+        other = User.objects.create_user(email='other@test.com', password='test1234')
+        job = ExportJob.objects.create(format=ExportJob.FORMAT_CSV, requested_by=other)
+        response = self.client.get(reverse('tasks:export_job_status', args=[job.pk]))
+        self.assertEqual(response.status_code, 404)
+
+
+class TaskStatsTest(TestCase):
+    """Tests para el servicio de estadísticas de tareas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='stats@test.com', password='test1234')
+        Task.objects.create(title='Completada', completed=True, assigned_to=self.user)
+        Task.objects.create(title='Pendiente asignada', assigned_to=self.user)
+        Task.objects.create(title='Pendiente libre')
+
+    def test_stats_single_query(self):
+        """Test de que las estadísticas se calculan en una sola consulta."""
+        with self.assertNumQueries(1):
+            stats = get_task_stats()
+        self.assertEqual(stats['total'], 3)
+        self.assertEqual(stats['completed'], 1)
+        self.assertEqual(stats['pending'], 2)
+        self.assertAlmostEqual(stats['completion_rate'], 100 / 3)
+
+    def test_stats_by_user(self):
+        """Test de estadísticas acotadas a un usuario."""
+        stats = get_task_stats(user=self.user)
+        self.assertEqual(stats['total'], 2)
+        self.assertEqual(stats['completion_rate'], 50)
+
+    def test_cached_stats_invalidation(self):
+        """Test de invalidación de la caché al modificar tareas."""
+        self.assertEqual(get_cached_task_stats()['total'], 3)
+        with self.assertNumQueries(0):
+            get_cached_task_stats()
+        Task.objects.create(title='Nueva tarea')
+        self.assertEqual(get_cached_task_stats()['total'], 4)
+
+
+
+class CacheNamespaceTest(TestCase):
+    """Tests para las llaves versionadas de la caché."""
+
+    def setUp(self):
+        get_cache().clear()
+        self.namespace = CacheNamespace('tests:namespace', 60)
+
+    def test_invalidate_changes_version(self):
+        """Test de que invalidar deja de leer los valores anteriores."""
+        self.assertEqual(self.namespace.get_or_set(('a',), lambda: 1), 1)
+        self.assertEqual(self.namespace.get_or_set(('a',), lambda: 2), 1)
+        self.namespace.invalidate()
+        self.assertEqual(self.namespace.get_or_set(('a',), lambda: 2), 2)
+
+    def test_invalidate_again_on_commit(self):
+        """Test de que la versión cambia otra vez al confirmar la transacción."""
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.namespace.invalidate()
+            self.namespace.get_or_set(('a',), lambda: 'leído antes de confirmar')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.namespace.get_or_set(('a',), lambda: 'nuevo'), 'nuevo')
+
+    def test_evicted_version_does_not_reuse_keys(self):
+        """Test de que una llave de versión expulsada no vuelve a una versión anterior."""
+        self.namespace.get_or_set(('a',), lambda: 'antiguo')
+        get_cache().delete(self.namespace.version_key)
+        self.assertEqual(self.namespace.get_or_set(('a',), lambda: 'nuevo'), 'nuevo')
+
+    def test_shared_file_cache_invalidation(self):
+        """Test de que con una caché de archivos la invalidación de otro proceso se ve."""
+        with tempfile.TemporaryDirectory() as directory:
+            shared = {'default': {'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache', 'LOCATION': directory}}
+            with override_settings(CACHES=shared):
+                self.assertEqual(get_cached_task_stats()['total'], 0)
+                Task.objects.bulk_create([Task(title='Sin señales')])
+                self.assertEqual(get_cached_task_stats()['total'], 0)
+                # Otro proceso invalida escribiendo la versión en los mismos archivos
+                FileBasedCache(directory, {}).set(task_stats_cache.version_key, 42, None)
+                self.assertEqual(get_cached_task_stats()['total'], 1)
+
+
+class TaskCounterTest(TestCase):
+    """Tests para los contadores desnormalizados de tareas."""
+
+    def setUp(self):
+        self.limited_group = Group.objects.create(name='Usuario Limitado')
+        self.user1 = User.objects.create_user(email='uno@test.com', password='test1234')
+        self.user2 = User.objects.create_user(email='dos@test.com', password='test1234')
+        self.user1.groups.add(self.limited_group)
+        self.user2.groups.add(self.limited_group)
+
+    def assertCounter(self, user, total, completed):
+        counter = TaskCounter.objects.get(user=user)
+        self.assertEqual((counter.total, counter.completed), (total, completed))
+
+    def test_counters_on_create_toggle_delete(self):
+        """Test de contadores al crear, completar y eliminar tareas."""
+        task = Task.objects.create(title='Contada', assigned_to=self.user1)
+        self.assertCounter(self.user1, 1, 0)
+        self.assertCounter(None, 1, 0)
+
+        task.toggle_completed()
+        self.assertCounter(self.user1, 1, 1)
+        self.assertCounter(None, 1, 1)
+
+        task.delete()
+        self.assertCounter(self.user1, 0, 0)
+        self.assertCounter(None, 0, 0)
+
+    def test_counters_on_reassignment(self):
+        """Test de contadores al reasignar una tarea desde el dashboard."""
+        admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.client.force_login(admin)
+        task = Task.objects.create(title='Reasignable', assigned_to=self.user1, completed=True)
+
+        response = self.client.post(
+            reverse('tasks:dashboard_task_update', args=[task.pk]),
+            {'title': 'Reasignable', 'assigned_to': self.user2.pk}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertCounter(self.user1, 0, 0)
+        self.assertCounter(self.user2, 1, 1)
+        self.assertCounter(None, 1, 1)
+
+    def test_counters_on_save_with_deferred_fields(self):
+        """Test de que guardar una tarea cargada con only() no altera los contadores."""
+        task = Task.objects.create(title='Diferida', assigned_to=self.user1, completed=True)
+        deferred = Task.objects.only('title').get(pk=task.pk)
+        deferred.title = 'Diferida editada'
+        deferred.save()
+        self.assertCounter(self.user1, 1, 1)
+        self.assertCounter(None, 1, 1)
+
+    def test_counters_with_stale_instances(self):
+        """Test de dos cambios de estado desde instancias cargadas antes de ambos."""
+        task = Task.objects.create(title='Concurrente', assigned_to=self.user1)
+        first, second = Task.objects.get(pk=task.pk), Task.objects.get(pk=task.pk)
+        first.completed = second.completed = True
+        first.save()
+        second.save()
+        self.assertCounter(self.user1, 1, 1)
+        self.assertCounter(None, 1, 1)
+
+    def test_counters_on_delete_with_deferred_fields(self):
+        """Test de que eliminar tareas cargadas con only() descuenta su estado real."""
+        task = Task.objects.create(title='Diferida', assigned_to=self.user1, completed=True)
+        Task.objects.only('title').filter(pk=task.pk).delete()
+        self.assertCounter(self.user1, 0, 0)
+        self.assertCounter(None, 0, 0)
+
+    def test_counters_on_delete_with_stale_instance(self):
+        """Test de eliminar una instancia cargada antes de que otra cambiara la tarea."""
+        task = Task.objects.create(title='Desactualizada', assigned_to=self.user1)
+        stale = Task.objects.get(pk=task.pk)
+        task.toggle_completed()
+        stale.delete()
+        self.assertCounter(self.user1, 0, 0)
+        self.assertCounter(None, 0, 0)
+
+    def test_counters_on_queryset_delete(self):
+        """Test de contadores con eliminación masiva."""
+        Task.objects.create(title='Masiva 1', assigned_to=self.user1)
+        Task.objects.create(title='Masiva 2', assigned_to=self.user1, completed=True)
+        Task.objects.all().delete()
+        self.assertCounter(self.user1, 0, 0)
+        self.assertCounter(None, 0, 0)
+
+    def test_rebuild_counters(self):
+        """Test de reconstrucción de los contadores."""
+        Task.objects.create(title='Desincronizada', assigned_to=self.user1)
+        TaskCounter.objects.all().delete()
+        TaskCounter.rebuild()
+        self.assertCounter(self.user1, 1, 0)
+        self.assertCounter(None, 1, 0)
+        self.assertEqual(get_counter_stats(self.user2)['total'], 0)
+
+    def test_dashboard_user_stats(self):
+        """Test de estadísticas por usuario del dashboard leídas desde los contadores."""
+        admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.client.force_login(admin)
+        Task.objects.create(title='Del usuario uno', assigned_to=self.user1, completed=True)
+        response = self.client.get(reverse('tasks:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        stats = {user.email: (user.total, user.completed) for user in response.context['user_stats']}
+        self.assertEqual(stats, {'uno@test.com': (1, 1), 'dos@test.com': (0, 0)})
+
+
+class OutboxEmailTest(TestCase):
+    """Tests para la bandeja de salida de emails."""
+
+    def setUp(self):
+        self.creator = User.objects.create_user(email='creador@test.com', password='test1234')
+        self.assignee = User.objects.create_user(email='asignado@test.com', password='test1234')
+        self.task = Task.objects.create(
+            title='Tarea con aviso',
+            created_by=self.creator,
+            assigned_to=self.assignee
+        )
+
+    def test_toggle_enqueues_without_sending(self):
+        """Test de que completar una tarea encola el email sin enviarlo."""
+        self.task.toggle_completed()
+        self.assertEqual(OutboxEmail.objects.filter(task=self.task).count(), 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+        # Volver a pendiente no genera otro email
+        self.task.toggle_completed()
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+
+    def test_task_without_creator_is_not_enqueued(self):
+        """Test de que sin creador no se encola ningún email."""
+        task = Task.objects.create(title='Sin creador', assigned_to=self.assignee)
+        task.toggle_completed()
+        self.assertFalse(OutboxEmail.objects.exists())
+
+    def test_process_outbox_sends_batch(self):
+        """Test del envío por lotes con una sola conexión."""
+        for i in range(3):
+            Task.objects.create(
+                title=f'Aviso {i}', created_by=self.creator, assigned_to=self.assignee
+            ).toggle_completed()
+
+        with mock.patch('apps.tasks.notifications.get_connection', wraps=get_connection) as connection:
+            sent, failed = process_outbox(batch_size=10)
+
+        self.assertEqual((sent, failed), (3, 0))
+        self.assertEqual(connection.call_count, 1)
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(mail.outbox[0].to, ['creador@test.com'])
+        self.assertIn('asignado@test.com', mail.outbox[0].body)
+        self.assertFalse(OutboxEmail.objects.exclude(status=OutboxEmail.STATUS_SENT).exists())
+
+    def test_failed_send_is_retried_with_backoff(self):
+        """Test de reintento con espera exponencial cuando falla el envío."""
+        self.task.toggle_completed()
+
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')):
+            sent, failed = process_outbox()
+
+        self.assertEqual((sent, failed), (0, 1))
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.STATUS_PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP caído', email.last_error)
+        self.assertGreater(email.next_attempt_at, timezone.now())
+
+        # Aún no corresponde reintentar
+        self.assertEqual(process_outbox(), (0, 0))
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now(), attempts=OUTBOX_MAX_ATTEMPTS - 1)
+        with mock.patch('django.core.mail.backends.locmem.EmailBackend.send_messages', side_effect=OSError('SMTP caído')):
+            process_outbox()
+        self.assertEqual(OutboxEmail.objects.get().status, OutboxEmail.STATUS_FAILED)
+
+
+
+class TaskSearchTest(APITestCase):
+    """Tests para la búsqueda de texto completo."""
+
+    def setUp(self):
+        self.title_match = Task.objects.create(title='Revisar facturación', description='Mensual')
+        self.description_match = Task.objects.create(
+            title='Reunión semanal',
+            description='Preparar la facturación del equipo'
+        )
+        Task.objects.create(title='Otra tarea', description='Sin relación')
+
+    def search(self, text):
+        return set(search_tasks(Task.objects.all(), text).values_list('id', flat=True))
+
+    def test_prefix_and_accent_insensitive(self):
+        """Test de búsqueda por prefijo e ignorando tildes."""
+        expected = {self.title_match.pk, self.description_match.pk}
+        self.assertEqual(self.search('factur'), expected)
+        self.assertEqual(self.search('FACTURACION'), expected)
+        self.assertEqual(self.search('reunion semanal'), {self.description_match.pk})
+
+    def test_index_follows_changes(self):
+        """Test de que el índice se mantiene al editar y eliminar tareas."""
+        self.title_match.title = 'Pagar proveedores'
+        self.title_match.save()
+        self.assertEqual(self.search('proveedores'), {self.title_match.pk})
+        self.assertEqual(self.search('factur'), {self.description_match.pk})
+
+        Task.objects.filter(pk=self.description_match.pk).update(title='Cambio masivo')
+        self.assertEqual(self.search('masivo'), {self.description_match.pk})
+
+        self.description_match.delete()
+        self.assertEqual(self.search('factur'), set())
+
+    def test_ranked_search_prefers_title(self):
+        """Test de que el título pesa más que la descripción en el ranking."""
+        results = rank_tasks(Task.objects.all(), 'facturación')
+        self.assertEqual([task.pk for task in results], [self.title_match.pk, self.description_match.pk])
+
+        # El ranking respeta el queryset recibido (p. ej. tareas de un usuario)
+        results = rank_tasks(Task.objects.exclude(pk=self.title_match.pk), 'facturación')
+        self.assertEqual([task.pk for task in results], [self.description_match.pk])
+
+    def test_text_without_words_uses_icontains(self):
+        """Test de búsqueda de símbolos sin palabras."""
+        task = Task.objects.create(title='Tarea 100%', description='')
+        self.assertEqual(self.search('%'), {task.pk})
+
+    def drop_search_triggers(self):
+        with connection.cursor() as cursor:
+            for name in FTS_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {name}')
+
+    def test_post_migrate_restores_triggers(self):
+        """Test de que después de migrar se recrean los triggers perdidos y se reconstruye el índice."""
+        if not is_full_text_available():
+            self.skipTest('SQLite sin FTS5')
+        # Como al reconstruir la tabla de tareas en una migración de SQLite
+        self.drop_search_triggers()
+        lost = Task.objects.create(title='Creada sin triggers')
+        self.assertEqual(self.search('triggers'), set())
+
+        emit_post_migrate_signal(0, False, 'default')
+        self.assertEqual(self.search('triggers'), {lost.pk})
+        self.assertEqual(repair_search_index(), [])
+
+        Task.objects.filter(pk=lost.pk).update(title='Renombrada')
+        self.assertEqual(self.search('renombrada'), {lost.pk})
+
+    def test_rebuild_search_index_command(self):
+        """Test del comando rebuild_search_index."""
+        if not is_full_text_available():
+            self.skipTest('SQLite sin FTS5')
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Índice de texto completo reconstruido', out.getvalue())
+        self.assertNotIn('Se recrearon', out.getvalue())
+
+        self.drop_search_triggers()
+        out = StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn('Se recrearon los triggers: tasks_task_fts_insert', out.getvalue())
+        self.assertEqual(self.search('factur'), {self.title_match.pk, self.description_match.pk})
+
+    def test_api_search(self):
+        """Test del endpoint de búsqueda con ranking."""
+        response = self.client.get(reverse('tasks:task-search'), {'q': 'facturación', 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([task['id'] for task in response.data['results']], [self.title_match.pk])
+
+        response = self.client.get(reverse('tasks:task-search'))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskAutocompleteTest(TestCase):
+    """Tests para las sugerencias del buscador."""
+
+    def setUp(self):
+        reset_task_index()
+        limited_group, _ = Group.objects.get_or_create(name='Usuario Limitado')
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.user = User.objects.create_user(email='limitado@test.com', password='test1234')
+        self.user.groups.add(limited_group)
+        self.own_task = Task.objects.create(title='Revisar facturación', assigned_to=self.user)
+        self.other_task = Task.objects.create(title='Revisar contrato')
+        self.url = reverse('tasks:task_suggestions')
+
+    def tearDown(self):
+        reset_task_index()
+
+    def test_prefix_index(self):
+        """Test del índice de prefijos: inicio de palabra, tildes y eliminación."""
+        index = PrefixIndex()
+        index.load([(1, 'Revisar facturación', 'task', None), (2, 'Reunión semanal', 'task', 7)])
+        self.assertEqual(index.search('fact'), [('Revisar facturación', 'task')])
+        self.assertEqual(index.search('reu'), [('Reunión semanal', 'task')])
+        self.assertEqual(index.search('re', owner_id=7), [('Reunión semanal', 'task')])
+
+        index.remove(2)
+        self.assertEqual(index.search('reu'), [])
+
+    def test_admin_suggestions(self):
+        """Test de sugerencias de títulos y emails para administradores."""
+        self.client.force_login(self.admin)
+        response = self.client.get(self.url, {'search': 'revi'})
+        self.assertContains(response, 'Revisar facturación')
+        self.assertContains(response, 'Revisar contrato')
+
+        response = self.client.get(self.url, {'search': 'limi'})
+        self.assertContains(response, 'limitado@test.com')
+
+    def test_limited_user_only_sees_own_tasks(self):
+        """Test de que un usuario limitado solo recibe sugerencias de sus tareas."""
+        self.client.force_login(self.user)
+        response = self.client.get(self.url, {'search': 'revi'})
+        self.assertContains(response, 'Revisar facturación')
+        self.assertNotContains(response, 'Revisar contrato')
+
+    def test_index_follows_signals(self):
+        """Test de que el índice se actualiza al confirmar el guardado y la eliminación de tareas."""
+        get_task_index()
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(title='Planificar campaña')
+        self.assertEqual(suggest(self.admin, 'planif'), [('Planificar campaña', 'task')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.title = 'Planificar presupuesto'
+            task.save()
+        self.assertEqual(suggest(self.admin, 'planif'), [('Planificar presupuesto', 'task')])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.delete()
+        self.assertEqual(suggest(self.admin, 'planif'), [])
+
+    def test_rolled_back_changes_are_not_indexed(self):
+        """Test de que un cambio revertido no llega al índice."""
+        get_task_index()
+        with transaction.atomic():
+            Task.objects.create(title='Planificar revertida')
+            transaction.set_rollback(True)
+        self.assertEqual(suggest(self.admin, 'planif'), [])
+
+    def test_reassignment_moves_suggestions(self):
+        """Test de que reasignar una tarea quita la sugerencia al usuario anterior."""
+        other = User.objects.create_user(email='otro@test.com', password='test1234')
+        other.groups.add(Group.objects.get(name='Usuario Limitado'))
+        get_task_index()
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                reverse('tasks:dashboard_task_update', args=[self.own_task.pk]),
+                {'title': 'Revisar facturación', 'assigned_to': other.pk},
+            )
+        self.assertEqual(suggest(self.user, 'revi'), [])
+        self.assertEqual(suggest(other, 'revi'), [('Revisar facturación', 'task')])
+        self.assertIn(('otro@test.com', 'user'), suggest(self.admin, 'otro'))
+
+    def test_bulk_update_reindexes_titles(self):
+        """Test de que la edición masiva de títulos actualiza el índice sin reconstruirlo."""
+        get_task_index()
+        self.client.force_login(self.admin)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(
+                reverse('tasks:task-bulk'), [{'id': self.other_task.pk, 'title': 'Planificar contrato'}],
+                content_type='application/json',
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        with mock.patch('apps.tasks.autocomplete._start_thread') as start_thread:
+            self.assertEqual(suggest(self.admin, 'planif'), [('Planificar contrato', 'task')])
+        start_thread.assert_not_called()
+
+    def test_stale_index_is_served_while_rebuilding(self):
+        """Test de que el índice invalidado se sigue usando y se reconstruye una sola vez en segundo plano."""
+        get_task_index()
+        Task.objects.bulk_create([Task(title='Planificar masiva')])
+        invalidate_task_index()
+
+        started = []
+        with mock.patch('apps.tasks.autocomplete._start_thread', side_effect=started.append):
+            self.assertEqual(suggest(self.admin, 'planif'), [])
+            self.assertEqual(suggest(self.admin, 'planif'), [])
+        self.assertEqual(len(started), 1)
+
+        started[0]()
+        self.assertEqual(suggest(self.admin, 'planif'), [('Planificar masiva', 'task')])
+
+
+class TaskListPaginationTest(TestCase):
+    """Tests para la lista de tareas paginada con scroll infinito."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.admin.groups.add(admin_group)
+        self.client.force_login(self.admin)
+        # Misma fecha de creación para verificar el desempate por id
+        created_at = timezone.now()
+        Task.objects.bulk_create(
+            Task(title=f'Paginada {i:02d}', created_at=created_at) for i in range(TASK_PAGE_SIZE + 5)
+        )
+
+    def collect_pages(self, url, params=None):
+        """Recorre las páginas siguiendo los disparadores hx-trigger="revealed"."""
+        seen = set()
+        response = self.client.get(url, params or {})
+        while True:
+            html = response.content.decode()
+            seen.update(re.findall(r'Paginada \d+', html))
+            next_url = re.search(r'hx-get="([^"]+)" hx-trigger="revealed"', html)
+            if not next_url:
+                return seen
+            response = self.client.get(next_url.group(1).replace('&amp;', '&'))
+
+    def test_paginate_tasks_keyset(self):
+        """Test de paginación por keyset sin repetir ni omitir tareas."""
+        tasks, cursor = paginate_tasks(Task.objects.all())
+        self.assertEqual(len(tasks), TASK_PAGE_SIZE)
+        rest, next_cursor = paginate_tasks(Task.objects.all(), cursor)
+        self.assertEqual(len(rest), 5)
+        self.assertIsNone(next_cursor)
+        self.assertEqual(len({task.pk for task in tasks + rest}), TASK_PAGE_SIZE + 5)
+
+        # Un cursor inválido retorna la primera página
+        self.assertEqual(paginate_tasks(Task.objects.all(), 'no-valido')[0], tasks)
+
+    def test_task_list_infinite_scroll(self):
+        """Test de la lista principal: primera página y carga de las siguientes."""
+        response = self.client.get(reverse('tasks:task_list'))
+        self.assertEqual(len(set(re.findall(r'Paginada \d+', response.content.decode()))), TASK_PAGE_SIZE)
+
+        seen = self.collect_pages(reverse('tasks:task_list_partial'))
+        self.assertEqual(len(seen), TASK_PAGE_SIZE + 5)
+
+    def test_dashboard_infinite_scroll_keeps_filters(self):
+        """Test de que las páginas del dashboard conservan los filtros."""
+        Task.objects.filter(title__in=['Paginada 00', 'Paginada 01']).update(completed=True)
+        response = self.client.get(reverse('tasks:dashboard'), {'filter': 'pending'})
+        self.assertEqual(response.context['tasks_count'], TASK_PAGE_SIZE + 3)
+
+        seen = self.collect_pages(reverse('tasks:dashboard_tasks_partial'), {'filter': 'pending'})
+        self.assertEqual(len(seen), TASK_PAGE_SIZE + 3)
+        self.assertNotIn('Paginada 00', seen)
+
+
+class FragmentCacheTest(TestCase):
+    """Tests para la caché de fragmentos de las filas de tareas."""
+
+    def setUp(self):
+        fragment_cache.clear()
+        self.request = RequestFactory().get('/')
+        self.tasks = [Task.objects.create(title=f'Fragmento {i}') for i in range(3)]
+
+    def tearDown(self):
+        fragment_cache.clear()
+
+    def render(self, is_admin=True):
+        return render_task_rows(self.request, 'tasks/partials/task_item.html', self.tasks, {'is_admin': is_admin})
+
+    def test_lru_eviction(self):
+        """Test de expulsión del fragmento usado hace más tiempo."""
+        cache = LRUFragmentCache(max_size=2)
+        cache.set_many({'a': 'A', 'b': 'B'})
+        cache.get_many(['a'])
+        cache.set_many({'c': 'C'})
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'a': 'A', 'c': 'C'})
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+    def test_rows_are_reused_until_task_changes(self):
+        """Test de aciertos y de invalidación por fecha de actualización."""
+        first = self.render()
+        self.assertEqual(fragment_cache.stats()['misses'], 3)
+
+        self.assertEqual(self.render(), first)
+        self.assertEqual(fragment_cache.stats()['hits'], 3)
+
+        self.tasks[0].title = 'Fragmento editado'
+        self.tasks[0].save()
+        html = self.render()
+        self.assertIn('Fragmento editado', html)
+        self.assertEqual(fragment_cache.stats()['misses'], 4)
+
+    def test_role_is_part_of_the_key(self):
+        """Test de que administradores y usuarios limitados no comparten filas."""
+        admin_html = self.render(is_admin=True)
+        user_html = self.render(is_admin=False)
+        self.assertNotEqual(admin_html, user_html)
+        self.assertEqual(fragment_cache.stats()['misses'], 6)
+
+    @override_settings(
+        TASK_FRAGMENT_CACHE_ALIAS='default',
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'fragments'}}
+    )
+    def test_shared_backend(self):
+        """Test del segundo nivel compartido entre procesos."""
+        html = self.render()
+        fragment_cache.clear()
+        self.assertEqual(self.render(), html)
+        stats = fragment_cache.stats()
+        self.assertEqual((stats['shared_hits'], stats['misses']), (3, 0))
+
+    def test_stats_view(self):
+        """Test de la vista de métricas (solo administradores)."""
+        admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.client.force_login(admin)
+        self.render()
+        response = self.client.get(reverse('tasks:fragment_cache_stats'))
+        self.assertEqual(response.json()['misses'], 3)
+
+
+class ConditionalGetTest(APITestCase):
+    """Tests para las respuestas 304 con ETag y Last-Modified."""
+
+    def setUp(self):
+        limited_group, _ = Group.objects.get_or_create(name='Usuario Limitado')
+        self.user = User.objects.create_user(email='limitado@test.com', password='test1234')
+        self.user.groups.add(limited_group)
+        self.task = Task.objects.create(title='Condicional', assigned_to=self.user)
+        self.other = Task.objects.create(title='Otra condicional', assigned_to=self.user)
+        self.list_url = reverse('tasks:task-list')
+
+    def assertNotModified(self, url, response, **extra):
+        """Verifica que repetir la petición con el ETag recibido retorne 304."""
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'], **extra)
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+        return again
+
+    def test_api_list(self):
+        """Test de ETag en el listado: creación, edición y eliminación invalidan."""
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        self.assertNotModified(self.list_url, response)
+
+        Task.objects.create(title='Nueva condicional')
+        changed = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, status.HTTP_200_OK)
+
+        self.other.delete()
+        deleted = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=changed['ETag'])
+        self.assertEqual(deleted.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(deleted.data['results']), 2)
+
+    def test_list_validators_skip_task_table(self):
+        """Test de que el 304 no lee la tabla de tareas y de que una edición sin cambio de estado invalida."""
+        response = self.client.get(self.list_url)
+        queries = count_queries(lambda: self.assertNotModified(self.list_url, response))
+        self.assertFalse([query for query in queries if '"tasks_task"' in query['sql']], format_queries(queries))
+
+        self.other.title = 'Otra condicional editada'
+        self.other.save()
+        again = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_api_list_bulk_delete(self):
+        """Test de que la eliminación masiva también invalida el ETag."""
+        response = self.client.get(self.list_url)
+        self.client.post(reverse('tasks:task-bulk-delete'), {'ids': [self.other.pk]}, format='json')
+        again = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_api_retrieve(self):
+        """Test de ETag en el detalle."""
+        url = reverse('tasks:task-detail', kwargs={'pk': self.task.pk})
+        response = self.client.get(url)
+        self.assertNotModified(url, response)
+
+        self.task.title = 'Condicional editada'
+        self.task.save()
+        again = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.data['title'], 'Condicional editada')
+
+    def test_partial_not_modified_skips_rendering(self):
+        """Test de que el parcial HTMX responde 304 sin renderizar las filas."""
+        self.client.force_login(self.user)
+        url = reverse('tasks:task_list_partial')
+        response = self.client.get(url, {'filter': 'pending'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with mock.patch('apps.tasks.views.render_task_page') as render_page:
+            self.assertNotModified(url + '?filter=pending', response)
+            render_page.assert_not_called()
+
+        # Eliminar una tarea del usuario invalida su lista
+        self.task.delete()
+        again = self.client.get(url, {'filter': 'pending'}, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(again.status_code, status.HTTP_200_OK)
+
+    def test_partial_if_modified_since(self):
+        """Test de Last-Modified con If-Modified-Since."""
+        self.client.force_login(self.user)
+        url = reverse('tasks:task_list_partial')
+        response = self.client.get(url)
+        again = self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(again.status_code, status.HTTP_304_NOT_MODIFIED)
+
+
+class TaskEventsTest(TestCase):
+    """Tests para los eventos en tiempo real del dashboard."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.admin.groups.add(admin_group)
+        self.task = Task.objects.create(title='Tarea en vivo')
+
+    def test_merge_events(self):
+        """Test de que los eventos juntos se agrupan en un diff por acción."""
+        diff = merge_events([
+            {'action': 'created', 'ids': [1, 2]},
+            {'action': 'updated', 'ids': [1, 3]},
+            {'action': 'deleted', 'ids': [2]},
+            {'action': 'updated', 'ids': [3]},
+        ])
+        self.assertEqual(diff, {'created': [1], 'updated': [3], 'deleted': [2]})
+
+    def test_signals_publish_on_commit(self):
+        """Test de que crear, editar y eliminar publican tras confirmar la transacción."""
+        with mock.patch('apps.tasks.events.get_broker') as broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                task = Task.objects.create(title='Publicada')
+                broker.return_value.publish.assert_not_called()
+            task.title = 'Publicada editada'
+            with self.captureOnCommitCallbacks(execute=True):
+                task.save()
+            with self.captureOnCommitCallbacks(execute=True):
+                task_id = task.pk
+                task.delete()
+
+        events = [call.args[0] for call in broker.return_value.publish.call_args_list]
+        self.assertEqual(events, [
+            {'action': 'created', 'ids': [task_id]},
+            {'action': 'updated', 'ids': [task_id]},
+            {'action': 'deleted', 'ids': [task_id]},
+        ])
+
+    def test_bulk_toggle_publishes_one_event(self):
+        """Test de que el cambio masivo publica un solo evento con todos los ids."""
+        other = Task.objects.create(title='Otra en vivo')
+        self.client.force_login(self.admin)
+        with mock.patch('apps.tasks.events.get_broker') as broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(
+                    reverse('tasks:task-bulk-toggle'),
+                    {'ids': [self.task.pk, other.pk]},
+                    content_type='application/json',
+                )
+        event = broker.return_value.publish.call_args.args[0]
+        self.assertEqual(event['action'], 'updated')
+        self.assertEqual(sorted(event['ids']), sorted([self.task.pk, other.pk]))
+
+    def test_bulk_delete_publishes_one_event(self):
+        """Test de que la eliminación masiva publica un solo evento en vez de uno por fila."""
+        others = [Task.objects.create(title=f'Eliminada en vivo {i}') for i in range(4)]
+        ids = [self.task.pk, *(task.pk for task in others)]
+        self.client.force_login(self.admin)
+        with mock.patch('apps.tasks.events.get_broker') as broker:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.post(reverse('tasks:task-bulk-delete'), {'ids': ids}, content_type='application/json')
+        self.assertEqual(broker.return_value.publish.call_count, 1)
+        event = broker.return_value.publish.call_args.args[0]
+        self.assertEqual(event['action'], 'deleted')
+        self.assertEqual(sorted(event['ids']), sorted(ids))
+
+    def test_bulk_delete_batches_signal_work(self):
+        """Test de que la eliminación masiva invalida estadísticas e índice una sola vez."""
+        others = [Task.objects.create(title=f'Eliminada en lote {i}') for i in range(4)]
+        ids = [self.task.pk, *(task.pk for task in others)]
+        reset_task_index()
+        self.addCleanup(reset_task_index)
+        self.assertTrue(get_task_index().search('elimi'))
+        self.client.force_login(self.admin)
+
+        with mock.patch.object(task_stats_cache, 'invalidate') as invalidate:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                response = self.client.post(reverse('tasks:task-bulk-delete'), {'ids': ids}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(invalidate.call_count, 1)
+        # Un on_commit para el índice y uno para el evento, no uno por fila
+        self.assertEqual(len(callbacks), 2)
+        self.assertEqual(get_task_index().search('elimi'), [])
+
+    async def test_stream_task_events(self):
+        """Test del stream SSE: diff agrupado, keep-alive y cierre de la suscripción."""
+        broker = get_broker()
+        stream = stream_task_events(keepalive=0.05)
+        self.assertTrue((await anext(stream)).startswith('retry:'))
+
+        broker.publish({'action': 'updated', 'ids': [7]})
+        broker.publish({'action': 'deleted', 'ids': [8]})
+        message = await anext(stream)
+        self.assertEqual(message, 'event: tasks\ndata: {"created":[],"updated":[7],"deleted":[8]}\n\n')
+        self.assertEqual(await anext(stream), ': keepalive\n\n')
+
+        self.assertEqual(len(broker), 1)
+        await stream.aclose()
+        self.assertEqual(len(broker), 0)
+
+    async def test_events_view_asgi(self):
+        """Test de que el endpoint abre un stream text/event-stream bajo ASGI."""
+        await self.async_client.aforce_login(self.admin)
+        response = await self.async_client.get(reverse('tasks:dashboard_task_events'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+        self.assertTrue((await anext(stream)).startswith(b'retry:'))
+        await response.streaming_content.aclose()
+
+    def test_events_view_wsgi_and_permissions(self):
+        """Test de que bajo WSGI responde 204 y los usuarios limitados no acceden."""
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse('tasks:dashboard_task_events')).status_code, 204)
+
+        limited = User.objects.create_user(email='limitado@test.com', password='test1234')
+        self.client.force_login(limited)
+        self.assertEqual(self.client.get(reverse('tasks:dashboard_task_events')).status_code, 302)
+
+    def test_dashboard_task_rows(self):
+        """Test de que solo se renderizan las filas pedidas."""
+        other = Task.objects.create(title='No pedida')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('tasks:dashboard_task_rows'), {'id': [self.task.pk, 'x']})
+        self.assertContains(response, f'id="task-{self.task.pk}"')
+        self.assertNotContains(response, f'id="task-{other.pk}"')
+
+
+class QueryBudgetTest(QueryBudgetMixin, APITestCase):
+    """Tests de cantidad de consultas constante por endpoint, sin importar cuántas tareas haya."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        limited_group, _ = Group.objects.get_or_create(name='Usuario Limitado')
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.admin.groups.add(admin_group)
+        self.limited = User.objects.create_user(email='limitado@test.com', password='test1234')
+        self.limited.groups.add(limited_group)
+        self.number = 0
+
+    def add_tasks(self, count):
+        """Crea tareas asignadas, con creador y exportaciones, para ejercitar las relaciones."""
+        for _ in range(count):
+            self.number += 1
+            owner = User.objects.create_user(email=f'dueno{self.number}@test.com')
+            Task.objects.create(
+                title=f'Presupuesto {self.number}',
+                assigned_to=self.limited if self.number % 2 else owner,
+                created_by=owner,
+                completed=self.number % 3 == 0,
+            )
+            ExportJob.objects.create(format='csv', requested_by=owner)
+
+    def get(self, url, user, **params):
+        """GET sin la caché de fragmentos, para que las filas se rendericen en cada medición."""
+        def request():
+            fragment_cache.clear()
+            self.client.force_login(user)
+            response = self.client.get(url, params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return request
+
+    def test_html_views(self):
+        """Test de las listas HTML de administradores y usuarios limitados."""
+        cases = [
+            (reverse('tasks:task_list'), self.admin, {}),
+            (reverse('tasks:task_list'), self.limited, {}),
+            (reverse('tasks:task_list_partial'), self.admin, {'search': 'presupuesto'}),
+            (reverse('tasks:dashboard'), self.admin, {}),
+            (reverse('tasks:dashboard_tasks_partial'), self.admin, {'filter': 'pending'}),
+        ]
+        for url, user, params in cases:
+            with self.subTest(url=url, user=user.email):
+                self.assertConstantQueries(self.get(url, user, **params), self.add_tasks)
+
+    def test_api(self):
+        """Test del listado y la búsqueda de la API."""
+        for url, params in [
+            (reverse('tasks:task-list'), {}),
+            (reverse('tasks:task-search'), {'q': 'presupuesto'}),
+        ]:
+            with self.subTest(url=url):
+                self.assertConstantQueries(self.get(url, self.admin, **params), self.add_tasks)
+
+    def test_admin_changelists(self):
+        """Test de los listados del admin con columnas de relaciones."""
+        for model in ('task', 'exportjob', 'outboxemail'):
+            with self.subTest(model=model):
+                url = reverse(f'admin:tasks_{model}_changelist')
+                self.assertConstantQueries(self.get(url, self.admin), self.add_tasks)
+
+    def test_toggle_row_loads_users_with_task(self):
+        """Test de que la fila renderizada tras el cambio de estado no carga los usuarios por separado."""
+        self.add_tasks(1)
+        task = Task.objects.get()
+        self.client.force_login(self.admin)
+        for url in (reverse('tasks:dashboard_task_toggle', args=[task.pk]), reverse('tasks:task_toggle', args=[task.pk])):
+            with self.subTest(url=url):
+                queries = count_queries(lambda: self.client.post(url))
+                # La única lectura de usuarios es la del usuario de la sesión
+                user_selects = [query for query in queries if query['sql'].startswith('SELECT "users_user"')]
+                self.assertEqual(len(user_selects), 1, format_queries(queries))
+
+    def test_process_outbox_budget(self):
+        """Test de que el envío de la bandeja de salida no consulta los usuarios por email."""
+        owner = User.objects.create_user(email='creador@test.com', password='test1234')
+        tasks = [Task.objects.create(title=f'Correo {i}', created_by=owner, assigned_to=self.limited) for i in range(10)]
+        OutboxEmail.enqueue(tasks)
+        with self.assertQueryBudget(9):
+            self.assertEqual(process_outbox(), (10, 0))
+
+    def test_query_budget_exceeded(self):
+        """Test de que el presupuesto excedido falla con la lista de consultas."""
+        @query_budget(1)
+        def two_queries():
+            Task.objects.count()
+            User.objects.count()
+
+        with self.assertRaisesMessage(QueryBudgetExceeded, '2 consultas ejecutadas, máximo 1'):
+            two_queries()
+
+
+class TaskIndexTest(TestCase):
+    """Tests para los índices de las consultas frecuentes de las listas."""
+
+    def setUp(self):
+        self.user = User.objects.create_user(email='indices@test.com')
+        Task.objects.bulk_create(
+            Task(title=f'Índice {i}', completed=i % 3 == 0, assigned_to=self.user if i % 2 else None)
+            for i in range(50)
+        )
+
+    def test_hot_queries_use_indexes(self):
+        """Test de que ninguna consulta frecuente ordena aparte ni recorre la tabla completa."""
+        for name, queryset in get_hot_queries(self.user.pk):
+            with self.subTest(consulta=name):
+                plan, indexes, sorts, full_scan = explain(queryset)
+                self.assertTrue(indexes, plan)
+                self.assertFalse(sorts, plan)
+                self.assertFalse(full_scan, plan)
+
+    def test_pending_queries_use_partial_indexes(self):
+        """Test de que las listas de pendientes usan los índices parciales."""
+        queries = dict(get_hot_queries(self.user.pk))
+        self.assertEqual(explain(queries['pendientes'])[1], ['task_pending_created_idx'])
+        self.assertEqual(explain(queries['usuario pendientes'])[1], ['task_assigned_pending_idx'])
+
+    def test_api_cursor_uses_index(self):
+        """Test de que el orden del cursor de la API recorre los índices sin ordenar aparte."""
+        ordering = TaskCursorPagination.ordering
+        for queryset, index in (
+            (Task.objects.all(), 'task_created_id_idx'),
+            (Task.objects.filter(assigned_to=self.user), 'task_assigned_created_idx'),
+        ):
+            with self.subTest(indice=index):
+                plan, indexes, sorts, _ = explain(queryset.order_by(*ordering)[:51])
+                self.assertEqual(indexes, [index], plan)
+                self.assertFalse(sorts, plan)
+
+    def test_explain_queries_check(self):
+        """Test del comando explain_queries con --check."""
+        out = StringIO()
+        call_command('explain_queries', '--check', '--repeat', '1', stdout=out)
+        self.assertIn('task_created_id_idx', out.getvalue())
+
+
+class DatabaseConnectionTest(TestCase):
+    """Tests para la configuración de las conexiones a la base de datos."""
+
+    def test_sqlite_pragmas_on_new_connection(self):
+        """Test de que cada conexión SQLite nueva usa WAL, busy_timeout y synchronous."""
+        with tempfile.TemporaryDirectory() as directory:
+            settings_dict = {**connection.settings_dict, 'NAME': f'{directory}/pragmas.sqlite3'}
+            wrapper = SQLiteDatabaseWrapper(settings_dict, alias='pragmas')
+            try:
+                with wrapper.cursor() as cursor:
+                    values = {}
+                    for name in ('journal_mode', 'synchronous', 'busy_timeout'):
+                        cursor.execute(f'PRAGMA {name}')
+                        values[name] = cursor.fetchone()[0]
+            finally:
+                wrapper.close()
+        self.assertEqual(values, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000})
+
+    def test_benchmark_connections(self):
+        """Test del comando benchmark_connections."""
+        out = StringIO()
+        call_command('benchmark_connections', '--requests', '3', stdout=out)
+        self.assertIn('nueva por petición', out.getvalue())
+        self.assertIn('persistente (600s)', out.getvalue())
+        self.assertEqual(connection.settings_dict['CONN_MAX_AGE'], 0)
+
+
+class SeedingTest(TestCase):
+    """Tests para la generación de datos sintéticos."""
+
+    def seeded(self):
+        return list(
+            Task.objects.order_by('pk').values_list('title', 'completed', 'assigned_to__email', 'created_by__email', 'created_at')
+        )
+
+    def test_seed_reproducible_and_skewed(self):
+        """Test de datos reproducibles con la misma semilla, usuarios sesgados y fechas variadas."""
+        result = seed(300, users=5, admins=1, seed=7, batch_size=64)
+        self.assertEqual(result, {'tasks': 300, 'users': 5, 'admins': 1})
+        first = self.seeded()
+
+        clear_seeded_data()
+        seed(300, users=5, admins=1, seed=7, batch_size=64)
+        self.assertEqual(self.seeded(), first)
+
+        per_user = Counter(email for _, _, email, _, _ in first if email)
+        self.assertEqual(per_user.most_common(1)[0][0], f'usuario00000@{SEED_EMAIL_DOMAIN}')
+        self.assertGreater(len({created_at for *_, created_at in first}), 250)
+        self.assertEqual(TaskCounter.compute()[None], (300, sum(1 for _, completed, *_ in first if completed)))
+        self.assertEqual(get_counter_stats()['total'], 300)
+
+        # auto_now vuelve a funcionar después de la carga
+        task = Task.objects.create(title='Después de la carga')
+        self.assertGreater(task.created_at, max(created_at for *_, created_at in first))
+
+    def test_seed_tasks_command(self):
+        """Test del comando seed_tasks con --clear."""
+        owner = User.objects.create_user(email='owner@test.com', password='test1234')
+        existing = Task.objects.create(title='Existente', created_by=owner)
+        OutboxEmail.objects.create(task=existing)
+        call_command('seed_tasks', '--tasks', '40', '--users', '3', '--admins', '1', stdout=StringIO())
+
+        out = StringIO()
+        call_command('seed_tasks', '--tasks', '50', '--users', '3', '--admins', '1', '--clear', stdout=out)
+        self.assertIn('Se eliminaron 40 tareas', out.getvalue())
+        self.assertIn('Se crearon 50 tareas', out.getvalue())
+        # Solo se eliminan las tareas de los usuarios generados
+        self.assertEqual(Task.objects.count(), 51)
+        self.assertTrue(Task.objects.filter(pk=existing.pk).exists())
+        self.assertEqual(OutboxEmail.objects.count(), 1)
+        self.assertEqual(TaskCounter.compute()[None][0], 51)
+        self.assertEqual(get_counter_stats()['total'], 51)
+        self.assertTrue(User.objects.get(email=f'admin000@{SEED_EMAIL_DOMAIN}').is_admin)
+
+
+class BenchmarkSuiteTest(TestCase):
+    """Tests para la suite de benchmarks y la comparación con la línea base."""
+
+    def result(self, **values):
+        return {'scenario': 'dashboard', 'rows': 1000, 'p50_ms': 20.0, 'queries': 7, 'peak_kb': 1000.0, **values}
+
+    def test_compare_results(self):
+        """Test de regresiones por consultas, latencia y memoria, ignorando el ruido."""
+        baseline = {'results': [self.result()]}
+        self.assertEqual(compare_results({'results': [self.result(p50_ms=21.0, peak_kb=1050.0)]}, baseline), [])
+        # Aumento relativo grande pero menor al mínimo absoluto
+        self.assertEqual(compare_results({'results': [self.result(p50_ms=1.5)]}, {'results': [self.result(p50_ms=1.0)]}), [])
+        regressions = compare_results({'results': [self.result(p50_ms=30.0, queries=8, peak_kb=2000.0)]}, baseline)
+        self.assertEqual(
+            [metric for _, _, metric, _, _ in regressions],
+            ['queries', 'p50_ms', 'peak_kb'],
+        )
+
+    def test_run_benchmarks_json_and_baseline(self):
+        """Test del comando run_benchmarks: JSON con percentiles, consultas y memoria, y --check."""
+        with tempfile.TemporaryDirectory() as directory:
+            output = f'{directory}/resultados.json'
+            call_command(
+                'run_benchmarks', '--rows', '30', '--iterations', '2', '--export-iterations', '1',
+                '--scenarios', 'task_list', 'api_toggle', 'export_csv', '--output', output, stdout=StringIO(),
+            )
+            with open(output, encoding='utf-8') as results_file:
+                results = json.load(results_file)
+
+            self.assertEqual([result['scenario'] for result in results['results']], ['task_list', 'api_toggle', 'export_csv'])
+            for result in results['results']:
+                self.assertEqual(result['status'], 200)
+                self.assertGreater(result['queries'], 0)
+                self.assertGreater(result['peak_kb'], 0)
+                self.assertLessEqual(result['p50_ms'], result['p99_ms'])
+            # Los datos generados se revierten
+            self.assertFalse(Task.objects.exists())
+
+            # Una línea base con menos consultas marca regresión
+            for result in results['results']:
+                result['queries'] -= 1
+            baseline = f'{directory}/base.json'
+            with open(baseline, 'w', encoding='utf-8') as baseline_file:
+                json.dump(results, baseline_file)
+            # Con un umbral alto no cuenta el ruido de p50 bajo la carga de la suite completa: solo las consultas
+            with self.assertRaisesMessage(CommandError, '3 regresiones'):
+                call_command(
+                    'run_benchmarks', '--rows', '30', '--iterations', '2', '--export-iterations', '1',
+                    '--scenarios', 'task_list', 'api_toggle', 'export_csv', '--no-memory',
+                    '--baseline', baseline, '--threshold', '100', '--check', stdout=StringIO(),
+                )
+
+
+class BenchmarkHttpTest(LiveServerTestCase):
+    """Tests para el comando benchmark_http (los handlers atienden desde otros hilos)."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        admin.groups.add(admin_group)
+        Task.objects.create(title='Tarea medida', assigned_to=admin)
+
+    def rows(self, out):
+        # Filas de resultados: (ruta, modo, errores)
+        return [
+            (line.split()[0], line.split()[1], line.split()[-1])
+            for line in out.getvalue().splitlines() if line.strip().startswith('/')
+        ]
+
+    def test_in_process_handlers(self):
+        """Test de la comparación WSGI/ASGI en el mismo proceso."""
+        out = StringIO()
+        call_command('benchmark_http', '--requests', '4', '--concurrency', '2', stdout=out)
+        partial, dashboard = reverse('tasks:task_list_partial'), reverse('tasks:dashboard')
+        self.assertEqual(self.rows(out), [
+            (partial, 'wsgi', '0'), (partial, 'asgi', '0'), (dashboard, 'wsgi', '0'), (dashboard, 'asgi', '0'),
+        ])
+        # La sesión creada para autenticar las peticiones se elimina al terminar
+        self.assertFalse(Session.objects.exists())
+
+    def test_running_server(self):
+        """Test de la medición de un servidor en ejecución con --server."""
+        out = StringIO()
+        call_command(
+            'benchmark_http', '--server', self.live_server_url, '--paths', 'tasks:task_list_partial',
+            '--requests', '4', '--concurrency', '2', stdout=out,
+        )
+        self.assertEqual(self.rows(out), [(reverse('tasks:task_list_partial'), self.live_server_url, '0')])
+
+    def test_requires_user(self):
+        """Test de error sin usuario para autenticar."""
+        with self.assertRaisesMessage(CommandError, 'No existe el usuario'):
+            call_command('benchmark_http', '--email', 'nadie@test.com', stdout=StringIO())
+
+
+class ProfilingTest(TestCase):
+    """Tests para el middleware de perfil de peticiones y las métricas."""
+
+    def setUp(self):
+        view_metrics.reset()
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        Task.objects.create(title='Perfilada', assigned_to=self.admin)
+        self.client.force_login(self.admin)
+
+    def tearDown(self):
+        view_metrics.reset()
+
+    def test_disabled_by_default(self):
+        """Test de que sin PROFILING_ENABLED no se agrega Server-Timing."""
+        response = self.client.get(reverse('tasks:dashboard'))
+        self.assertNotIn('Server-Timing', response.headers)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SLOW_REQUEST_MS=0)
+    def test_server_timing_slow_log_and_metrics(self):
+        """Test de Server-Timing, el registro de consultas lentas con su origen y los histogramas."""
+        with self.assertLogs('apps.tasks.profiling', 'WARNING') as logs:
+            response = self.client.get(reverse('tasks:dashboard'))
+            metrics = self.client.get(reverse('tasks:profiling_metrics')).content.decode()
+        timing = response.headers['Server-Timing']
+        for name in ('sql', 'tpl', 'app', 'total'):
+            self.assertIn(f'{name};dur=', timing)
+        self.assertRegex(logs.output[0], r'GET /dashboard/ 200: .* consultas')
+        self.assertIn('apps/', logs.output[0])
+        self.assertIn('tasks_request_duration_seconds_bucket{view="tasks:dashboard",method="GET",le="+Inf"} 1', metrics)
+        self.assertIn('tasks_request_queries_count{view="tasks:dashboard",method="GET"} 1', metrics)
+        self.assertIn('tasks_fragment_cache_misses_total', metrics)
+
+    @override_settings(PROFILING_ENABLED=True, PROFILING_SAMPLE_RATE=1)
+    def test_sampled_profile_dump(self):
+        """Test de los perfiles de cProfile guardados para las peticiones muestreadas."""
+        with tempfile.TemporaryDirectory() as directory, override_settings(PROFILING_DIR=directory):
+            self.client.get(reverse('tasks:task_list'))
+            dumps = os.listdir(directory)
+            self.assertEqual(len(dumps), 1)
+            self.assertTrue(dumps[0].startswith('tasks-task_list-'))
+            stats = pstats.Stats(os.path.join(directory, dumps[0]))
+            self.assertGreater(stats.total_calls, 0)
+
+    @override_settings(PROFILING_METRICS_TOKEN='secreto')
+    def test_metrics_access(self):
+        """Test de acceso a las métricas: token o administrador."""
+        self.client.logout()
+        url = reverse('tasks:profiling_metrics')
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer otro').status_code, 403)
+        self.assertEqual(self.client.get(url, HTTP_AUTHORIZATION='Bearer secreto').status_code, 200)
+
+    def test_request_profile_keeps_slowest(self):
+        """Test de que solo se guardan las consultas más lentas, de mayor a menor."""
+        profile = RequestProfile(slowest=2)
+        for duration in (0.1, 0.3, 0.2, 0.05):
+            profile.record_query(f'SELECT {duration}', duration)
+        self.assertEqual(profile.queries, 4)
+        self.assertEqual([sql for _, sql, _ in profile.slowest], ['SELECT 0.3', 'SELECT 0.2'])
+        self.assertIn('apps/tasks/tests.py', profile.slowest[0][2])
+
+
+class QueryDiagnosticsTest(QueryBudgetMixin, TestCase):
+    """Tests para las huellas de consultas, el detector de N+1 y el registro de consultas lentas."""
+
+    def setUp(self):
+        admin_group, _ = Group.objects.get_or_create(name='Administrador')
+        limited_group, _ = Group.objects.get_or_create(name='Usuario Limitado')
+        self.admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        self.admin.groups.add(admin_group)
+        for number in range(6):
+            owner = User.objects.create_user(email=f'dueno{number}@test.com', password='test1234')
+            owner.groups.add(limited_group)
+            Task.objects.create(title=f'Diagnóstico {number}', assigned_to=owner, created_by=owner)
+
+    def test_fingerprint(self):
+        """Test de que las consultas que solo difieren en sus valores tienen la misma huella."""
+        self.assertEqual(
+            fingerprint('SELECT "t"."id" FROM "task_0007" WHERE "t"."id" IN (%s, %s, %s) AND title = \'a\'\'b\' LIMIT 21'),
+            'SELECT "t"."id" FROM "task_0007" WHERE "t"."id" IN (...) AND title = ? LIMIT ?',
+        )
+        self.assertEqual(
+            fingerprint('INSERT INTO "t" ("a") VALUES (%s), (%s)'),
+            fingerprint('INSERT INTO "t" ("a") VALUES (%s)'),
+        )
+
+    def test_detects_n_plus_one_with_call_site(self):
+        """Test de que el acceso a una relación por fila falla con el origen, y select_related no."""
+        with self.assertRaisesMessage(NPlusOneDetected, 'apps/tasks/tests.py'):
+            with self.assertNoNPlusOne(3):
+                [task.assigned_to.email for task in Task.objects.all()]
+
+        with self.assertNoNPlusOne(3):
+            [task.assigned_to.email for task in Task.objects.select_related('assigned_to')]
+
+    @override_settings(QUERY_DIAGNOSTICS_ENABLED=True, QUERY_DIAGNOSTICS_STRICT=True, QUERY_DIAGNOSTICS_N_PLUS_ONE=3)
+    def test_views_without_n_plus_one(self):
+        """Test en modo estricto: las vistas HTML, la API y el admin no repiten consultas por fila."""
+        task = Task.objects.first()
+        owner = task.assigned_to
+        cases = [
+            (self.admin, 'get', reverse('tasks:task_list')),
+            (self.admin, 'get', reverse('tasks:task_list_partial') + '?search=diagnostico'),
+            (self.admin, 'get', reverse('tasks:task_detail', args=[task.pk])),
+            (self.admin, 'get', reverse('tasks:dashboard')),
+            (self.admin, 'get', reverse('tasks:dashboard_tasks_partial') + '?filter=pending'),
+            (self.admin, 'get', reverse('tasks:dashboard_task_detail', args=[task.pk])),
+            (self.admin, 'post', reverse('tasks:dashboard_task_toggle', args=[task.pk])),
+            (self.admin, 'get', reverse('tasks:task-list')),
+            (self.admin, 'get', reverse('tasks:export_csv')),
+            (self.admin, 'get', reverse('admin:tasks_task_changelist')),
+            (self.admin, 'get', reverse('admin:users_user_changelist')),
+            (owner, 'get', reverse('tasks:task_list')),
+            (owner, 'post', reverse('tasks:task_toggle', args=[task.pk])),
+        ]
+        for user, method, url in cases:
+            with self.subTest(url=url, user=user.email):
+                self.client.force_login(user)
+                response = getattr(self.client, method)(url)
+                self.assertLess(response.status_code, 400)
+
+    @override_settings(QUERY_DIAGNOSTICS_ENABLED=True, QUERY_DIAGNOSTICS_SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_with_plan(self):
+        """Test del registro de consultas lentas con su EXPLAIN."""
+        self.client.force_login(self.admin)
+        with self.assertLogs('apps.tasks.diagnostics', 'WARNING') as logs:
+            self.client.get(reverse('tasks:task_list'))
+        task_queries = [line for line in logs.output if 'FROM "tasks_task"' in line]
+        self.assertTrue(task_queries)
+        self.assertRegex(task_queries[0], r'índices: task_\w+_idx')
+        self.assertIn('apps/tasks/rendering.py', task_queries[0])
@@ -17,6 +17,7 @@ urlpatterns = [
     # Frontend endpoints (HTMX)
     path('', views.task_list, name='task_list'),
     path('partial/', views.task_list_partial, name='task_list_partial'),
+    path('suggestions/', views.task_suggestions, name='task_suggestions'),
     path('create/', views.task_create, name='task_create'),
     path('<int:pk>/', views.task_detail, name='task_detail'),
     path('<int:pk>/update/', views.task_update, name='task_update'),
@@ -28,10 +29,18 @@ urlpatterns = [
     path('export/csv/', export_views.export_tasks_csv, name='export_csv'),
     path('export/excel/', export_views.export_tasks_excel, name='export_excel'),
     path('export/pdf/', export_views.export_tasks_pdf, name='export_pdf'),
+    path('export/jobs/<str:export_format>/', export_views.export_job_create, name='export_job_create'),
+    path('export/jobs/<int:pk>/status/', export_views.export_job_status, name='export_job_status'),
+    path('export/jobs/<int:pk>/download/', export_views.export_job_download, name='export_job_download'),
     
     
     # Nuevas rutas del Dashboard
     path('dashboard/', dashboard_views.dashboard, name='dashboard'),
+    path('dashboard/tasks/', dashboard_views.dashboard_tasks_partial, name='dashboard_tasks_partial'),
+    path('dashboard/tasks/rows/', dashboard_views.dashboard_task_rows, name='dashboard_task_rows'),
+    path('dashboard/events/', dashboard_views.dashboard_task_events, name='dashboard_task_events'),
+    path('dashboard/fragment-cache/', dashboard_views.fragment_cache_stats, name='fragment_cache_stats'),
+    path('dashboard/metrics/', dashboard_views.profiling_metrics, name='profiling_metrics'),
     path('dashboard/task/create/', dashboard_views.dashboard_task_create, name='dashboard_task_create'),
     path('dashboard/task/<int:pk>/detail/', dashboard_views.dashboard_task_detail, name='dashboard_task_detail'),
     path('dashboard/task/<int:pk>/update/', dashboard_views.dashboard_task_update, name='dashboard_task_update'),
@@ -1,60 +1,74 @@
-from django.shortcuts import render, get_object_or_404, redirect
+from django.shortcuts import render, get_object_or_404
+from django.urls import reverse
 from django.contrib.auth.decorators import login_required, user_passes_test
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse
 from django.views.decorators.http import require_http_methods
-from django.db.models import Q
-from django.contrib import messages
+from .autocomplete import suggest
+from .conditional import condition_on_tasks, get_list_validators
 from .models import Task
+from .rendering import render_task_page
+from .search import search_tasks
+from .stats import get_cached_task_stats
 from apps.users.models import User
 
 
 def is_admin(user):
-    """Verifica si el usuario pertenece al grupo Administrador."""
-    return user.groups.filter(name='Administrador').exists()
+    """Verifica si el usuario pertenece al grupo Administrador (memoizado por request)."""
+    return getattr(user, 'is_admin', False)
 
 
-@login_required
-def task_list(request):
-    """Vista principal que renderiza la lista de tareas."""
-    user = request.user
-    is_user_admin = is_admin(user)
-    
-    # Usuarios limitados solo ven sus tareas asignadas
-    if is_user_admin:
+def get_visible_tasks(request):
+    """Tareas visibles para el usuario (todas o las asignadas) con los filtros de la query string."""
+    if is_admin(request.user):
         tasks = Task.objects.all()
-        total_tasks = Task.objects.count()
-        completed_tasks = Task.objects.filter(completed=True).count()
-        pending_tasks = Task.objects.filter(completed=False).count()
     else:
-        tasks = Task.objects.filter(assigned_to=user)
-        total_tasks = tasks.count()
-        completed_tasks = tasks.filter(completed=True).count()
-        pending_tasks = tasks.filter(completed=False).count()
+        tasks = Task.objects.filter(assigned_to=request.user)
 
-    # Aplicar filtros si existen
     search = request.GET.get('search', '')
     filter_status = request.GET.get('filter', 'all')
 
     if search:
-        tasks = tasks.filter(
-            Q(title__icontains=search) | Q(description__icontains=search)
-        )
+        tasks = search_tasks(tasks, search)
 
     if filter_status == 'completed':
         tasks = tasks.filter(completed=True)
     elif filter_status == 'pending':
         tasks = tasks.filter(completed=False)
 
+    return tasks
+
+
+@login_required
+def task_list(request):
+    """Vista principal que renderiza la lista de tareas."""
+    user = request.user
+    is_user_admin = is_admin(user)
+    
+    # Usuarios limitados solo ven sus tareas asignadas
+    stats = get_cached_task_stats() if is_user_admin else get_cached_task_stats(user=user)
+    tasks = get_visible_tasks(request)
+    search = request.GET.get('search', '')
+    filter_status = request.GET.get('filter', 'all')
+
     # Solo administradores pueden ver la lista de usuarios para asignar
     users_list = User.objects.filter(groups__name='Usuario Limitado') if is_user_admin else []
 
+    # Solo se renderiza la primera página; las siguientes se cargan al hacer scroll
+    task_rows = render_task_page(
+        request,
+        'tasks/partials/task_item.html',
+        tasks.select_related('assigned_to'),
+        reverse('tasks:task_list_partial'),
+        {'is_admin': is_user_admin},
+    )
+
     context = {
-        'tasks': tasks,
+        'task_rows': task_rows,
         'search': search,
         'filter_status': filter_status,
-        'total_tasks': total_tasks,
-        'completed_tasks': completed_tasks,
-        'pending_tasks': pending_tasks,
+        'total_tasks': stats['total'],
+        'completed_tasks': stats['completed'],
+        'pending_tasks': stats['pending'],
         'is_admin': is_user_admin,
         'users_list': users_list,
     }
@@ -62,34 +76,33 @@ def task_list(request):
     return render(request, 'tasks/task_list.html', context)
 
 
-@login_required
-def task_list_partial(request):
-    """Vista parcial para actualizar solo la lista de tareas (HTMX)."""
-    user = request.user
-    is_user_admin = is_admin(user)
-    
-    if is_user_admin:
-        tasks = Task.objects.all()
-    else:
-        tasks = Task.objects.filter(assigned_to=user)
-
-    # Aplicar filtros
-    search = request.GET.get('search', '')
-    filter_status = request.GET.get('filter', 'all')
+def task_list_validators(request):
+    """ETag y Last-Modified de la lista visible para el usuario, con sus filtros."""
+    is_user_admin = is_admin(request.user)
+    return get_list_validators(
+        scope_user_id=None if is_user_admin else request.user.pk,
+        variant=f'is_admin={is_user_admin}|{request.GET.urlencode()}',
+    )
 
-    if search:
-        tasks = tasks.filter(
-            Q(title__icontains=search) | Q(description__icontains=search)
-        )
 
-    if filter_status == 'completed':
-        tasks = tasks.filter(completed=True)
-    elif filter_status == 'pending':
-        tasks = tasks.filter(completed=False)
+@login_required
+@condition_on_tasks(task_list_validators)
+def task_list_partial(request):
+    """Vista parcial con una página de la lista de tareas (HTMX, ``?cursor=`` para las siguientes)."""
+    is_user_admin = is_admin(request.user)
+    tasks = get_visible_tasks(request)
+
+    task_rows = render_task_page(
+        request,
+        'tasks/partials/task_item.html',
+        tasks.select_related('assigned_to'),
+        reverse('tasks:task_list_partial'),
+        {'is_admin': is_user_admin},
+    )
 
     context = {
-        'tasks': tasks,
-        'is_admin': is_user_admin,
+        'task_rows': task_rows,
+        'is_next_page': bool(request.GET.get('cursor')),
     }
 
     return render(request, 'tasks/partials/task_list_partial.html', context)
@@ -228,10 +241,11 @@ def task_toggle(request, pk):
         user = request.user
         is_user_admin = is_admin(user)
         
+        tasks = Task.objects.select_related('assigned_to')
         if is_user_admin:
-            task = get_object_or_404(Task, pk=pk)
+            task = get_object_or_404(tasks, pk=pk)
         else:
-            task = get_object_or_404(Task, pk=pk, assigned_to=user)
+            task = get_object_or_404(tasks, pk=pk, assigned_to=user)
         
         task.toggle_completed()
 
@@ -267,4 +281,12 @@ def task_delete(request, pk):
 @login_required
 def task_form_empty(request):
     """Retorna el formulario vacío para cancelar edición (HTMX)."""
-    return render(request, 'tasks/partials/task_form.html')
\ No newline at end of file
+    return render(request, 'tasks/partials/task_form.html')
+
+
+@login_required
+@require_http_methods(["GET"])
+def task_suggestions(request):
+    """Sugerencias para el buscador desde el índice de prefijos en memoria (HTMX)."""
+    suggestions = suggest(request.user, request.GET.get('search', ''))
+    return render(request, 'tasks/partials/search_suggestions.html', {'suggestions': suggestions})
@@ -25,6 +25,10 @@ class UserAdmin(BaseUserAdmin):
         }),
     )
     
+    def get_queryset(self, request):
+        # Los grupos de todas las filas se cargan en una sola consulta
+        return super().get_queryset(request).prefetch_related('groups')
+
     def get_groups(self, obj):
         return ", ".join([g.name for g in obj.groups.all()])
     get_groups.short_description = 'Grupos'
\ No newline at end of file
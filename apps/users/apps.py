@@ -5,3 +5,6 @@ class UsersConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     verbose_name = 'Usuarios'
     name = 'apps.users'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -1,9 +1,11 @@
 from django.contrib.auth.base_user import AbstractBaseUser
 from django.contrib.auth.models import PermissionsMixin
 from django.db import models
+from django.utils.functional import cached_property
 from django.utils import timezone
 
 from apps.users.managers import UserManager
+from apps.users.roles import ADMIN_GROUP, get_group_names
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -41,3 +43,18 @@ class User(AbstractBaseUser, PermissionsMixin):
     def __str__(self):
         return self.email
 
+    @cached_property
+    def group_names(self):
+        """Nombres de los grupos del usuario, cargados una sola vez por instancia (por request)."""
+        return get_group_names(self)
+
+    @property
+    def is_admin(self):
+        """Indica si el usuario pertenece al grupo Administrador."""
+        return ADMIN_GROUP in self.group_names
+
+    @property
+    def is_admin_or_superuser(self):
+        """Indica si el usuario es administrador o superusuario."""
+        return self.is_superuser or self.is_admin
+
@@ -0,0 +1,21 @@
+from apps.cache import CacheNamespace
+
+ADMIN_GROUP = 'Administrador'
+LIMITED_GROUP = 'Usuario Limitado'
+
+# Segundos que se mantienen en caché los grupos de cada usuario
+ROLE_CACHE_TIMEOUT = 300
+
+group_names_cache = CacheNamespace('users:groups', ROLE_CACHE_TIMEOUT)
+
+
+def get_group_names(user):
+    """Retorna los nombres de los grupos del usuario, leyendo primero la caché."""
+    return group_names_cache.get_or_set(
+        (user.pk,), lambda: frozenset(user.groups.values_list('name', flat=True))
+    )
+
+
+def invalidate_group_names(*user_ids):
+    """Elimina de la caché los grupos de los usuarios indicados."""
+    group_names_cache.delete(*((user_id,) for user_id in user_ids))
@@ -0,0 +1,31 @@
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_save, pre_delete
+from django.dispatch import receiver
+
+from apps.users.models import User
+from apps.users.roles import invalidate_group_names
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def user_groups_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """Invalida la caché de grupos cuando cambia la membresía."""
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        invalidate_group_names(instance.pk)
+    elif action == 'pre_clear':
+        # group.user_set.clear(): se capturan los usuarios antes de eliminarlos
+        invalidate_group_names(*instance.user_set.values_list('pk', flat=True))
+    elif pk_set:
+        # group.user_set.add/remove(...)
+        invalidate_group_names(*pk_set)
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def group_changed(sender, instance, **kwargs):
+    """Invalida la caché de los miembros de un grupo renombrado o eliminado."""
+    if instance.pk and not kwargs.get('created', False):
+        invalidate_group_names(*instance.user_set.values_list('pk', flat=True))
@@ -1,3 +1,91 @@
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
 
-# Create your tests here.
+from apps.tasks.query_budget import QueryBudgetMixin
+from apps.users.models import User
+from apps.users.roles import ADMIN_GROUP
+
+
+class UserRoleTest(TestCase):
+    """Tests para la resolución memoizada de roles."""
+
+    def setUp(self):
+        cache.clear()
+        self.admin_group = Group.objects.create(name=ADMIN_GROUP)
+        self.user = User.objects.create_user(email='rol@test.com', password='test1234')
+
+    def test_group_names_memoized_per_instance(self):
+        """Test de que los grupos se consultan una sola vez por instancia."""
+        self.user.groups.add(self.admin_group)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(1):
+            self.assertTrue(user.is_admin)
+            self.assertTrue(user.is_admin_or_superuser)
+            self.assertTrue(user.is_admin)
+
+    def test_group_names_cached_between_instances(self):
+        """Test de que los grupos se leen desde la caché en instancias nuevas."""
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_admin)
+        user = User.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            self.assertFalse(user.is_admin)
+
+    def test_cache_invalidated_on_membership_change(self):
+        """Test de invalidación de la caché al cambiar la membresía."""
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_admin)
+
+        self.user.groups.add(self.admin_group)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_admin)
+
+        self.admin_group.user_set.remove(self.user)
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_admin)
+
+        self.admin_group.user_set.add(self.user)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_admin)
+
+        self.admin_group.user_set.clear()
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_admin)
+
+    def test_cache_invalidated_on_group_delete(self):
+        """Test de invalidación de la caché al eliminar un grupo."""
+        self.user.groups.add(self.admin_group)
+        self.assertTrue(User.objects.get(pk=self.user.pk).is_admin)
+        self.admin_group.delete()
+        self.assertFalse(User.objects.get(pk=self.user.pk).is_admin)
+
+    def test_role_checked_once_per_request(self):
+        """Test de que el decorador y la vista comparten la misma consulta de grupos."""
+        self.user.groups.add(self.admin_group)
+        self.client.force_login(self.user)
+        cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse('tasks:task_create'), {'title': 'Con permisos'})
+        self.assertEqual(response.status_code, 200)
+        group_queries = [query for query in context.captured_queries if 'auth_group' in query['sql']]
+        self.assertEqual(len(group_queries), 1)
+
+
+class UserAdminQueryTest(QueryBudgetMixin, TestCase):
+    """Tests de consultas del listado de usuarios del admin."""
+
+    def test_changelist_groups_prefetched(self):
+        """Test de que la columna de grupos no consulta una vez por usuario."""
+        admin = User.objects.create_superuser(email='admin@test.com', password='test1234')
+        group = Group.objects.create(name=ADMIN_GROUP)
+        self.client.force_login(admin)
+        created = []
+
+        def add_users(count):
+            for _ in range(count):
+                user = User.objects.create_user(email=f'usuario{len(created)}@test.com')
+                user.groups.add(group)
+                created.append(user)
+
+        def request():
+            self.assertEqual(self.client.get(reverse('admin:users_user_changelist')).status_code, 200)
+
+        self.assertConstantQueries(request, add_users)
@@ -33,6 +33,9 @@ INSTALLED_APPS = DJANGO_APPS + PROJECT_APPS + THIRD_PARTY_APPS
 
 
 MIDDLEWARE = [
+    # Primero para medir también el resto de los middleware; sin PROFILING_ENABLED no se carga
+    "apps.tasks.profiling.ProfilingMiddleware",
+    "apps.tasks.diagnostics.QueryDiagnosticsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -90,7 +93,11 @@ LOGOUT_REDIRECT_URL = 'users:login'
 
 
 # Configuración de Email con MailTrap
-EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+# Para desarrollo se puede usar django.core.mail.backends.console.EmailBackend
+# o django.core.mail.backends.filebased.EmailBackend (escribe en EMAIL_FILE_PATH)
+EMAIL_BACKEND = config('EMAIL_BACKEND', default='django.core.mail.backends.smtp.EmailBackend')
+EMAIL_FILE_PATH = config('EMAIL_FILE_PATH', default=str(BASE_DIR / 'sent_emails'))
+EMAIL_TIMEOUT = config('EMAIL_TIMEOUT', default=10, cast=int)
 EMAIL_HOST = config('EMAIL_HOST', default='sandbox.smtp.mailtrap.io')
 EMAIL_PORT = config('EMAIL_PORT', default=2525, cast=int)
 EMAIL_HOST_USER = config('EMAIL_HOST_USER', default='')
@@ -120,6 +127,77 @@ STATICFILES_DIRS = [
     BASE_DIR / 'static',
 ]
 
+# Archivos generados (exportaciones en segundo plano)
+MEDIA_URL = '/media/'
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Caché de Django. En memoria por defecto (un solo proceso); con varios workers
+# usar una compartida: FileBasedCache (mismo servidor) o RedisCache (Redis o
+# compatibles como Valkey, requiere el paquete redis)
+CACHES = {
+    'default': {
+        'BACKEND': config('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': config('CACHE_LOCATION', default='tasks'),
+        'TIMEOUT': config('CACHE_TIMEOUT', default=300, cast=int),
+    }
+}
+
+# Alias de CACHES para estadísticas y roles (apps.cache)
+APP_CACHE_ALIAS = config('APP_CACHE_ALIAS', default='default')
+
+# Sesiones leídas desde la caché y escritas también en la base de datos
+SESSION_ENGINE = config('SESSION_ENGINE', default='django.contrib.sessions.backends.cached_db')
+
+# Caché de fragmentos HTML de las filas de tareas: LRU en memoria por proceso
+# y, opcionalmente, un alias de CACHES compartido entre procesos (p. ej. 'default')
+TASK_FRAGMENT_CACHE_SIZE = config('TASK_FRAGMENT_CACHE_SIZE', default=5000, cast=int)
+TASK_FRAGMENT_CACHE_ALIAS = config('TASK_FRAGMENT_CACHE_ALIAS', default='')
+
+# Broker de eventos en tiempo real del dashboard. El broker en memoria solo
+# alcanza a los clientes del mismo proceso; con varios workers ASGI se debe
+# usar un backend compartido (subclase de InProcessBroker)
+TASK_EVENTS_BROKER = config('TASK_EVENTS_BROKER', default='apps.tasks.events.InProcessBroker')
+
+# PRAGMAs aplicados a cada conexión SQLite (apps.tasks.database). WAL deja leer
+# mientras se escribe; con WAL, synchronous=NORMAL no arriesga la integridad
+SQLITE_PRAGMAS = {
+    'journal_mode': config('SQLITE_JOURNAL_MODE', default='WAL'),
+    'synchronous': config('SQLITE_SYNCHRONOUS', default='NORMAL'),
+    'busy_timeout': config('SQLITE_BUSY_TIMEOUT', default=5000, cast=int),
+}
+
+# Perfil de peticiones (apps.tasks.profiling), desactivado por defecto. Agrega
+# Server-Timing a las respuestas y los histogramas de /dashboard/metrics/;
+# registra las peticiones lentas con sus consultas más lentas y guarda con
+# cProfile una fracción de las peticiones en PROFILING_DIR
+PROFILING_ENABLED = config('PROFILING_ENABLED', default=False, cast=bool)
+PROFILING_SLOWEST_QUERIES = config('PROFILING_SLOWEST_QUERIES', default=5, cast=int)
+PROFILING_SLOW_REQUEST_MS = config('PROFILING_SLOW_REQUEST_MS', default=500, cast=int)
+PROFILING_SAMPLE_RATE = config('PROFILING_SAMPLE_RATE', default=0.0, cast=float)
+PROFILING_DIR = config('PROFILING_DIR', default=str(BASE_DIR / 'profiles'))
+# Token para que Prometheus lea las métricas sin sesión (Authorization: Bearer <token>)
+PROFILING_METRICS_TOKEN = config('PROFILING_METRICS_TOKEN', default='')
+
+# Diagnóstico de consultas (apps.tasks.diagnostics), desactivado por defecto:
+# registra las consultas lentas con su EXPLAIN y las lecturas repetidas N o
+# más veces en una petición (probable N+1). Con QUERY_DIAGNOSTICS_STRICT los
+# N+1 hacen fallar la petición (tests)
+QUERY_DIAGNOSTICS_ENABLED = config('QUERY_DIAGNOSTICS_ENABLED', default=False, cast=bool)
+QUERY_DIAGNOSTICS_N_PLUS_ONE = config('QUERY_DIAGNOSTICS_N_PLUS_ONE', default=5, cast=int)
+QUERY_DIAGNOSTICS_SLOW_QUERY_MS = config('QUERY_DIAGNOSTICS_SLOW_QUERY_MS', default=100, cast=int)
+QUERY_DIAGNOSTICS_STRICT = config('QUERY_DIAGNOSTICS_STRICT', default=False, cast=bool)
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'apps': {'handlers': ['console'], 'level': config('APP_LOG_LEVEL', default='INFO')},
+    },
+}
+
 # Si usas webpack
 WEBPACK_LOADER = {
     'DEFAULT': {
@@ -0,0 +1,69 @@
+// Actualizaciones en tiempo real del dashboard (Server-Sent Events)
+// Cada mensaje trae los ids creados, modificados y eliminados; solo se
+// piden y reemplazan esas filas, sin recargar la lista completa.
+(function () {
+    const list = document.getElementById('dashboard-tasks-list');
+    if (!list || !list.dataset.eventsUrl || !window.EventSource) {
+        return;
+    }
+
+    const rowsUrl = list.dataset.rowsUrl;
+    // Con filtros activos las tareas nuevas podrían no corresponder a la lista
+    const showCreated = !window.location.search;
+
+    function fetchRows(ids) {
+        const params = new URLSearchParams();
+        ids.forEach((id) => params.append('id', id));
+        return fetch(`${rowsUrl}?${params}`, { credentials: 'same-origin' })
+            .then((response) => (response.ok ? response.text() : ''))
+            .then((html) => {
+                const template = document.createElement('template');
+                template.innerHTML = html;
+                return Array.from(template.content.children);
+            });
+    }
+
+    function patchRows(ids, insertNew) {
+        fetchRows(ids).then((rows) => {
+            // Las filas vienen de la más nueva a la más antigua
+            rows.reverse().forEach((row) => {
+                const current = document.getElementById(row.id);
+                if (current) {
+                    current.replaceWith(row);
+                } else if (insertNew) {
+                    list.prepend(row);
+                } else {
+                    return;
+                }
+                htmx.process(row);
+            });
+        });
+    }
+
+    const source = new EventSource(list.dataset.eventsUrl);
+
+    source.addEventListener('tasks', (event) => {
+        const diff = JSON.parse(event.data);
+
+        diff.deleted.forEach((id) => {
+            const row = document.getElementById(`task-${id}`);
+            if (row) {
+                row.remove();
+            }
+        });
+
+        // Solo se piden las filas modificadas que están en pantalla
+        const updated = diff.updated.filter((id) => document.getElementById(`task-${id}`));
+        if (updated.length) {
+            patchRows(updated, false);
+        }
+        if (showCreated && diff.created.length) {
+            patchRows(diff.created, true);
+        }
+    });
+
+    // Se perdieron eventos (cliente lento): se recarga la lista completa
+    source.addEventListener('resync', () => window.location.reload());
+
+    window.addEventListener('beforeunload', () => source.close());
+})();